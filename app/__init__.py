@@ -6,10 +6,23 @@ __version__ = "0.1.0"
 __author__ = "Your Name"
 __email__ = "your.email@example.com"
 
-# Import main components for easier access
-from .agent import InsuranceAgent
-from .models import MessageRequest, MessageResponse, HealthStatus
-from .tools import TOOLS
+# Main components, imported on first access so light entry points (such as
+# the CLI's remote mode) do not load the LangChain stack
+_EXPORTS = {
+    'InsuranceAgent': '.agent',
+    'MessageRequest': '.models',
+    'MessageResponse': '.models',
+    'HealthStatus': '.models',
+    'TOOLS': '.tools',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'InsuranceAgent',
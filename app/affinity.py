@@ -0,0 +1,132 @@
+import hashlib
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def rendezvous_weight(node: str, session_id: str) -> int:
+    """Highest-random-weight score of a node for a session"""
+    digest = hashlib.blake2b(f"{node}\x00{session_id}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class AffinityRing:
+    """
+    Assigns sessions to nodes by rendezvous hashing with bounded loads
+    A session goes to the node with the highest rendezvous weight for its id,
+    unless that node already holds load_factor times the average number of
+    sessions, in which case it goes to the next node in its ranking. Assignments
+    are sticky until the session expires or membership changes. On a change,
+    only sessions whose node left, or whose top-ranked node joined, move.
+
+    The loads are those of the sessions routed through this ring, so one ring
+    should route all traffic (a gateway or a client-side router).
+    """
+
+    def __init__(self, nodes: Iterable[str], load_factor: float = 1.25):
+        if load_factor < 1.0:
+            raise ValueError("load_factor must be at least 1.0")
+        self.load_factor = load_factor
+        self.nodes: List[str] = sorted(set(nodes))
+        if not self.nodes:
+            raise ValueError("At least one node is required")
+        self._assignments: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._loads: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def ranked(self, session_id: str, nodes: Optional[List[str]] = None) -> List[str]:
+        """Nodes in rendezvous order for a session"""
+        return sorted(nodes or self.nodes, key=lambda node: rendezvous_weight(node, session_id), reverse=True)
+
+    def capacity(self, sessions: Optional[int] = None) -> int:
+        """Most sessions a node may hold when sessions are assigned in total"""
+        total = len(self._assignments) + 1 if sessions is None else sessions
+        return max(1, math.ceil(self.load_factor * total / len(self.nodes)))
+
+    def route(self, session_id: str) -> str:
+        """Node serving a session, assigning one on first sight"""
+        with self._lock:
+            assignment = self._assignments.get(session_id)
+            if assignment is not None:
+                node = assignment[0]
+                self._assignments[session_id] = (node, time.monotonic())
+                self._assignments.move_to_end(session_id)
+                return node
+            return self._assign(session_id)
+
+    def owner(self, session_id: str) -> Optional[str]:
+        """Node a session is assigned to, without assigning it"""
+        with self._lock:
+            assignment = self._assignments.get(session_id)
+            return assignment[0] if assignment is not None else None
+
+    def release(self, session_id: str) -> None:
+        """Forget a session that ended"""
+        with self._lock:
+            assignment = self._assignments.pop(session_id, None)
+            if assignment is not None:
+                self._loads[assignment[0]] -= 1
+
+    def expire(self, max_idle_seconds: float) -> int:
+        """Forget sessions not routed for max_idle_seconds"""
+        cutoff = time.monotonic() - max_idle_seconds
+        expired = 0
+        with self._lock:
+            while self._assignments:
+                session_id, (node, last_routed) = next(iter(self._assignments.items()))
+                if last_routed >= cutoff:
+                    break
+                del self._assignments[session_id]
+                self._loads[node] -= 1
+                expired += 1
+        return expired
+
+    def set_nodes(self, nodes: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        Change membership; returns {session_id: (old node, new node)} for sessions that move
+        The old node should release() each moved session (writing it to the
+        shared store) before the new node serves it.
+        """
+        nodes = sorted(set(nodes))
+        if not nodes:
+            raise ValueError("At least one node is required")
+        with self._lock:
+            added = set(nodes) - set(self.nodes)
+            remaining = set(nodes)
+            self.nodes = nodes
+            moving = [
+                session_id for session_id, (node, _) in self._assignments.items()
+                if node not in remaining or (added and self.ranked(session_id)[0] in added)
+            ]
+            previous = {}
+            for session_id in moving:
+                node, last_routed = self._assignments[session_id]
+                previous[session_id] = (node, last_routed)
+                self._loads[node] -= 1
+                del self._assignments[session_id]
+            for node in list(self._loads):
+                if node not in remaining:
+                    del self._loads[node]
+
+            moves = {}
+            for session_id in moving:
+                old, last_routed = previous[session_id]
+                new = self._assign(session_id, last_routed)
+                if new != old:
+                    moves[session_id] = (old, new)
+            return moves
+
+    def loads(self) -> Dict[str, int]:
+        with self._lock:
+            return {node: self._loads.get(node, 0) for node in self.nodes}
+
+    def _assign(self, session_id: str, last_routed: Optional[float] = None) -> str:
+        """Place a session on its best node with room; the caller holds the lock"""
+        limit = self.capacity()
+        ranking = self.ranked(session_id)
+        node = next((node for node in ranking if self._loads[node] < limit), ranking[0])
+        self._assignments[session_id] = (node, time.monotonic() if last_routed is None else last_routed)
+        self._loads[node] += 1
+        return node
@@ -1,5 +1,5 @@
 from langchain.chat_models import ChatOpenAI
-from langchain.memory import ConversationBufferMemory, ConversationSummaryMemory
+from langchain.memory import ConversationSummaryMemory
 from langchain.chains import ConversationChain, LLMChain
 from langchain.prompts import (
     ChatPromptTemplate,
@@ -8,21 +8,49 @@ from langchain.prompts import (
     HumanMessagePromptTemplate,
     PromptTemplate
 )
-from langchain.agents import AgentExecutor, create_openai_functions_agent
+from langchain.agents import AgentExecutor, create_openai_tools_agent
 from langchain.schema import SystemMessage, HumanMessage
-from typing import Dict, Any, Optional
+from langchain.callbacks import get_openai_callback
+from typing import Dict, Any, Optional, Tuple
 import uuid
+import hashlib
 import json
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextvars import ContextVar, copy_context
 from functools import lru_cache
 
 from config.settings import settings
-from .tools import TOOLS
+from .tools import TOOLS, find_policy_types
 from .models import MessageResponse
+from .session import Session
+from .session_store import SessionStore, SharedSessionStore
+from .concurrency import KeyedLock
+from .executor import ParallelAgentExecutor
+from .speculation import SpeculativeTool, ToolPrefetcher, current_prefetch
+from .tool_runtime import ManagedTool, runtime_from_settings
+from .resilience import CircuitBreaker, Deadline, DeadlineExceeded, current_deadline
+from .fallback import KnowledgeFallback
+from .metrics import metrics
+from .routing import ModelRouter
+from .scheduler import INTERACTIVE, SchedulerCallbackHandler, current_caller, shared_scheduler
+from .documents import DocumentStore, current_documents
+from .knowledge import KnowledgeRegistry, current_knowledge
+from .simulation import SimulatedChatModel
+from .profiling import profiled
+from .compliance import ComplianceFilter
+from .applicant import ApplicantProfile, current_applicant
+from .tracing import current_span, span, tracing_callbacks
 
 logger = logging.getLogger(__name__)
 
+# Extra LangChain callbacks for the current turn (e.g. progress events of a streaming caller)
+current_callbacks: ContextVar[Tuple[Any, ...]] = ContextVar("current_callbacks", default=())
+
 class InsuranceAgent:
     """
     Main AI agent for life insurance support
@@ -35,20 +63,58 @@ class InsuranceAgent:
         os.environ["OPENAI_API_KEY"] = settings.openai_api_key
         
         self.llm = self._initialize_llm()
-        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.sessions = SessionStore(
+            settings.session_store_path,
+            settings.max_hot_sessions,
+            SharedSessionStore(settings.shared_session_store_path) if settings.shared_session_store_path else None,
+            settings.session_flush_interval
+        )
+        self.session_locks = KeyedLock()
+        self.documents = DocumentStore(
+            settings.max_document_sessions, settings.max_documents_per_session, settings.max_document_store_bytes
+        )
         self.knowledge_base = self._load_knowledge_base()
+        self.tenants = KnowledgeRegistry(settings.knowledge_snapshot_dir, settings.max_resident_tenants)
+        self.tool_runtime = runtime_from_settings(settings, lambda: self.knowledge_version)
+        self.tools = [
+            ManagedTool.wrap(tool, self.tool_runtime) for tool in TOOLS
+            if settings.agent_tools is None or tool.name in settings.agent_tools
+        ]
+        self.prefetcher = ToolPrefetcher(self.tools, self.knowledge_base) if settings.speculative_tools else None
+        self.fallback = KnowledgeFallback(self.knowledge_base)
+        self.compliance = ComplianceFilter.from_knowledge(self.knowledge_base.get("regulatory_information"))
+        self._tenant_compliance: Dict[str, ComplianceFilter] = {}
+        self.llm_breaker = CircuitBreaker(
+            "llm",
+            failure_threshold=settings.breaker_failure_threshold,
+            reset_seconds=settings.breaker_reset_seconds
+        )
+        self._llm_pool = ThreadPoolExecutor(max_workers=settings.llm_max_workers, thread_name_prefix="llm")
+        self.router = ModelRouter(
+            settings.model_tiers,
+            settings.model_tier_order,
+            settings.routing_table
+        ) if settings.model_routing else None
+        self._tier_executors: Dict[str, AgentExecutor] = {}
+        self._tier_lock = threading.Lock()
         
         # Initialize agent with tools
         self.agent_executor = self._create_agent_executor()
         
         logger.info("InsuranceAgent initialized successfully")
     
-    def _initialize_llm(self) -> ChatOpenAI:
+    def _initialize_llm(self, model_name: Optional[str] = None) -> ChatOpenAI:
         """Initialize the LLM with configuration settings"""
         try:
+            callbacks = [SchedulerCallbackHandler(shared_scheduler())] if settings.llm_scheduler_enabled else None
+            if settings.simulated_llm:
+                return SimulatedChatModel(latency_median=settings.simulated_llm_latency, callbacks=callbacks)
             llm = ChatOpenAI(
-                model_name=settings.openai_model,
-                temperature=settings.openai_temperature
+                model_name=model_name or settings.openai_model,
+                temperature=settings.openai_temperature,
+                request_timeout=settings.llm_request_timeout,
+                max_retries=settings.llm_max_retries,
+                callbacks=callbacks
             )
             return llm
         except Exception as e:
@@ -56,18 +122,23 @@ class InsuranceAgent:
             raise
     
     def _load_knowledge_base(self) -> Dict[str, Any]:
-        """Load and cache the knowledge base"""
+        """Load and cache the knowledge base, recording its content version"""
         try:
-            with open("knowledge/insurance_data.json", "r") as f:
-                data = json.load(f)
-                logger.info("Knowledge base loaded successfully")
-                return data
+            with open("knowledge/insurance_data.json", "rb") as f:
+                raw = f.read()
+            data = json.loads(raw)
+            self.knowledge_version = hashlib.sha256(raw).hexdigest()[:16]
+            logger.info(f"Knowledge base loaded successfully (version {self.knowledge_version})")
+            return data
         except FileNotFoundError:
             logger.warning("Knowledge base file not found, using default data")
-            return self._get_default_knowledge_base()
         except json.JSONDecodeError as e:
             logger.error(f"Invalid JSON in knowledge base: {str(e)}")
-            return self._get_default_knowledge_base()
+        
+        data = self._get_default_knowledge_base()
+        raw = json.dumps(data, sort_keys=True).encode("utf-8")
+        self.knowledge_version = hashlib.sha256(raw).hexdigest()[:16]
+        return data
     
     def _get_default_knowledge_base(self) -> Dict[str, Any]:
         """Return default knowledge base when file is missing"""
@@ -109,11 +180,11 @@ class InsuranceAgent:
             }
         }
     
-    def _create_agent_executor(self) -> AgentExecutor:
+    def _create_agent_executor(self, llm: Optional[ChatOpenAI] = None) -> AgentExecutor:
         """Create the agent executor with tools and prompt"""
         try:
-            # Define the prompt template
-            system_prompt = """You are a knowledgeable and professional life insurance support assistant.
+            # Define the prompt template (agent_system_prompt replaces it, e.g. in a shadow configuration)
+            system_prompt = settings.agent_system_prompt or """You are a knowledgeable and professional life insurance support assistant.
 Your role is to provide accurate, helpful, and clear information about life insurance products and services.
 
 Guidelines:
@@ -127,8 +198,13 @@ Available Tools:
 - get_policy_type_info: Get details about specific policy types
 - check_eligibility: Check eligibility requirements
 - get_claims_process: Get information about claims process
+- get_policy_illustration: Project cash value and death benefit for permanent policies
+- search_policy_documents: Search the customer's own uploaded policy documents
 
-Use tools when they can provide more accurate information. Always maintain conversation context."""
+Use tools when they can provide more accurate information. When a question covers several
+policy types, request all of the needed tool calls at once. When the customer asks about their own
+policy and has uploaded documents, answer from those documents and cite the section.
+Always maintain conversation context."""
 
             prompt = ChatPromptTemplate.from_messages([
                 SystemMessagePromptTemplate.from_template(system_prompt),
@@ -137,19 +213,26 @@ Use tools when they can provide more accurate information. Always maintain conve
                 MessagesPlaceholder(variable_name="agent_scratchpad")
             ])
             
+            # Speculative mode serves prefetched results through wrapped tools
+            tools = [SpeculativeTool.wrap(tool) for tool in self.tools] if self.prefetcher else self.tools
+            
             # Create the agent
-            agent = create_openai_functions_agent(
-                llm=self.llm,
-                tools=TOOLS,
+            agent = create_openai_tools_agent(
+                llm=llm or self.llm,
+                tools=tools,
                 prompt=prompt
             )
             
             # Create the agent executor
-            agent_executor = AgentExecutor(
+            agent_executor = ParallelAgentExecutor(
                 agent=agent,
-                tools=TOOLS,
+                tools=tools,
                 verbose=settings.debug,
-                handle_parsing_errors=True
+                handle_parsing_errors=True,
+                return_intermediate_steps=True,
+                max_iterations=settings.agent_max_iterations,
+                max_execution_time=settings.agent_max_execution_time,
+                max_parallel_tools=settings.max_parallel_tools
             )
             
             return agent_executor
@@ -164,17 +247,10 @@ Use tools when they can provide more accurate information. Always maintain conve
             session_id = str(uuid.uuid4())
         
         if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                "user_id": user_id,
-                "created_at": datetime.now(),
-                "last_active": datetime.now(),
-                "message_count": 0,
-                "memory": ConversationBufferMemory(return_messages=True),
-                "context": {}
-            }
+            self.sessions[session_id] = Session(user_id)
             logger.debug(f"Created new session: {session_id}")
         else:
-            self.sessions[session_id]["last_active"] = datetime.now()
+            self.sessions[session_id].touch()
             logger.debug(f"Using existing session: {session_id}")
         
         return session_id
@@ -200,21 +276,28 @@ Use tools when they can provide more accurate information. Always maintain conve
     
     def _cleanup_old_sessions(self):
         """Remove expired sessions"""
-        now = datetime.now()
-        expired_sessions = []
-        
-        for session_id, session_data in self.sessions.items():
-            last_active = session_data["last_active"]
-            if (now - last_active).total_seconds() > (settings.session_timeout_minutes * 60):
-                expired_sessions.append(session_id)
+        expired_sessions = self.sessions.expire(settings.session_timeout_minutes * 60)
         
         for session_id in expired_sessions:
-            del self.sessions[session_id]
+            self.documents.discard(session_id)
             logger.debug(f"Removed expired session: {session_id}")
     
-    def process_message(self, user_id: str, message: str, session_id: Optional[str] = None) -> MessageResponse:
+    def process_message(
+        self,
+        user_id: str,
+        message: str,
+        session_id: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: str = INTERACTIVE,
+        tenant: Optional[str] = None
+    ) -> MessageResponse:
         """
         Process user message and return response
+        Turns for the same session are serialized in arrival order. The turn is
+        bounded by timeout seconds (default_sla_seconds when unset); past that, or
+        while the LLM circuit is open, the answer comes from the knowledge base.
+        LLM calls are scheduled under the given priority class. A tenant selects
+        that carrier's compiled catalog instead of the default knowledge base.
         """
         try:
             # Clean up old sessions
@@ -224,51 +307,257 @@ Use tools when they can provide more accurate information. Always maintain conve
             if not message or not message.strip():
                 raise ValueError("Message cannot be empty")
             
-            # Get or create session
-            session_id = self._get_or_create_session(session_id, user_id)
-            session_data = self.sessions[session_id]
+            if session_id is None:
+                session_id = str(uuid.uuid4())
             
-            # Update message count
-            session_data["message_count"] += 1
+            knowledge = self.tenants.get(tenant) if tenant else None
             
-            # Classify query
-            query_type = self._classify_query(message)
+            deadline = Deadline(timeout if timeout is not None else settings.default_sla_seconds)
+            token = current_deadline.set(deadline)
+            knowledge_token = current_knowledge.set(knowledge)
+            caller_token = current_caller.set((user_id, priority))
+            documents_token = current_documents.set(self.documents.get(session_id))
+            applicant_token = current_applicant.set(None)
+            try:
+                with span("process_message"), metrics.timer("chat_turn_seconds"), self.session_locks.hold(session_id):
+                    return self._process_turn(user_id, message, session_id)
+            finally:
+                current_applicant.reset(applicant_token)
+                current_knowledge.reset(knowledge_token)
+                current_documents.reset(documents_token)
+                current_caller.reset(caller_token)
+                current_deadline.reset(token)
             
-            # Prepare input for agent
-            agent_input = {
-                "input": message,
-                "chat_history": session_data["memory"].chat_memory.messages
-            }
+        except Exception as e:
+            logger.error(f"Error processing message: {str(e)}")
+            raise
+    
+    def prepare_tiers(self) -> None:
+        """Create every model tier's executor now, from the current settings, instead of on first use"""
+        if self.router is not None:
+            for tier in self.router.tiers:
+                self._executor_for(tier)
+    
+    def _executor_for(self, tier: Optional[str]) -> AgentExecutor:
+        """Agent executor for a model tier, created on first use"""
+        if tier is None:
+            return self.agent_executor
+        with self._tier_lock:
+            executor = self._tier_executors.get(tier)
+            if executor is None:
+                llm = self._initialize_llm(self.router.tiers[tier].model)
+                executor = self._tier_executors[tier] = self._create_agent_executor(llm)
+            return executor
+    
+    def _compliance_filter(self) -> ComplianceFilter:
+        """Compliance rules compiled from the turn's catalog"""
+        knowledge = current_knowledge.get()
+        if knowledge is None:
+            return self.compliance
+        compliance = self._tenant_compliance.get(knowledge.version)
+        if compliance is None:
+            compliance = ComplianceFilter.from_knowledge(knowledge.section("regulatory_information"))
+            with self._tier_lock:
+                if len(self._tenant_compliance) >= settings.max_resident_tenants:
+                    self._tenant_compliance.clear()
+                self._tenant_compliance[knowledge.version] = compliance
+        return compliance
+    
+    def _invoke_agent(
+        self,
+        agent_input: Dict[str, Any],
+        prefetch: Any,
+        tier: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run the agent on the LLM pool, waiting no longer than the turn deadline allows"""
+        with span("agent.invoke", {"model.tier": tier or "default"}) as invoke_span:
+            token = current_prefetch.set(prefetch)
+            try:
+                context = copy_context()
+            finally:
+                current_prefetch.reset(token)
+            
+            deadline = current_deadline.get()
+            timeout = None
+            if deadline is not None:
+                timeout = deadline.remaining() - settings.degraded_reserve_seconds
+                if timeout <= 0:
+                    raise DeadlineExceeded("No time left for the agent")
             
-            # Generate response using agent
+            executor = self._executor_for(tier)
+            # Only sampled traces pay for the tracing callback
+            callbacks = list(current_callbacks.get())
+            if invoke_span is not None:
+                callbacks.append(tracing_callbacks)
+            invoke_kwargs = {"config": {"callbacks": callbacks}} if callbacks else {}
+            
+            def run() -> Tuple[Dict[str, Any], Any, float]:
+                start = time.perf_counter()
+                with get_openai_callback() as usage:
+                    result = executor.invoke(agent_input, **invoke_kwargs)
+                return result, usage, time.perf_counter() - start
+            
+            # An abandoned run finishes in the background; its result is discarded
+            future = self._llm_pool.submit(context.run, profiled, run)
             try:
-                result = self.agent_executor.invoke(agent_input)
+                result, usage, elapsed = future.result(timeout=timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise DeadlineExceeded(f"Agent did not answer within {timeout:.1f}s")
+            
+            if invoke_span is not None:
+                invoke_span.set_attribute("llm.prompt_tokens", usage.prompt_tokens)
+                invoke_span.set_attribute("llm.completion_tokens", usage.completion_tokens)
+            if tier is not None:
+                self.router.record(tier, elapsed, usage.prompt_tokens, usage.completion_tokens)
+            return {
+                **result,
+                "token_usage": {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+            }
+    
+    def _run_routed(
+        self,
+        agent_input: Dict[str, Any],
+        prefetch: Any,
+        query_type: str,
+        message: str,
+        session: Session
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Run the turn on the routed tier, escalating while answers fail validation"""
+        if self.router is None:
+            return self._invoke_agent(agent_input, prefetch), None
+        
+        knowledge = current_knowledge.get()
+        policy_types = knowledge.keys("policy_types") if knowledge is not None else self.fallback.policy_types
+        tool_calls_expected = len(find_policy_types(message, policy_types))
+        tier = self.router.route(query_type, message, session.message_count, tool_calls_expected)
+        # Escalated turns report the tokens of every attempt
+        spent = {"prompt_tokens": 0, "completion_tokens": 0}
+        while True:
+            result = self._invoke_agent(agent_input, prefetch, tier)
+            for key in spent:
+                spent[key] += result["token_usage"][key]
+            result["token_usage"] = dict(spent)
+            if self.router.is_acceptable(result["output"]):
+                return result, tier
+            next_tier = self.router.escalate(tier)
+            if next_tier is None:
+                return result, tier
+            logger.info(f"Escalating from {tier} to {next_tier} tier")
+            tier = next_tier
+    
+    def _process_turn(self, user_id: str, message: str, session_id: str) -> MessageResponse:
+        """Run one turn; the caller holds the session lock"""
+        # Get or create session
+        with span("session.load"):
+            session_id = self._get_or_create_session(session_id, user_id)
+            session = self.sessions[session_id]
+        
+        # Update message count
+        session.message_count += 1
+        
+        # Classify query
+        query_type = self._classify_query(message)
+        turn_span = current_span.get()
+        if turn_span is not None:
+            turn_span.set_attribute("session.id", session_id)
+            turn_span.set_attribute("query.type", query_type)
+        
+        # Fold what the customer says about themselves into the session's profile
+        applicant = ApplicantProfile.from_dict((session.context or {}).get("applicant"))
+        extracted = applicant.update(message)
+        if extracted:
+            session.context = {**(session.context or {}), "applicant": applicant.to_dict()}
+            metrics.increment("applicant_fields_extracted", len(extracted))
+        current_applicant.set(applicant)
+        
+        # Start the likely tool call while the prompt is prepared
+        prefetch = self.prefetcher.start(query_type, message) if self.prefetcher else None
+        
+        # Prepare input for agent; a known profile stands in for the older turns it came from
+        if applicant.is_empty():
+            chat_history = session.messages()
+        else:
+            chat_history = session.messages(settings.profile_history_messages)
+            chat_history.insert(0, SystemMessage(content=f"Known applicant details: {applicant.summary()}"))
+        if prefetch is not None:
+            with span("prefetch.wait", {"tool.name": prefetch.tool_name}):
+                reference = prefetch.result(timeout=settings.speculative_inject_timeout)
+            if reference is not None:
+                chat_history.append(SystemMessage(content=f"Reference information from {prefetch.tool_name}:\n{reference}"))
+                prefetch.injected = True
+        
+        documents = current_documents.get()
+        if documents is not None and documents.documents:
+            names = ", ".join(documents.names())
+            chat_history.append(SystemMessage(content=f"The customer has uploaded these policy documents: {names}"))
+        
+        agent_input = {
+            "input": message,
+            "chat_history": chat_history
+        }
+        
+        # Generate response using agent, falling back to the knowledge base
+        context: Dict[str, Any] = {}
+        degraded_reason = None
+        if not self.llm_breaker.allow():
+            degraded_reason = "circuit_open"
+        else:
+            try:
+                result, tier = self._run_routed(agent_input, prefetch, query_type, message, session)
                 response_text = result["output"]
+                self.llm_breaker.record_success()
+                context["token_usage"] = result["token_usage"]
+                if tier is not None:
+                    context["model_tier"] = tier
+                if prefetch is not None:
+                    context["speculative_tool"] = prefetch.record_outcome(result.get("intermediate_steps", []))
+            except DeadlineExceeded as e:
+                logger.warning(f"Agent missed deadline: {str(e)}")
+                degraded_reason = "deadline"
+                self.llm_breaker.record_failure()
             except Exception as e:
                 logger.error(f"Agent execution failed: {str(e)}")
-                response_text = "I apologize, but I'm having trouble processing your request. Please try again or rephrase your question."
-            
+                degraded_reason = "llm_error"
+                self.llm_breaker.record_failure()
+        
+        if degraded_reason is not None:
+            with span("fallback", {"degraded.reason": degraded_reason}):
+                response_text = self.fallback.answer(query_type, message)
+            context["degraded"] = True
+            context["degraded_reason"] = degraded_reason
+            metrics.increment(f"degraded_responses_{degraded_reason}")
+        
+        if settings.compliance_filter_enabled:
+            report = self._compliance_filter().check(response_text)
+            response_text = report.apply(response_text)
+            if report.violations:
+                logger.warning(f"Compliance violations in session {session_id}: {', '.join(report.violations)}")
+                metrics.increment("compliance_violations")
+                context["compliance_violations"] = report.violations
+            if report.disclosures:
+                context["disclosures_added"] = report.disclosures
+        
+        with span("session.save"):
             # Save conversation to memory
-            session_data["memory"].save_context(
-                {"input": message},
-                {"output": response_text}
-            )
-            
-            # Create response object
-            response = MessageResponse(
-                response=response_text,
-                session_id=session_id,
-                context={
-                    "query_type": query_type,
-                    "message_count": session_data["message_count"],
-                    "session_duration": (datetime.now() - session_data["created_at"]).total_seconds()
-                },
-                query_type=query_type
-            )
+            session.add_exchange(message, response_text)
             
-            logger.info(f"Processed message - User: {user_id}, Session: {session_id}, Query Type: {query_type}")
-            return response
-            
-        except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
-            raise
\ No newline at end of file
+            # Write back so the hot tier holds the latest state
+            self.sessions[session_id] = session
+        
+        # Create response object
+        response = MessageResponse(
+            response=response_text,
+            session_id=session_id,
+            context={
+                "query_type": query_type,
+                "message_count": session.message_count,
+                "session_duration": session.duration_seconds(),
+                **({"applicant": applicant.to_dict()} if not applicant.is_empty() else {}),
+                **context
+            },
+            query_type=query_type
+        )
+        
+        logger.info(f"Processed message - User: {user_id}, Session: {session_id}, Query Type: {query_type}")
+        return response
@@ -1,10 +1,15 @@
 import httpx
-from typing import Dict, Any, Optional
+import threading
+import uuid
+from collections import Counter
+from typing import Dict, Any, Optional, Set, Tuple
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from models import MessageResponse
+from app.affinity import AffinityRing
+from app.models import MessageResponse
+from app.trace_context import inject
 
 class InsuranceAPIClient:
     """
@@ -14,7 +19,14 @@ class InsuranceAPIClient:
     
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url.rstrip("/")
-        self.client = httpx.Client(timeout=30.0)
+        # Requests made inside a sampled trace carry its traceparent downstream
+        self.client = httpx.Client(timeout=30.0, event_hooks={"request": [self._inject_trace_context]})
+    
+    @staticmethod
+    def _inject_trace_context(request: httpx.Request) -> None:
+        headers: Dict[str, str] = {}
+        inject(headers)
+        request.headers.update(headers)
     
     def chat(self, user_id: str, message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
         """Send a message to the chat endpoint"""
@@ -55,4 +67,95 @@ class InsuranceAPIClient:
     
     def close(self):
         """Close the client connection"""
-        self.client.close()
\ No newline at end of file
+        self.client.close()
+
+
+class RoutedAPIClient:
+    """
+    Client that keeps each session on one node
+    Sessions are placed with an AffinityRing over nodes ({node id: base URL}),
+    so every turn of a conversation reaches the node holding it in memory.
+    Session ids are minted here when a conversation starts, which lets the
+    first turn be routed too. Membership changes hand moved sessions over
+    through the old node's /admin/sessions/release before routing resumes;
+    turns already sent for a moving session finish before it is released, and
+    new ones wait for the handover.
+    """
+
+    def __init__(
+        self,
+        nodes: Dict[str, str],
+        admin_token: Optional[str] = None,
+        load_factor: float = 1.25,
+        session_ttl: float = 30 * 60
+    ):
+        self.ring = AffinityRing(nodes, load_factor)
+        self.admin_token = admin_token
+        self.session_ttl = session_ttl
+        self.clients = {node: InsuranceAPIClient(url) for node, url in nodes.items()}
+        # Held while sessions are handed over, so no turn reaches a node mid-migration
+        self._routing = threading.RLock()
+        self._handover = threading.Condition(self._routing)
+        self._inflight: Counter = Counter()  # turns sent and not yet answered, per session
+        self._moving: Set[str] = set()
+
+    def chat(self, user_id: str, message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send a message to the node that holds the session"""
+        session_id = session_id or str(uuid.uuid4())
+        with self._routing:
+            self._handover.wait_for(lambda: session_id not in self._moving)
+            # Sessions idle past the server's timeout no longer count toward node loads
+            self.ring.expire(self.session_ttl)
+            client = self.clients[self.ring.route(session_id)]
+            self._inflight[session_id] += 1
+        try:
+            return client.chat(user_id, message, session_id)
+        finally:
+            with self._routing:
+                self._inflight[session_id] -= 1
+                if not self._inflight[session_id]:
+                    del self._inflight[session_id]
+                self._handover.notify_all()
+
+    def end_session(self, session_id: str) -> Dict[str, Any]:
+        """Delete a session and forget its placement"""
+        with self._routing:
+            node = self.ring.owner(session_id) or self.ring.ranked(session_id)[0]
+            self.ring.release(session_id)
+        return self.clients[node].delete_session(session_id)
+
+    def set_nodes(self, nodes: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+        """
+        Change membership and migrate the sessions that move
+        Departing nodes must keep serving until this returns.
+        """
+        with self._routing:
+            for node, url in nodes.items():
+                if node not in self.clients:
+                    self.clients[node] = InsuranceAPIClient(url)
+            moves = self.ring.set_nodes(nodes)
+            self._moving = set(moves)
+            try:
+                # Turns already on their way to the old node must land before it lets go
+                self._handover.wait_for(lambda: not any(self._inflight[session_id] for session_id in moves))
+                by_node: Dict[str, list] = {}
+                for session_id, (old, _) in moves.items():
+                    by_node.setdefault(old, []).append(session_id)
+                for node, session_ids in by_node.items():
+                    response = self.clients[node].client.post(
+                        f"{self.clients[node].base_url}/admin/sessions/release",
+                        json={"session_ids": session_ids},
+                        headers={"X-Admin-Token": self.admin_token or ""}
+                    )
+                    response.raise_for_status()
+            finally:
+                self._moving = set()
+                self._handover.notify_all()
+            for node in set(self.clients) - set(nodes):
+                self.clients.pop(node).close()
+        return moves
+
+    def close(self):
+        """Close every node connection"""
+        for client in self.clients.values():
+            client.close()
@@ -0,0 +1,281 @@
+import re
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Set, Tuple
+
+_AGE_PATTERN = re.compile(
+    r"\b(?:age|aged|i am|i'm|im)\s+(\d{1,3})\b|\b(\d{1,3})\s*(?:years?|yrs?)[\s-]*old\b",
+    re.IGNORECASE
+)
+
+_NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6}
+
+_NON_SMOKER = re.compile(
+    r"\b(?:non-?smoker|(?:do not|don't|never)\s+(?:smoke|smoked|vape)|quit\s+smoking|no\s+tobacco)\b",
+    re.IGNORECASE
+)
+_SMOKER = re.compile(r"\b(?:i\s+smoke|smoker|i\s+vape|cigarettes?|tobacco\s+user|pack\s+a\s+day)\b", re.IGNORECASE)
+
+_HEALTH_RATING = re.compile(
+    r"\b(excellent|great|good|average|fair|poor|bad)\s+(?:health|shape|condition)\b",
+    re.IGNORECASE
+)
+_CONDITIONS = {
+    "diabetes": re.compile(r"\bdiabet\w*", re.IGNORECASE),
+    "high blood pressure": re.compile(r"\b(?:high\s+blood\s+pressure|hypertension)\b", re.IGNORECASE),
+    "heart disease": re.compile(r"\bheart\s+(?:disease|condition|attack)\b", re.IGNORECASE),
+    "cancer": re.compile(r"\bcancer\b", re.IGNORECASE),
+    "asthma": re.compile(r"\basthma\w*", re.IGNORECASE),
+    "high cholesterol": re.compile(r"\bhigh\s+cholesterol\b", re.IGNORECASE),
+}
+
+# Profile facts are only taken from statements, one clause at a time: questions
+# ("Does whole life cover cancer?") and facts about other people are skipped.
+# Commas and periods inside numbers ("$1,000,000", "$1.5m") do not split clauses.
+_CLAUSE_SPLIT = re.compile(r"([?!;\n]+|[.,]+(?!\d)|\s+(?:but|though|although|except)\s+)", re.IGNORECASE)
+_QUESTION_START = re.compile(
+    r"^\s*(?:(?:so|and|also|well|ok|okay|now)\s+)?(?:do|does|did|can|could|would|will|is|are|was|were|what|how|why"
+    r"|which|who|if|when|should|may|might|whether|any)\b",
+    re.IGNORECASE
+)
+_FIRST_PERSON = re.compile(
+    r"\b(?:i\s+(?:have|had|got|suffer|live|am|was\s+(?:diagnosed|treated)|take|manage|still|also|no\s+longer|never"
+    r"|do\s+not|don't|dont|haven't|havent|have\s+not)|i'm|i've|im|ive)\b",
+    re.IGNORECASE
+)
+_OTHER_PEOPLE = (
+    r"famil\w*|father|mother|dad|mom|wife|husband|spouse|partner|brother|sister|son|daughter|parents?|kids?"
+    r"|children|friends?|people|person|someone|anyone|everyone|he|she|his|her"
+)
+_THIRD_PARTY = re.compile(rf"\b(?:{_OTHER_PEOPLE})\b", re.IGNORECASE)
+# Conditions are stricter: they need a first-person subject and no topic words in between
+_NOT_ABOUT_ME = re.compile(
+    rf"\b(?:about|regarding|questions?|whether|if|cover\w*|polic\w*|insur\w*|{_OTHER_PEOPLE})\b",
+    re.IGNORECASE
+)
+_NEGATION = re.compile(
+    r"\b(?:no|not|never|don't|dont|haven't|havent|without|free\s+of|cleared\s+of|remission)\b",
+    re.IGNORECASE
+)
+_CONDITION_FREE = re.compile(r"[\s-]*free\b", re.IGNORECASE)
+_NO_CONDITIONS = re.compile(
+    r"\b(?:no|not\s+any|don't\s+have\s+any|do\s+not\s+have\s+any)\s+(?:health|medical|pre-?existing)\s+"
+    r"(?:conditions?|issues?|problems?)\b",
+    re.IGNORECASE
+)
+
+_COVERAGE = re.compile(
+    r"\$\s?(\d[\d,]*(?:\.\d+)?)\s*(k|m|thousand|million)?\b"
+    r"|\b(\d[\d,]*(?:\.\d+)?)\s*(k|m|thousand|million)\b",
+    re.IGNORECASE
+)
+_MULTIPLIERS = {"k": 1_000, "thousand": 1_000, "m": 1_000_000, "million": 1_000_000}
+
+_TERM = re.compile(
+    r"\b(\d{1,2})[\s-]*(?:year|yr)s?[\s-]+term\b|\bterm\s+(?:of|for)\s+(\d{1,2})\s+years\b"
+    r"|\b(?:cover(?:age)?|protect\w*)\s+(?:me\s+|us\s+|them\s+)?for\s+(\d{1,2})\s+years\b",
+    re.IGNORECASE
+)
+
+_DEPENDENTS = re.compile(
+    r"\b(\d|one|two|three|four|five|six)\s+(?:young\s+|little\s+)?(?:kids|children|dependents|sons|daughters)\b",
+    re.IGNORECASE
+)
+
+_GOALS = {
+    "income replacement": re.compile(r"\b(?:replace\s+(?:my\s+)?income|income\s+replacement|salary)\b", re.IGNORECASE),
+    "mortgage": re.compile(r"\bmortgage\b", re.IGNORECASE),
+    "education": re.compile(r"\b(?:college|tuition|education)\b", re.IGNORECASE),
+    "final expenses": re.compile(r"\b(?:funeral|burial|final\s+expenses?)\b", re.IGNORECASE),
+    "estate planning": re.compile(r"\b(?:estate|inheritance|legacy)\b", re.IGNORECASE),
+    "retirement": re.compile(r"\bretire\w*", re.IGNORECASE),
+}
+
+# Applicant profile of the session whose turn runs in the current context
+current_applicant: ContextVar[Optional["ApplicantProfile"]] = ContextVar("current_applicant", default=None)
+
+
+def extract_age(message: str) -> Optional[int]:
+    """Pull an applicant age out of free text, if one is stated"""
+    match = _AGE_PATTERN.search(message)
+    if match is None:
+        return None
+    return int(match.group(1) or match.group(2))
+
+
+def _statements(message: str) -> Iterator[str]:
+    """Clauses of a message that state something rather than ask it"""
+    parts = _CLAUSE_SPLIT.split(message)
+    for clause, delimiter in zip(parts[::2], parts[1::2] + [""]):
+        if clause.strip() and "?" not in delimiter and not _QUESTION_START.match(clause):
+            yield clause
+
+
+def _about_applicant(clause: str, match: "re.Match[str]") -> bool:
+    """False when someone else is named before the match without a first-person subject after them"""
+    others = [other.start() for other in _THIRD_PARTY.finditer(clause, 0, match.start())]
+    if not others:
+        return True
+    subjects = [subject.start() for subject in _FIRST_PERSON.finditer(clause, 0, match.end())]
+    return bool(subjects) and subjects[-1] > others[-1]
+
+
+def _stated(pattern: Pattern[str], message: str) -> Iterator["re.Match[str]"]:
+    """Matches of pattern in statements the customer makes about themselves"""
+    for clause in _statements(message):
+        for match in pattern.finditer(clause):
+            if _about_applicant(clause, match):
+                yield match
+
+
+def stated_conditions(message: str) -> Tuple[Set[str], Set[str], bool]:
+    """Conditions a message says the customer has and does not have, and whether it says they have none"""
+    present: Set[str] = set()
+    absent: Set[str] = set()
+    cleared = False
+    for clause in _statements(message):
+        if _NO_CONDITIONS.search(clause) and _FIRST_PERSON.search(clause):
+            cleared = True
+        for name, pattern in _CONDITIONS.items():
+            condition = pattern.search(clause)
+            if condition is None:
+                continue
+            subjects = list(_FIRST_PERSON.finditer(clause, 0, condition.start()))
+            if not subjects:
+                continue
+            between = clause[subjects[-1].start():condition.start()]
+            if _NOT_ABOUT_ME.search(between):
+                continue
+            if _NEGATION.search(between) or _CONDITION_FREE.match(clause, condition.end()):
+                absent.add(name)
+            else:
+                present.add(name)
+    return present, absent - present, cleared
+
+
+def _parse_amount(digits: str, unit: Optional[str]) -> Optional[int]:
+    try:
+        value = float(digits.replace(",", ""))
+    except ValueError:
+        return None
+    return int(value * _MULTIPLIERS.get((unit or "").lower(), 1))
+
+
+class ApplicantProfile:
+    """
+    What the customer has said about themselves, accumulated across turns
+    Fields are filled by update() from each message with local pattern matching
+    (no LLM call); later statements override earlier ones. Age, smoking, health,
+    conditions, coverage and dependents only come from first-person statements.
+    Stored in the session context as a plain dict so it survives the cold session tier.
+    """
+
+    __slots__ = ("age", "smoker", "health", "conditions", "coverage_amount", "term_years", "dependents", "goals")
+
+    def __init__(self):
+        self.age: Optional[int] = None
+        self.smoker: Optional[bool] = None
+        self.health: Optional[str] = None
+        self.conditions: List[str] = []
+        self.coverage_amount: Optional[int] = None
+        self.term_years: Optional[int] = None
+        self.dependents: Optional[int] = None
+        self.goals: List[str] = []
+
+    def update(self, message: str) -> List[str]:
+        """Extract applicant details from a message; returns the fields that changed"""
+        changed = []
+
+        def assign(name: str, value: Any) -> None:
+            if value is not None and value != getattr(self, name):
+                setattr(self, name, value)
+                changed.append(name)
+
+        for match in _stated(_AGE_PATTERN, message):
+            age = int(match.group(1) or match.group(2))
+            if 0 < age < 120:
+                assign("age", age)
+                break
+
+        if next(_stated(_NON_SMOKER, message), None):
+            assign("smoker", False)
+        elif next(_stated(_SMOKER, message), None):
+            assign("smoker", True)
+
+        rating = next(_stated(_HEALTH_RATING, message), None)
+        if rating:
+            assign("health", {"great": "excellent", "average": "fair", "bad": "poor"}.get(
+                rating.group(1).lower(), rating.group(1).lower()))
+
+        present, absent, cleared = stated_conditions(message)
+        if present or absent or cleared:
+            kept = set() if cleared else set(self.conditions) - absent
+            assign("conditions", sorted(kept | present))
+
+        for match in _stated(_COVERAGE, message):
+            digits, unit = match.group(1) or match.group(3), match.group(2) or match.group(4)
+            amount = _parse_amount(digits, unit)
+            # Premium budgets ("$50 a month") are far below any face amount
+            if amount is not None and amount >= 10_000:
+                assign("coverage_amount", amount)
+                break
+
+        term = _TERM.search(message)
+        if term:
+            years = int(term.group(1) or term.group(2) or term.group(3))
+            if 5 <= years <= 40:
+                assign("term_years", years)
+
+        dependents = next(_stated(_DEPENDENTS, message), None)
+        if dependents:
+            count = dependents.group(1).lower()
+            assign("dependents", int(count) if count.isdigit() else _NUMBER_WORDS[count])
+
+        goals = [name for name, pattern in _GOALS.items() if pattern.search(message)]
+        assign("goals", self.goals + [goal for goal in goals if goal not in self.goals] if goals else None)
+        return changed
+
+    def is_empty(self) -> bool:
+        return not self.to_dict()
+
+    def health_status(self) -> Optional[str]:
+        """Health as EligibilityTool describes it"""
+        parts = []
+        if self.health:
+            parts.append(f"{self.health} health")
+        if self.conditions:
+            parts.append(", ".join(self.conditions))
+        if self.smoker is not None:
+            parts.append("smoker" if self.smoker else "non-smoker")
+        return "; ".join(parts) or None
+
+    def summary(self) -> str:
+        """One compact line for the prompt"""
+        parts = []
+        if self.age is not None:
+            parts.append(f"age {self.age}")
+        health = self.health_status()
+        if health:
+            parts.append(health)
+        if self.coverage_amount is not None:
+            parts.append(f"wants ${self.coverage_amount:,} coverage")
+        if self.term_years is not None:
+            parts.append(f"{self.term_years}-year term")
+        if self.dependents is not None:
+            parts.append(f"{self.dependents} dependents")
+        if self.goals:
+            parts.append(f"goals: {', '.join(self.goals)}")
+        return "; ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            name: getattr(self, name) for name in self.__slots__
+            if getattr(self, name) not in (None, [])
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ApplicantProfile":
+        profile = cls()
+        for name, value in (data or {}).items():
+            if name in cls.__slots__:
+                setattr(profile, name, list(value) if isinstance(value, (list, tuple)) else value)
+        return profile
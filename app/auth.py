@@ -0,0 +1,10 @@
+import hmac
+from typing import Optional
+
+from config.settings import settings
+
+
+def authorized(admin_token: Optional[str]) -> bool:
+    """Whether an X-Admin-Token header value matches the configured admin_token"""
+    expected = settings.admin_token or settings.profiling_admin_token
+    return bool(expected and admin_token and hmac.compare_digest(admin_token, expected))
@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import sys
 from typing import Optional
@@ -12,16 +13,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# ✅ CORRECT IMPORTS FOR LANGCHAIN 0.2.x
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-# from langchain.chains import create_history_aware_retriever, create_retrieval_chain
-# from langchain.chains.history_aware_retriever import create_history_aware_retriever
-# from langchain.chains.retrieval import create_retrieval_chain
-# from langchain.chains.combine_documents import create_stuff_documents_chain
-from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
+# LangChain is imported by the local agent only, so --remote starts without it
 
 # Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
@@ -46,6 +38,8 @@ class InsuranceAgent:
     """
     
     def __init__(self):
+        from langchain_openai import ChatOpenAI
+        
         self.sessions = {}
         self.knowledge_base = self._load_knowledge_base()
         
@@ -110,6 +104,8 @@ class InsuranceAgent:
     
     def _get_or_create_session(self, session_id, user_id):
         """Get existing session or create new one"""
+        from langchain_community.chat_message_histories import ChatMessageHistory
+        
         if session_id is None:
             session_id = str(uuid.uuid4())
         
@@ -144,6 +140,8 @@ class InsuranceAgent:
     
     def process_message(self, user_id: str, message: str, session_id: str = None):
         """Process user message and return response"""
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+        
         # Get or create session
         session_id = self._get_or_create_session(session_id, user_id)
         session_data = self.sessions[session_id]
@@ -204,8 +202,15 @@ class CLIInterface:
     Provides an interactive way to test the agent
     """
     
-    def __init__(self):
-        self.agent = InsuranceAgent()
+    def __init__(self, remote_url: Optional[str] = None, tenant: Optional[str] = None):
+        # With a remote URL the CLI is a thin client of the server; otherwise it runs its own agent
+        self.remote = None
+        self.agent = None
+        if remote_url:
+            from app.remote_client import RemoteChatClient
+            self.remote = RemoteChatClient(remote_url, tenant=tenant)
+        else:
+            self.agent = InsuranceAgent()
         self.current_session_id: Optional[str] = None
         self.user_id = "cli_user"
         self.running = True
@@ -238,6 +243,16 @@ class CLIInterface:
     
     def display_session_info(self):
         """Display current session information"""
+        if self.remote is not None:
+            info = self.remote.session_info(self.current_session_id) if self.current_session_id else None
+            if info is None:
+                print(Fore.YELLOW + "\nNo active session")
+                return
+            print(Fore.CYAN + "\nCurrent Session:")
+            print(Fore.WHITE + f"  ID: {self.current_session_id}")
+            print(Fore.WHITE + f"  Created: {info['created_at']}")
+            print(Fore.WHITE + f"  Messages: {info['message_count']}")
+            return
         if self.current_session_id and self.current_session_id in self.agent.sessions:
             session_data = self.agent.sessions[self.current_session_id]
             print(Fore.CYAN + "\nCurrent Session:")
@@ -250,7 +265,10 @@ class CLIInterface:
     
     def get_policy_types(self):
         """Display available policy types"""
-        policy_types = list(self.agent.knowledge_base.get("policy_types", {}).keys())
+        if self.remote is not None:
+            policy_types = self.remote.policy_types()["policy_types"]
+        else:
+            policy_types = list(self.agent.knowledge_base.get("policy_types", {}).keys())
         print(Fore.CYAN + "\nAvailable Policy Types:")
         for pt in policy_types:
             formatted = pt.replace("_", " ").title()
@@ -303,6 +321,9 @@ class CLIInterface:
     
     def process_message(self, message: str):
         """Process a user message and display response"""
+        if self.remote is not None:
+            self.stream_message(message)
+            return
         try:
             response = self.agent.process_message(
                 user_id=self.user_id,
@@ -322,6 +343,27 @@ class CLIInterface:
             print(Fore.RED + f"Error: {str(e)}")
             print()
     
+    def stream_message(self, message: str):
+        """Send a message to the server and render the answer as it arrives"""
+        try:
+            print(Fore.GREEN + "Assistant: " + Fore.WHITE, end="", flush=True)
+            for event in self.remote.stream_chat(self.user_id, message, self.current_session_id):
+                kind = event.get("event")
+                if kind == "start":
+                    self.current_session_id = event["session_id"]
+                elif kind == "tool":
+                    print(Style.DIM + f"[{event['tool']}] " + Style.NORMAL, end="", flush=True)
+                elif kind == "delta":
+                    print(event["text"], end="", flush=True)
+                elif kind == "done" and not event.get("ok", True):
+                    print(Fore.RED + f"Error: {event.get('error')}", end="")
+            print()
+            print()
+        except Exception as e:
+            print()
+            print(Fore.RED + f"Error: {str(e)}")
+            print()
+    
     def start_new_conversation(self):
         """Start a new conversation with a new session"""
         self.current_session_id = None
@@ -332,12 +374,18 @@ class CLIInterface:
         """Quit the application"""
         print(Fore.YELLOW + "Thank you for using Life Insurance Support Assistant. Goodbye!")
         self.running = False
+        if self.remote is not None:
+            self.remote.close()
         sys.exit(0)
 
 def main():
     """Main entry point for CLI interface"""
+    parser = argparse.ArgumentParser(description="Life insurance support assistant CLI")
+    parser.add_argument("--remote", metavar="URL", help="talk to a running server instead of a local agent")
+    parser.add_argument("--tenant", help="carrier catalog to use on the server (remote mode)")
+    args = parser.parse_args()
     try:
-        cli = CLIInterface()
+        cli = CLIInterface(args.remote, args.tenant)
         cli.start_conversation()
     except Exception as e:
         print(Fore.RED + f"Application error: {str(e)}")
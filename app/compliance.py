@@ -0,0 +1,219 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Text carried across chunks for matches that straddle them. Word repeats are
+# bounded, but the \s+ between words is not, so a match stretched past this
+# many characters by a long whitespace run can be missed at a chunk boundary
+_WINDOW = 96
+
+# Pending text is scanned once this much has arrived
+_SCAN_CHARS = 256
+
+GUARANTEE_NOTICE = (
+    "Approval, premiums and investment returns depend on underwriting and market "
+    "conditions and are not guaranteed unless your policy contract says so."
+)
+
+CONSULT_NOTICE = "For advice on your specific situation, please consult a licensed insurance professional."
+
+
+@dataclass(frozen=True)
+class ComplianceRule:
+    """
+    One compiled compliance check
+    A "prohibited" rule flags a violation whenever its trigger matches. A
+    "disclosure" or "consult" rule appends its notice when the trigger matches
+    and the answer does not already satisfy it.
+    """
+    name: str
+    kind: str
+    trigger: str
+    notice: str
+    satisfied_by: Optional[str] = None
+    source: Optional[str] = None
+
+
+# Claims an agent must never make
+PROHIBITED_RULES = (
+    ComplianceRule(
+        "guaranteed_approval", "prohibited",
+        r"\bguarantee[ds]?\s+(?:that\s+)?(?:you(?:'ll|\s+will)\s+(?:be\s+)?)?(?:approv\w{0,5}|accept\w{0,5}|qualify)\b"
+        r"|\b(?:definitely|certainly|surely)\s+(?:be\s+)?(?:approved|accepted|qualify)\b",
+        GUARANTEE_NOTICE
+    ),
+    ComplianceRule(
+        "guaranteed_returns", "prohibited",
+        r"\bguarantee[ds]?\s+(?:\w{1,15}\s+){0,2}(?:investment\s+)?(?:returns?|gains?|profits?)\b"
+        r"|\brisk[- ]free\b|\bcan(?:not|'t)\s+lose\s+(?:money|value)\b",
+        GUARANTEE_NOTICE
+    ),
+    ComplianceRule(
+        "guaranteed_lowest_price", "prohibited",
+        r"\bguarantee[ds]?\s+(?:you\s+)?(?:the\s+)?(?:lowest|cheapest|best)\s+(?:price|rate|premium)s?\b"
+        r"|\b(?:lowest|cheapest|best)\s+(?:price|rate|premium)s?\s+guaranteed\b",
+        GUARANTEE_NOTICE
+    ),
+)
+
+# Disclosures keyed by a phrase of the regulatory_information entry that requires them;
+# a rule is only active when the catalog contains that entry
+DISCLOSURE_RULES = (
+    ComplianceRule(
+        "investment_risk", "disclosure",
+        r"\bvariable\s+(?:universal\s+)?(?:life|polic\w{1,4})\b|\bsub-?accounts?\b|\bmarket\s+(?:returns?|performance)\b",
+        "Variable policies carry investment risk: cash values can fall as well as rise, and you can lose money.",
+        satisfied_by=r"\b(?:investment|market)\s+risks?\b|\blose\s+money\b",
+        source="investment risks"
+    ),
+    ComplianceRule(
+        "surrender_charges", "disclosure",
+        r"\bsurrender\w{0,3}\b|\bcash(?:ing)?\s+(?:it\s+)?out\b|\bwithdraw\w{0,4}\s+(?:the\s+)?cash\s+value\b",
+        "Surrendering a policy or withdrawing its cash value early may incur surrender charges and taxes.",
+        satisfied_by=r"\bsurrender\s+(?:charges?|fees?|penalt\w{1,3})\b",
+        source="surrender charges"
+    ),
+    ComplianceRule(
+        "policy_exclusions", "disclosure",
+        r"\bexclu\w{1,6}\b|\bsuicide\s+clause\b|\bcontestab\w{1,6}\b|\bnot\s+covered\b",
+        "Every policy has exclusions; read the exclusions section of your contract before you buy.",
+        satisfied_by=r"\bexclusions\s+section\b",
+        source="exclusions"
+    ),
+    ComplianceRule(
+        "material_facts", "disclosure",
+        r"\bapplication\b|\bunderwrit\w{1,4}\b|\bmedical\s+exam\w{0,6}\b",
+        "Answer every application question fully and accurately; undisclosed material facts can lead to a denied claim.",
+        satisfied_by=r"\bmaterial\s+facts?\b",
+        source="material facts"
+    ),
+    ComplianceRule(
+        "free_look", "disclosure",
+        r"\bcancel\w{0,6}\b|\brefund\w{0,3}\b",
+        "Most states give you a free look period (typically 10-30 days) to cancel a new policy for a full refund.",
+        satisfied_by=r"\bfree[- ]look\b",
+        source="free look"
+    ),
+)
+
+# Topics that need personal advice beyond general information
+CONSULT_RULE = ComplianceRule(
+    "licensed_professional", "consult",
+    r"\btax\w{0,6}\b|\bestate\s+plan\w{0,5}\b|\btrusts?\b|\blegal\w{0,3}\b|\bpre-?existing\b"
+    r"|\bmedical\s+conditions?\b|\binherit\w{0,6}\b|\breplac\w{1,4}\s+(?:your|an?|my)\s+(?:existing\s+)?polic\w{1,3}\b",
+    CONSULT_NOTICE,
+    satisfied_by=r"\blicensed\s+(?:insurance\s+)?(?:professional|agent|advis[oe]r|producer)s?\b"
+    r"|\b(?:tax|financial)\s+advis[oe]rs?\b|\battorney\b"
+)
+
+
+@dataclass
+class ComplianceReport:
+    """Outcome of scanning one answer"""
+    violations: List[str] = field(default_factory=list)
+    disclosures: List[str] = field(default_factory=list)
+    notices: List[str] = field(default_factory=list)
+
+    def apply(self, text: str) -> str:
+        """The answer with the required notices appended"""
+        if not self.notices:
+            return text
+        return text.rstrip() + "\n\n" + "\n".join(self.notices)
+
+
+class ComplianceScan:
+    """
+    Incremental scan of one answer
+    feed() takes the answer in any pieces (e.g. streamed tokens) and only keeps
+    a short tail between scans, so memory does not grow with the answer
+    """
+
+    def __init__(self, compliance_filter: "ComplianceFilter"):
+        self._filter = compliance_filter
+        self._carry = ""
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._hits = set()
+
+    def feed(self, text: str) -> None:
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        if self._pending_chars >= _SCAN_CHARS:
+            self._scan()
+
+    def finish(self) -> ComplianceReport:
+        self._scan()
+        return self._filter.report(self._hits)
+
+    def _scan(self) -> None:
+        if not self._pending:
+            return
+        text = self._carry + "".join(self._pending)
+        # A cut tail keeps one extra character that is only look-behind context, so
+        # a tail starting mid-word ("syn|tax") does not look like a word start.
+        # Matches inside the tail were already seen; hits are a set, so re-finding them is harmless
+        start = 1 if len(self._carry) > _WINDOW else 0
+        for match in self._filter.pattern.finditer(text, start):
+            self._hits.add(match.lastgroup)
+        self._carry = text[-(_WINDOW + 1):]
+        self._pending = []
+        self._pending_chars = 0
+
+
+class ComplianceFilter:
+    """
+    Compiled compliance pattern set for one knowledge catalog
+    All rule triggers and satisfaction patterns are merged into a single
+    case-insensitive regular expression with one named group per pattern, so an
+    answer is scanned once however many rules the catalog activates.
+    """
+
+    def __init__(self, rules: Tuple[ComplianceRule, ...]):
+        self.rules = {rule.name: rule for rule in rules}
+        groups = []
+        for rule in rules:
+            # Satisfaction first: "surrender charges" must not be consumed as a bare "surrender" trigger
+            if rule.satisfied_by is not None:
+                groups.append(f"(?P<{rule.name}__ok>{rule.satisfied_by})")
+            groups.append(f"(?P<{rule.name}>{rule.trigger})")
+        # Every pattern starts a word; gating on word starts skips the alternation inside words
+        self.pattern = re.compile(r"(?<!\w)(?=\w)(?:" + "|".join(groups) + ")", re.IGNORECASE)
+
+    @classmethod
+    def from_knowledge(cls, regulatory_information: Optional[Dict[str, Any]]) -> "ComplianceFilter":
+        """Prohibited and consult rules plus the disclosures this catalog requires"""
+        entries = " ".join(
+            str(entry).lower()
+            for values in (regulatory_information or {}).values()
+            for entry in (values if isinstance(values, list) else [values])
+        )
+        active = tuple(rule for rule in DISCLOSURE_RULES if rule.source in entries)
+        return cls(PROHIBITED_RULES + active + (CONSULT_RULE,))
+
+    def scan(self) -> ComplianceScan:
+        """Start scanning an answer"""
+        return ComplianceScan(self)
+
+    def check(self, text: str) -> ComplianceReport:
+        """Scan a complete answer"""
+        scan = self.scan()
+        scan.feed(text)
+        return scan.finish()
+
+    def report(self, hits) -> ComplianceReport:
+        report = ComplianceReport()
+        for name, rule in self.rules.items():
+            if name not in hits:
+                continue
+            if rule.kind == "prohibited":
+                report.violations.append(name)
+            elif f"{name}__ok" in hits:
+                continue
+            else:
+                report.disclosures.append(name)
+            if rule.notice not in report.notices:
+                report.notices.append(rule.notice)
+        return report
@@ -0,0 +1,59 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class _TurnQueue:
+    """Ticket lock for one key: holders are admitted in arrival order"""
+
+    __slots__ = ("condition", "next_ticket", "serving", "refs")
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.next_ticket = 0
+        self.serving = 0
+        self.refs = 0
+
+
+class KeyedLock:
+    """
+    Per-key FIFO mutual exclusion
+    Work for the same key (e.g. a session_id) is serialized in arrival order
+    while different keys proceed in parallel. A key's queue is created on
+    demand and dropped as soon as nothing holds or waits on it.
+    """
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._queues: Dict[str, _TurnQueue] = {}
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        """Hold the lock for key, waiting behind earlier arrivals"""
+        with self._guard:
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = _TurnQueue()
+            queue.refs += 1
+
+        with queue.condition:
+            ticket = queue.next_ticket
+            queue.next_ticket += 1
+            while queue.serving != ticket:
+                queue.condition.wait()
+
+        try:
+            yield
+        finally:
+            with queue.condition:
+                queue.serving += 1
+                queue.condition.notify_all()
+            with self._guard:
+                queue.refs -= 1
+                if queue.refs == 0:
+                    del self._queues[key]
+
+    def __len__(self) -> int:
+        """Number of keys currently held or waited on"""
+        with self._guard:
+            return len(self._queues)
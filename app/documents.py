@@ -0,0 +1,359 @@
+import codecs
+import logging
+import math
+import re
+import sys
+import tempfile
+import threading
+import uuid
+import zlib
+from array import array
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .metrics import metrics
+
+try:
+    import pypdf
+except ImportError:  # PDF ingestion is optional; text documents always work
+    pypdf = None
+
+logger = logging.getLogger(__name__)
+
+# Document index of the session whose turn is running in the current context
+current_documents: ContextVar[Optional["DocumentIndex"]] = ContextVar("current_documents", default=None)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in is it its my of on or our that the this to was "
+    "we what when which will with you your does do i me can".split()
+)
+
+# Headings: Markdown, "SECTION 4 ...", "4.2 Exclusions", or short all-caps lines
+KEYWORD_HEADING = re.compile(r"^(section|article|part|schedule|endorsement|rider|exhibit)\b.{0,80}$", re.IGNORECASE)
+STRUCTURAL_HEADING = re.compile(r"^(#{1,6}\s+.{1,100}|\d+(\.\d+)*[.)]?\s+[A-Z][^.]{0,80}|[A-Z][A-Z0-9 ,&'()/-]{3,80})$")
+
+PDF_CONTENT_TYPE = "application/pdf"
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+class DocumentTooLarge(ValueError):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+def is_heading(line: str) -> bool:
+    return bool(KEYWORD_HEADING.match(line) or STRUCTURAL_HEADING.match(line))
+
+
+class SectionSplitter:
+    """
+    Splits streamed text into sections at heading lines
+    Only the current line fragment and section are buffered; sections longer
+    than max_chars are cut at a line boundary and continue under the same title
+    """
+
+    def __init__(self, max_chars: int = 2000, default_title: str = "Preamble"):
+        self.max_chars = max_chars
+        self._pending = ""
+        self._title = default_title
+        self._lines: List[str] = []
+        self._size = 0
+
+    def feed(self, text: str) -> Iterator[Tuple[str, str]]:
+        """Completed (title, text) sections for the next chunk of text"""
+        self._pending += text
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            yield from self._line(line)
+
+    def finish(self) -> Iterator[Tuple[str, str]]:
+        if self._pending:
+            yield from self._line(self._pending)
+            self._pending = ""
+        yield from self._flush()
+
+    def _line(self, line: str) -> Iterator[Tuple[str, str]]:
+        stripped = line.strip()
+        if not stripped:
+            if self._lines:
+                self._lines.append("")
+            return
+        if is_heading(stripped):
+            yield from self._flush()
+            self._title = stripped.lstrip("#").strip()
+            return
+        if self._size + len(stripped) > self.max_chars and self._lines:
+            yield from self._flush()
+        self._lines.append(stripped)
+        self._size += len(stripped) + 1
+
+    def _flush(self) -> Iterator[Tuple[str, str]]:
+        text = "\n".join(self._lines).strip()
+        self._lines = []
+        self._size = 0
+        if text:
+            yield self._title, text
+
+
+class _Section:
+    __slots__ = ("document_id", "title", "compressed", "length")
+
+    def __init__(self, document_id: str, title: str, text: str, length: int):
+        self.document_id = document_id
+        self.title = title
+        self.compressed = zlib.compress(text.encode("utf-8"), 1)
+        self.length = length
+
+    def text(self) -> str:
+        return zlib.decompress(self.compressed).decode("utf-8")
+
+
+class DocumentIngestor:
+    """
+    Incremental ingestion of one uploaded document
+    Text is decoded and sectioned chunk by chunk; PDFs are spooled (to disk past
+    spool_bytes) because their page table sits at the end of the file. Nothing
+    is searchable until finish() publishes the document in one step.
+    """
+
+    def __init__(self, index: "DocumentIndex", name: str, content_type: str = "text/plain",
+                 max_bytes: int = 20 * 1024 * 1024, spool_bytes: int = 1024 * 1024, section_chars: int = 2000):
+        self.index = index
+        self.document_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+        self.sections: List[_Section] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._splitter = SectionSplitter(section_chars)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._spool = None
+        if content_type.split(";")[0].strip().lower() == PDF_CONTENT_TYPE:
+            if pypdf is None:
+                raise ValueError("PDF support requires the pypdf package")
+            self._spool = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+
+    def feed(self, chunk: bytes) -> None:
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self.max_bytes:
+            self.close()
+            raise DocumentTooLarge(f"Document exceeds {self.max_bytes} bytes")
+        if self._spool is not None:
+            self._spool.write(chunk)
+            return
+        self._add(self._splitter.feed(self._decoder.decode(chunk)))
+
+    def finish(self) -> Dict[str, Any]:
+        """Section the remaining input and publish the document to the index"""
+        if self._spool is not None:
+            self._spool.seek(0)
+            try:
+                for page in pypdf.PdfReader(self._spool).pages:
+                    self._add(self._splitter.feed((page.extract_text() or "") + "\n"))
+            except pypdf.errors.PdfReadError as e:
+                raise ValueError(f"Unreadable PDF: {str(e)}")
+            finally:
+                self.close()
+        else:
+            self._add(self._splitter.feed(self._decoder.decode(b"", final=True)))
+        self._add(self._splitter.finish())
+        return self.index.publish(self)
+
+    def close(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    def _add(self, sections: Iterator[Tuple[str, str]]) -> None:
+        for title, text in sections:
+            tokens = tokenize(f"{title}\n{text}")
+            local_id = len(self.sections)
+            self.sections.append(_Section(self.document_id, title, text, len(tokens)))
+            for token in tokens:
+                counts = self.postings.setdefault(token, {})
+                counts[local_id] = counts.get(local_id, 0) + 1
+
+
+class DocumentIndex:
+    """
+    BM25 inverted index over one session's uploaded documents
+    Section text is kept zlib-compressed; postings are flat arrays of
+    (section id, term frequency) pairs that are scored with NumPy in place
+    """
+
+    def __init__(self, max_documents: int = 10):
+        self.max_documents = max_documents
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self._sections: List[_Section] = []
+        self._postings: Dict[str, array] = {}
+        self._lengths = array("I")
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def ingestor(self, name: str, content_type: str = "text/plain", **limits: Any) -> DocumentIngestor:
+        if len(self.documents) >= self.max_documents:
+            raise ValueError(f"A session can hold at most {self.max_documents} documents")
+        return DocumentIngestor(self, name, content_type, **limits)
+
+    def publish(self, ingestor: DocumentIngestor) -> Dict[str, Any]:
+        """Merge a finished document's sections and postings into the index"""
+        with self._lock:
+            if len(self.documents) >= self.max_documents:
+                raise ValueError(f"A session can hold at most {self.max_documents} documents")
+            offset = len(self._sections)
+            self._sections.extend(ingestor.sections)
+            self._lengths.extend(section.length for section in ingestor.sections)
+            for token, counts in ingestor.postings.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = array("I")
+                for local_id, count in counts.items():
+                    postings.append(offset + local_id)
+                    postings.append(count)
+            self._total_length += sum(section.length for section in ingestor.sections)
+            info = {
+                "document_id": ingestor.document_id,
+                "name": ingestor.name,
+                "bytes": ingestor.bytes_read,
+                "sections": len(ingestor.sections),
+            }
+            self.documents[ingestor.document_id] = info
+        metrics.increment("documents_ingested")
+        metrics.increment("document_bytes_ingested", ingestor.bytes_read)
+        return info
+
+    def search(self, query: str, limit: int = 3, snippet_chars: int = 400) -> List[Dict[str, Any]]:
+        """Best-matching sections with a snippet around the first query term"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            if not self._sections:
+                return []
+            scores = self._scores(terms)
+            best = np.argpartition(-scores, limit)[:limit] if len(scores) > limit else np.arange(len(scores))
+            best = best[np.argsort(-scores[best])]
+            hits = [(self._sections[section_id], float(scores[section_id])) for section_id in best if scores[section_id] > 0]
+
+        results = []
+        for section, score in hits:
+            results.append({
+                "document": self.documents[section.document_id]["name"],
+                "section": section.title,
+                "score": round(score, 3),
+                "snippet": _snippet(section.text(), terms, snippet_chars),
+            })
+        return results
+
+    def _scores(self, terms: set) -> np.ndarray:
+        """BM25 score of every section; the caller holds the lock while the arrays are viewed"""
+        count = len(self._sections)
+        lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+        normalization = K1 * (1 - B + B * lengths / (self._total_length / count))
+        scores = np.zeros(count)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            pairs = np.frombuffer(postings, dtype=np.uint32).reshape(-1, 2)
+            section_ids = pairs[:, 0]
+            tf = pairs[:, 1].astype(np.float64)
+            idf = math.log(1 + (count - len(pairs) + 0.5) / (len(pairs) + 0.5))
+            scores += np.bincount(
+                section_ids,
+                weights=idf * tf * (K1 + 1) / (tf + normalization[section_ids]),
+                minlength=count
+            )
+        return scores
+
+    def approx_size(self) -> int:
+        """Approximate bytes held by sections and postings"""
+        with self._lock:
+            size = sum(sys.getsizeof(section.compressed) + sys.getsizeof(section.title) + 64 for section in self._sections)
+            size += sum(sys.getsizeof(token) + postings.buffer_info()[1] * postings.itemsize + 64
+                        for token, postings in self._postings.items())
+            size += self._lengths.buffer_info()[1] * self._lengths.itemsize
+        return size
+
+    def names(self) -> List[str]:
+        return [info["name"] for info in self.documents.values()]
+
+
+def _snippet(text: str, terms: set, width: int) -> str:
+    lowered = text.lower()
+    positions = [match.start() for match in TOKEN_PATTERN.finditer(lowered) if match.group() in terms]
+    start = max(0, (positions[0] if positions else 0) - width // 4)
+    snippet = text[start:start + width].strip()
+    return ("..." if start > 0 else "") + snippet + ("..." if start + width < len(text) else "")
+
+
+class DocumentStore:
+    """
+    Per-session document indexes, least recently used evicted past max_sessions
+    or once their combined approx_size passes max_bytes
+    """
+
+    def __init__(self, max_sessions: int = 1000, max_documents: int = 10, max_bytes: int = 256 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self._indexes: "OrderedDict[str, DocumentIndex]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        metrics.register_gauge("document_sessions", lambda: len(self._indexes))
+        metrics.register_gauge("document_store_bytes", lambda: self._bytes)
+
+    def get(self, session_id: str) -> Optional[DocumentIndex]:
+        with self._lock:
+            index = self._indexes.get(session_id)
+            if index is not None:
+                self._indexes.move_to_end(session_id)
+            return index
+
+    def get_or_create(self, session_id: str) -> DocumentIndex:
+        with self._lock:
+            index = self._indexes.get(session_id)
+            if index is None:
+                index = self._indexes[session_id] = DocumentIndex(self.max_documents)
+                while len(self._indexes) > self.max_sessions:
+                    self._evict_oldest()
+            self._indexes.move_to_end(session_id)
+            return index
+
+    def charge(self, session_id: str, index: DocumentIndex) -> None:
+        """Re-measure a session's index after an upload, evicting other sessions past max_bytes"""
+        size = index.approx_size()
+        with self._lock:
+            if self._indexes.get(session_id) is not index:
+                return  # discarded or evicted while the upload ran
+            self._bytes += size - self._sizes.get(session_id, 0)
+            self._sizes[session_id] = size
+            self._indexes.move_to_end(session_id)
+            while self._bytes > self.max_bytes and len(self._indexes) > 1:
+                self._evict_oldest()
+
+    def discard(self, session_id: str) -> None:
+        with self._lock:
+            self._indexes.pop(session_id, None)
+            self._bytes -= self._sizes.pop(session_id, 0)
+
+    def _evict_oldest(self) -> None:
+        """Drop the least recently used index; the caller holds the lock"""
+        evicted, _ = self._indexes.popitem(last=False)
+        self._bytes -= self._sizes.pop(evicted, 0)
+        metrics.increment("document_index_evictions")
+        logger.info(f"Evicted document index for session {evicted}")
+
+    def __len__(self) -> int:
+        return len(self._indexes)
@@ -0,0 +1,109 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from langchain.agents import AgentExecutor
+from langchain.callbacks.manager import CallbackManagerForChainRun
+from langchain.schema import AgentAction, AgentFinish
+from langchain.tools import BaseTool
+from langchain_core.agents import AgentStep
+
+from .profiling import profiled
+from .resilience import check_deadline, current_deadline
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Pools for concurrent tool calls, one per max_parallel_tools in use
+_pools: Dict[int, ThreadPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+
+def _tool_pool(max_workers: int) -> ThreadPoolExecutor:
+    """Shared pool of max_workers threads for concurrent tool calls, created on first use"""
+    with _pool_lock:
+        pool = _pools.get(max_workers)
+        if pool is None:
+            pool = _pools[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=f"tool-{max_workers}"
+            )
+        return pool
+
+
+class _PendingStep:
+    """Tool calls requested by one model step"""
+
+    __slots__ = ("actions", "futures")
+
+    def __init__(self):
+        self.actions: List[AgentAction] = []
+        self.futures: Optional[Dict[int, "Future[AgentStep]"]] = None
+
+
+# Model step being executed in the current context
+_current_step: ContextVar[Optional[_PendingStep]] = ContextVar("current_step", default=None)
+
+
+class ParallelAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that runs the independent tool calls of one model step concurrently
+    Observations are returned in the order the model requested them
+    """
+
+    max_parallel_tools: int = 4
+
+    def _should_continue(self, iterations: int, time_elapsed: float) -> bool:
+        deadline = current_deadline.get()
+        if deadline is not None and deadline.expired():
+            return False
+        return super()._should_continue(iterations, time_elapsed)
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[Any],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        # The base implementation yields every planned action before running any,
+        # so the whole batch is known by the first _perform_agent_action call
+        step = _PendingStep()
+        token = _current_step.set(step)
+        try:
+            with span("agent.step", {"agent.prior_steps": len(intermediate_steps)}):
+                for item in super()._iter_next_step(
+                    name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager
+                ):
+                    if isinstance(item, AgentAction):
+                        step.actions.append(item)
+                    yield item
+        finally:
+            _current_step.reset(token)
+
+    def _perform_agent_action(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        agent_action: AgentAction,
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> AgentStep:
+        check_deadline(f"tool {agent_action.tool}")
+        step = _current_step.get()
+        if step is None or len(step.actions) < 2:
+            return super()._perform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+
+        if step.futures is None:
+            pool = _tool_pool(self.max_parallel_tools)
+            perform = super()._perform_agent_action
+            step.futures = {
+                id(action): pool.submit(
+                    copy_context().run, profiled, perform, name_to_tool_map, color_mapping, action, run_manager
+                )
+                for action in step.actions
+            }
+            logger.debug(f"Running {len(step.actions)} tool calls in parallel")
+
+        return step.futures[id(agent_action)].result()
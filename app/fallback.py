@@ -0,0 +1,53 @@
+import logging
+from typing import Any, Dict, List
+
+from .applicant import extract_age
+from .knowledge import current_knowledge
+from .tools import ClaimsProcessTool, EligibilityTool, PolicyTypeTool, find_policy_types
+
+logger = logging.getLogger(__name__)
+
+DEGRADED_NOTICE = (
+    "Our assistant is responding slowly right now, so here is information "
+    "straight from our knowledge base:"
+)
+
+class KnowledgeFallback:
+    """
+    Answers directly from the knowledge-base tools when the LLM is unavailable
+    Content is selected by the query type from InsuranceAgent._classify_query
+    """
+
+    def __init__(self, knowledge_base: Dict[str, Any]):
+        self.policy_types: List[str] = list(knowledge_base.get("policy_types", {}).keys())
+        self.policy_tool = PolicyTypeTool()
+        self.claims_tool = ClaimsProcessTool()
+        self.eligibility_tool = EligibilityTool()
+
+    def answer(self, query_type: str, message: str) -> str:
+        """Build a knowledge-base answer for the message"""
+        try:
+            if query_type == "claims":
+                body = self.claims_tool._run()
+            elif query_type == "eligibility":
+                body = self.eligibility_tool._run(age=extract_age(message))
+            else:
+                body = self._policy_overview(message)
+        except Exception as e:
+            logger.error(f"Knowledge fallback failed: {str(e)}")
+            return (
+                "I apologize, but I'm having trouble processing your request. "
+                "Please try again or rephrase your question."
+            )
+        return f"{DEGRADED_NOTICE}\n\n{body}"
+
+    def _policy_overview(self, message: str) -> str:
+        """Describe the policy types the message mentions (or all of them)"""
+        knowledge = current_knowledge.get()
+        policy_types = knowledge.keys("policy_types") if knowledge is not None else self.policy_types
+        mentioned = find_policy_types(message, policy_types) or policy_types
+        sections = []
+        for policy_type in mentioned:
+            title = policy_type.replace("_", " ").title()
+            sections.append(f"{title}:\n{self.policy_tool._run(policy_type=policy_type)}")
+        return "\n\n".join(sections)
@@ -0,0 +1,192 @@
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Content types whose bodies are already compressed
+INCOMPRESSIBLE_TYPES = (b"application/zip", b"application/gzip", b"image/", b"video/")
+
+
+class _GzipEncoder:
+    def __init__(self, level: int = 6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int = 4):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported content coding from an Accept-Encoding header"""
+    offered = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        offered.add(coding.strip())
+    if brotli is not None and "br" in offered:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip response compression above a size threshold
+    Bodies smaller than minimum_size go out uncompressed; streamed bodies are
+    flushed chunk by chunk so streaming endpoints keep their latency
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        encoder: Any = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                response_headers = start_message.get("headers", [])
+                already_encoded = any(
+                    name.lower() == b"content-encoding"
+                    or (name.lower() == b"content-type" and value.startswith(INCOMPRESSIBLE_TYPES))
+                    for name, value in response_headers
+                )
+                if already_encoded or (not more_body and len(body) < self.minimum_size):
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+
+                encoder = _BrotliEncoder() if encoding == "br" else _GzipEncoder()
+                start_message["headers"] = _compressed_headers(response_headers, encoding)
+                await send(start_message)
+                start_message = None
+
+            if encoder is None:
+                await send(message)
+                return
+
+            if more_body:
+                chunk = encoder.compress(body) + encoder.flush()
+            else:
+                chunk = encoder.compress(body) + encoder.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _compressed_headers(headers: List[Tuple[bytes, bytes]], encoding: str) -> List[Tuple[bytes, bytes]]:
+    """Response headers for a compressed body"""
+    result = [(name, value) for name, value in headers if name.lower() != b"content-length"]
+    result.append((b"content-encoding", encoding.encode("latin-1")))
+    for position, (name, value) in enumerate(result):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower() and value.strip() != b"*":
+                result[position] = (name, value + b", Accept-Encoding")
+            break
+    else:
+        result.append((b"vary", b"Accept-Encoding"))
+    return result
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match covers the given entity tag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any(
+        (tag[2:] if tag.startswith("W/") else tag) == bare for tag in candidates
+    )
+
+
+class VersionedResponseCache:
+    """
+    Serialized responses that only change with a content version
+    Bodies are rendered once per (key, version) and served with an ETag and
+    Cache-Control; a matching If-None-Match gets an empty 304. Responses that
+    depend on a request header name it in vary, so shared caches key on it
+    """
+
+    def __init__(self, max_age: int = 300):
+        self.max_age = max_age
+        self._bodies: Dict[str, Tuple[str, bytes]] = {}
+
+    def respond(self, request: Request, key: str, version: str, build: Callable[[], Any],
+                vary: Optional[str] = None) -> Response:
+        etag = f'W/"{version}"'
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}"}
+        if vary:
+            headers["Vary"] = vary
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        cached = self._bodies.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, ORJSONResponse(build()).body)
+            self._bodies[key] = cached
+        return Response(content=cached[1], media_type="application/json", headers=headers)
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response whose body is produced while the request body is still being read
+    StreamingResponse listens for disconnects on receive(), which would swallow
+    request body messages; here a disconnect surfaces through request.stream()
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
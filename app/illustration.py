@@ -0,0 +1,217 @@
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE = 121
+
+# Product assumptions (rates are annual; loads are fractions of premium)
+PRODUCT_ASSUMPTIONS: Dict[str, Dict[str, float]] = {
+    "whole_life": {
+        "guaranteed_rate": 0.03,
+        "illustrated_rate": 0.05,  # guaranteed rate plus the current dividend scale
+        "premium_load": 0.08,
+    },
+    "universal_life": {
+        "guaranteed_rate": 0.02,
+        "illustrated_rate": 0.045,
+        "premium_load": 0.06,
+    },
+    "variable_life": {
+        "guaranteed_rate": 0.0,
+        "illustrated_rate": 0.06,  # hypothetical gross return
+        "premium_load": 0.05,
+        "fund_fee": 0.01,
+        "volatility": 0.15,
+    },
+}
+
+# Mortality multipliers by underwriting class
+HEALTH_CLASS_FACTORS = {
+    "preferred_plus": 0.65,
+    "preferred": 0.8,
+    "standard": 1.0,
+    "substandard": 1.5,
+}
+
+# Guaranteed cost of insurance is illustrated at the maximum charge
+GUARANTEED_COI_FACTOR = 1.25
+SMOKER_FACTOR = 2.0
+SURRENDER_CHARGE_YEARS = 10
+
+
+def mortality_rates(ages: np.ndarray, health_class: str = "standard", smoker: bool = False) -> np.ndarray:
+    """Annual death probabilities from a Gompertz-Makeham curve"""
+    hazard = 0.0005 + 0.00003 * np.power(1.1, ages)
+    hazard = hazard * HEALTH_CLASS_FACTORS.get(health_class, 1.0) * (SMOKER_FACTOR if smoker else 1.0)
+    rates = 1.0 - np.exp(-hazard)
+    rates[ages >= MAX_AGE - 1] = 1.0
+    return np.minimum(rates, 1.0)
+
+
+def corridor_factors(ages: np.ndarray) -> np.ndarray:
+    """Minimum death benefit as a multiple of cash value (simplified IRC 7702 corridor)"""
+    return np.interp(ages, [40, 45, 50, 55, 60, 65, 70, 75, 90, 95], [2.5, 2.15, 1.85, 1.5, 1.3, 1.2, 1.15, 1.05, 1.05, 1.0])
+
+
+def project(
+    premiums: np.ndarray,
+    returns: np.ndarray,
+    coi_rates: np.ndarray,
+    corridor: np.ndarray,
+    face_amount: float,
+    premium_load: float,
+    surrender_charges: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    Project cash value, surrender value and death benefit year by year
+    returns has shape (paths, years); every path is advanced together, so the
+    only Python loop is over policy years
+    """
+    paths, years = returns.shape
+    cash_value = np.zeros(paths)
+    lapsed = np.zeros(paths, dtype=bool)
+    cash_values = np.empty((paths, years))
+    death_benefits = np.empty((paths, years))
+
+    for t in range(years):
+        cash_value = cash_value + premiums[t] * (1.0 - premium_load)
+        death_benefit = np.maximum(face_amount, corridor[t] * cash_value)
+        cost_of_insurance = coi_rates[t] * np.maximum(death_benefit - cash_value, 0.0)
+        cash_value = (cash_value - cost_of_insurance) * (1.0 + returns[:, t])
+
+        lapsed |= cash_value < 0.0
+        cash_value = np.where(lapsed, 0.0, cash_value)
+        cash_values[:, t] = cash_value
+        death_benefits[:, t] = np.where(lapsed, 0.0, np.maximum(face_amount, corridor[t] * cash_value))
+
+    surrender_values = np.maximum(cash_values - surrender_charges, 0.0)
+    return {
+        "cash_value": cash_values,
+        "surrender_value": surrender_values,
+        "death_benefit": death_benefits,
+        "lapsed": lapsed,
+    }
+
+
+def illustrate(
+    policy_type: str,
+    issue_age: int,
+    face_amount: float,
+    annual_premium: float,
+    premium_years: Optional[int] = None,
+    years: int = 100,
+    health_class: str = "standard",
+    smoker: bool = False,
+    paths: int = 10000,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build a year-by-year illustration for a permanent policy
+    Returns guaranteed and non-guaranteed (illustrated) projections; variable
+    life adds Monte Carlo percentiles and a lapse probability over random
+    return paths
+    """
+    policy_type = policy_type.lower().replace(" ", "_")
+    if policy_type not in PRODUCT_ASSUMPTIONS:
+        raise ValueError(f"Illustrations are available for: {', '.join(PRODUCT_ASSUMPTIONS)}")
+    if not 0 <= issue_age < MAX_AGE - 1:
+        raise ValueError(f"Issue age must be between 0 and {MAX_AGE - 2}")
+    if face_amount <= 0 or annual_premium < 0:
+        raise ValueError("Face amount must be positive and premium non-negative")
+
+    assumptions = PRODUCT_ASSUMPTIONS[policy_type]
+    years = max(1, min(years, MAX_AGE - issue_age))
+    premium_years = years if premium_years is None else min(premium_years, years)
+
+    policy_years = np.arange(1, years + 1)
+    ages = issue_age + policy_years - 1
+    premiums = np.where(policy_years <= premium_years, float(annual_premium), 0.0)
+    mortality = mortality_rates(ages.astype(float), health_class, smoker)
+    corridor = corridor_factors(ages.astype(float))
+    surrender_charges = annual_premium * np.clip(1.0 - (policy_years - 1) / SURRENDER_CHARGE_YEARS, 0.0, 1.0)
+    fund_fee = assumptions.get("fund_fee", 0.0)
+
+    def deterministic(rate: float, coi_factor: float) -> Dict[str, np.ndarray]:
+        returns = np.full((1, years), rate - fund_fee)
+        return project(
+            premiums, returns, np.minimum(mortality * coi_factor, 1.0), corridor,
+            face_amount, assumptions["premium_load"], surrender_charges
+        )
+
+    guaranteed = deterministic(assumptions["guaranteed_rate"], GUARANTEED_COI_FACTOR)
+    illustrated = deterministic(assumptions["illustrated_rate"], 1.0)
+
+    result: Dict[str, Any] = {
+        "policy_type": policy_type,
+        "policy_year": policy_years,
+        "age": ages,
+        "premium": premiums,
+        "guaranteed": {key: value[0] for key, value in guaranteed.items() if key != "lapsed"},
+        "non_guaranteed": {key: value[0] for key, value in illustrated.items() if key != "lapsed"},
+    }
+
+    if policy_type == "variable_life":
+        rng = np.random.default_rng(seed)
+        volatility = assumptions["volatility"]
+        drift = np.log1p(assumptions["illustrated_rate"]) - volatility ** 2 / 2
+        returns = np.expm1(rng.normal(drift, volatility, size=(paths, years))) - fund_fee
+        simulated = project(
+            premiums, returns, mortality, corridor,
+            face_amount, assumptions["premium_load"], surrender_charges
+        )
+        percentiles = [10, 50, 90]
+        result["monte_carlo"] = {
+            "paths": paths,
+            "percentiles": percentiles,
+            "cash_value": np.percentile(simulated["cash_value"], percentiles, axis=0),
+            "death_benefit": np.percentile(simulated["death_benefit"], percentiles, axis=0),
+            "lapse_probability": float(simulated["lapsed"].mean()),
+        }
+
+    return result
+
+
+def to_serializable(value: Any) -> Any:
+    """Convert NumPy arrays and scalars in an illustration to plain Python types"""
+    if isinstance(value, dict):
+        return {key: to_serializable(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        return np.round(value, 2).tolist() if value.dtype.kind == "f" else value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def summarize(illustration: Dict[str, Any], milestones: tuple = (10, 20, 30)) -> str:
+    """Plain-text summary of key policy years for the assistant to quote"""
+    ages = illustration["age"]
+    guaranteed = illustration["guaranteed"]
+    current = illustration["non_guaranteed"]
+    rows = [
+        "Year | Age | Guaranteed cash value | Non-guaranteed cash value | Non-guaranteed death benefit"
+    ]
+    indexes = [year - 1 for year in milestones if year <= len(ages)]
+    age_65 = np.flatnonzero(ages == 65)
+    if age_65.size and age_65[0] not in indexes:
+        indexes.append(int(age_65[0]))
+    for index in sorted(indexes):
+        rows.append(
+            f"{index + 1} | {ages[index]} | ${guaranteed['cash_value'][index]:,.0f} | "
+            f"${current['cash_value'][index]:,.0f} | ${current['death_benefit'][index]:,.0f}"
+        )
+
+    if "monte_carlo" in illustration:
+        monte_carlo = illustration["monte_carlo"]
+        last = min(29, len(ages) - 1)
+        low, median, high = monte_carlo["cash_value"][:, last]
+        rows.append(
+            f"Simulated cash value in year {last + 1} ({monte_carlo['paths']:,} paths): "
+            f"10th percentile ${low:,.0f}, median ${median:,.0f}, 90th percentile ${high:,.0f}; "
+            f"lapse probability {monte_carlo['lapse_probability']:.0%}"
+        )
+
+    rows.append("Non-guaranteed values are illustrative and not a promise of future performance.")
+    return "\n".join(rows)
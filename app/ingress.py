@@ -0,0 +1,269 @@
+import asyncio
+import itertools
+import logging
+import struct
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+import ormsgpack
+from fastapi.concurrency import run_in_threadpool
+
+from .agent import InsuranceAgent
+from .knowledge import UnknownTenant
+from .metrics import metrics
+from .scheduler import INTERACTIVE
+from .streaming import stream_turn
+
+logger = logging.getLogger(__name__)
+
+# Frames are a 4-byte big-endian length followed by one MessagePack map
+_LENGTH = struct.Struct(">I")
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends a malformed or oversized frame"""
+
+
+async def read_frame(reader: asyncio.StreamReader, max_bytes: int) -> Optional[Dict[str, Any]]:
+    """Next frame from the stream, or None at a clean end of stream"""
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ProtocolError("Truncated frame header")
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > max_bytes:
+        raise ProtocolError(f"Frame of {length} bytes exceeds {max_bytes}")
+    try:
+        frame = ormsgpack.unpackb(await reader.readexactly(length))
+    except asyncio.IncompleteReadError:
+        raise ProtocolError("Truncated frame")
+    except ormsgpack.MsgpackDecodeError as e:
+        raise ProtocolError(f"Invalid MessagePack: {str(e)}")
+    if not isinstance(frame, dict):
+        raise ProtocolError("Frame is not a map")
+    return frame
+
+
+def encode_frame(frame: Dict[str, Any]) -> bytes:
+    payload = ormsgpack.packb(frame, option=ormsgpack.OPT_NON_STR_KEYS)
+    return _LENGTH.pack(len(payload)) + payload
+
+
+class IngressServer:
+    """
+    MessagePack-over-TCP ingress for internal callers
+    Connections are persistent and multiplexed: every request frame carries an
+    id, requests on one connection run concurrently (up to max_inflight) and
+    reply frames may arrive in any order. Operations:
+
+    chat         one reply frame with the MessageResponse fields
+    chat_stream  a "start" frame with the session id, "tool" frames as the agent
+                 calls tools, "delta" frames with the answer and a final "done"
+    ping         an empty reply, for health checks and keepalive
+
+    Requests run the same InsuranceAgent.process_message as POST /chat.
+    """
+
+    def __init__(self, agent: InsuranceAgent, max_frame_bytes: int = 1024 * 1024, max_inflight: int = 64):
+        self.agent = agent
+        self.max_frame_bytes = max_frame_bytes
+        self.max_inflight = max_inflight
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections = set()
+
+    async def start(self, host: str, port: int) -> int:
+        """Listen on host:port; returns the bound port (useful with port 0)"""
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        bound = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Internal MessagePack ingress listening on {host}:{bound}")
+        return bound
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        metrics.increment("ingress_connections")
+        write_lock = asyncio.Lock()
+        slots = asyncio.Semaphore(self.max_inflight)
+        tasks = set()
+
+        async def send(frame: Dict[str, Any]) -> None:
+            async with write_lock:
+                writer.write(encode_frame(frame))
+                await writer.drain()
+
+        try:
+            while True:
+                frame = await read_frame(reader, self.max_frame_bytes)
+                if frame is None:
+                    break
+                await slots.acquire()
+                task = asyncio.create_task(self._handle(frame, send))
+                tasks.add(task)
+                task.add_done_callback(lambda done: (tasks.discard(done), slots.release()))
+        except ProtocolError as e:
+            logger.warning(f"Closing ingress connection: {str(e)}")
+        except ConnectionError:
+            pass
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _handle(self, frame: Dict[str, Any], send) -> None:
+        request_id = frame.get("id")
+        op = frame.get("op")
+        start = time.perf_counter()
+        try:
+            if op == "ping":
+                await send({"id": request_id, "ok": True})
+            elif op in ("chat", "chat_stream"):
+                await self._chat(request_id, frame, send, stream=op == "chat_stream")
+            else:
+                await send({"id": request_id, "ok": False, "status": 400, "error": f"Unknown op: {op}"})
+        except ConnectionError:
+            pass
+        except Exception as e:
+            logger.error(f"Error in ingress {op}: {str(e)}")
+            try:
+                await send({"id": request_id, "ok": False, "status": 500, "error": "Internal server error"})
+            except ConnectionError:
+                pass
+        finally:
+            metrics.observe(f"ingress_{op}_seconds" if op in ("chat", "chat_stream") else "ingress_other_seconds",
+                            time.perf_counter() - start)
+
+    async def _chat(self, request_id: Any, frame: Dict[str, Any], send, stream: bool) -> None:
+        user_id = frame.get("user_id")
+        message = frame.get("message")
+        session_id = frame.get("session_id")
+        tenant = frame.get("tenant")
+        if not isinstance(user_id, str) or not isinstance(message, str) or not message.strip():
+            await send({"id": request_id, "ok": False, "status": 422, "error": "user_id and message are required"})
+            return
+        if session_id is not None and not isinstance(session_id, str):
+            await send({"id": request_id, "ok": False, "status": 422, "error": "session_id must be a string"})
+            return
+
+        kwargs = {
+            "user_id": user_id,
+            "message": message,
+            "session_id": session_id,
+            "timeout": frame.get("timeout"),
+            "priority": frame.get("priority", INTERACTIVE),
+            "tenant": tenant,
+        }
+        if not stream:
+            status, reply = await self._process(kwargs)
+            await send({"id": request_id, **reply})
+            return
+
+        # The session id is fixed up front so the caller learns it immediately
+        kwargs["session_id"] = session_id or str(uuid.uuid4())
+        await send({"id": request_id, "event": "start", "session_id": kwargs["session_id"]})
+        async for event in stream_turn(lambda: self._process(kwargs)):
+            await send({"id": request_id, **event})
+
+    async def _process(self, kwargs: Dict[str, Any]):
+        """(status, reply fields) for one turn"""
+        try:
+            response = await run_in_threadpool(self.agent.process_message, **kwargs)
+        except UnknownTenant:
+            return 404, {"ok": False, "status": 404, "error": "Unknown tenant"}
+        except ValueError as e:
+            return 422, {"ok": False, "status": 422, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Error in ingress chat: {str(e)}")
+            return 500, {"ok": False, "status": 500, "error": "Internal server error"}
+        metrics.increment("ingress_chat_turns")
+        return 200, {
+            "ok": True,
+            "response": response.response,
+            "session_id": response.session_id,
+            "query_type": response.query_type,
+            "context": response.context,
+        }
+
+
+class IngressClient:
+    """
+    Asyncio client for IngressServer over one persistent connection
+    Calls may be issued concurrently; replies are matched by request id
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_frame_bytes: int = 1024 * 1024):
+        self._reader = reader
+        self._writer = writer
+        self._max_frame_bytes = max_frame_bytes
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, "asyncio.Queue[Dict[str, Any]]"] = {}
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "IngressClient":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def chat(self, user_id: str, message: str, session_id: Optional[str] = None, **fields: Any) -> Dict[str, Any]:
+        """One turn; returns the reply map (ok, response, session_id, ...)"""
+        async for frame in self._call("chat", user_id=user_id, message=message, session_id=session_id, **fields):
+            return frame
+        raise ConnectionError("Ingress connection closed")
+
+    async def chat_stream(
+        self,
+        user_id: str,
+        message: str,
+        session_id: Optional[str] = None,
+        **fields: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Frames of a streaming turn, ending with the "done" frame"""
+        async for frame in self._call("chat_stream", user_id=user_id, message=message, session_id=session_id, **fields):
+            yield frame
+            if frame.get("event") in ("done", None):
+                return
+
+    async def ping(self) -> None:
+        async for _ in self._call("ping"):
+            return
+
+    async def close(self) -> None:
+        self._writer.close()
+        self._dispatcher.cancel()
+
+    async def _call(self, op: str, **fields: Any) -> AsyncIterator[Dict[str, Any]]:
+        request_id = next(self._ids)
+        replies: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._pending[request_id] = replies
+        try:
+            self._writer.write(encode_frame({"id": request_id, "op": op, **fields}))
+            await self._writer.drain()
+            while True:
+                frame = await replies.get()
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _dispatch(self) -> None:
+        try:
+            while True:
+                frame = await read_frame(self._reader, self._max_frame_bytes)
+                if frame is None:
+                    break
+                replies = self._pending.get(frame.pop("id", None))
+                if replies is not None:
+                    replies.put_nowait(frame)
+        finally:
+            for replies in self._pending.values():
+                replies.put_nowait(None)
@@ -0,0 +1,282 @@
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import orjson
+from pydantic import BaseModel, ValidationError, validator
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".kbs"
+
+# Snapshot layout (little endian):
+#   header   magic, format version, entry count, content digest
+#   entries  (key offset, key length, value offset, value length) per entry
+#   keys     UTF-8 "section<US>key" strings
+#   values   orjson-encoded entry values
+# Entries keep the catalog's order, so listings read the same as the JSON.
+_MAGIC = b"LIKB"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHxxI8s")
+_ENTRY = struct.Struct("<IIQI")
+_SEPARATOR = "\x1f"
+
+_TENANT_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+class KnowledgeValidationError(ValueError):
+    """Raised when a catalog does not match the knowledge schema"""
+
+
+class UnknownTenant(KeyError):
+    """Raised when no snapshot exists for a requested tenant"""
+
+
+class PolicyTypeSchema(BaseModel):
+    description: str
+    benefits: List[str]
+    eligibility: str
+    duration: str
+    best_for: List[str] = []
+    pros: List[str] = []
+    cons: List[str] = []
+
+
+class ClaimsProcessSchema(BaseModel):
+    required_documents: List[str]
+    processing_time: str
+
+    class Config:
+        extra = "allow"
+
+
+class KnowledgeSchema(BaseModel):
+    """
+    Shape of a tenant's knowledge catalog
+    Only the fields the tools and fallback read are typed; everything else must
+    still be a section of named entries
+    """
+
+    policy_types: Dict[str, PolicyTypeSchema]
+    common_questions: Dict[str, Any] = {}
+    regulatory_information: Dict[str, List[str]] = {}
+    glossary: Dict[str, str] = {}
+
+    class Config:
+        extra = "allow"
+
+    @validator("policy_types")
+    def has_policy_types(cls, value):
+        if not value:
+            raise ValueError("at least one policy type is required")
+        return value
+
+    @validator("common_questions")
+    def has_claims_process(cls, value):
+        if "claims_process" in value:
+            ClaimsProcessSchema.parse_obj(value["claims_process"])
+        return value
+
+
+def is_valid_tenant(tenant: str) -> bool:
+    """Tenant names double as snapshot file names"""
+    return bool(_TENANT_NAME.match(tenant))
+
+
+def validate_knowledge(data: Any) -> Dict[str, Any]:
+    """Check a catalog against KnowledgeSchema; returns it unchanged"""
+    try:
+        KnowledgeSchema.parse_obj(data)
+    except ValidationError as e:
+        raise KnowledgeValidationError(str(e))
+    for section, entries in data.items():
+        if not isinstance(entries, dict):
+            raise KnowledgeValidationError(f"Section '{section}' must be an object of named entries")
+    return data
+
+
+def compile_snapshot(data: Dict[str, Any]) -> bytes:
+    """Validate a catalog and encode it as a snapshot"""
+    validate_knowledge(data)
+    keys: List[bytes] = []
+    values: List[bytes] = []
+    for section, entries in data.items():
+        for key, value in entries.items():
+            keys.append(f"{section}{_SEPARATOR}{key}".encode("utf-8"))
+            values.append(orjson.dumps(value))
+
+    digest = hashlib.sha256(orjson.dumps(data, option=orjson.OPT_SORT_KEYS)).digest()[:8]
+    table = bytearray()
+    key_offset = _HEADER.size + _ENTRY.size * len(keys)
+    value_offset = key_offset + sum(len(key) for key in keys)
+    for key, value in zip(keys, values):
+        table += _ENTRY.pack(key_offset, len(key), value_offset, len(value))
+        key_offset += len(key)
+        value_offset += len(value)
+    header = _HEADER.pack(_MAGIC, _FORMAT_VERSION, len(keys), digest)
+    return b"".join([header, bytes(table), *keys, *values])
+
+
+def write_snapshot(data: Dict[str, Any], path: str) -> int:
+    """
+    Compile a catalog to path; returns the snapshot size
+    The file is replaced atomically, so workers that still map the previous
+    snapshot keep reading it until they reopen
+    """
+    snapshot = compile_snapshot(data)
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(snapshot)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return len(snapshot)
+
+
+class KnowledgeSnapshot:
+    """
+    Read-only view of a compiled catalog
+    Opened from a file the snapshot is memory-mapped, so every worker on a node
+    shares the page cache copy; entries are decoded on access.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap], name: str = "default"):
+        self.name = name
+        self._buffer = buffer
+        magic, version, count, digest = _HEADER.unpack_from(buffer, 0)
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise KnowledgeValidationError(f"Not a knowledge snapshot (format {version})")
+        self.version = digest.hex()
+        self.size = len(buffer)
+        # (inode, mtime, size) of the mapped file, so a registry can tell it was replaced
+        self.file_identity: Optional[Tuple[int, int, int]] = None
+        self._entries: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        for key_offset, key_length, value_offset, value_length in _ENTRY.iter_unpack(
+            buffer[_HEADER.size:_HEADER.size + _ENTRY.size * count]
+        ):
+            section, key = bytes(buffer[key_offset:key_offset + key_length]).decode("utf-8").split(_SEPARATOR, 1)
+            self._entries.setdefault(section, {})[key] = (value_offset, value_length)
+
+    @classmethod
+    def open(cls, path: str, name: Optional[str] = None) -> "KnowledgeSnapshot":
+        with open(path, "rb") as f:
+            identity = _file_identity(os.fstat(f.fileno()))
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        snapshot = cls(mapped, name or os.path.basename(path).rsplit(".", 1)[0])
+        snapshot.file_identity = identity
+        return snapshot
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], name: str = "default") -> "KnowledgeSnapshot":
+        return cls(compile_snapshot(data), name)
+
+    def sections(self) -> List[str]:
+        return list(self._entries)
+
+    def keys(self, section: str) -> List[str]:
+        return list(self._entries.get(section, ()))
+
+    def get(self, section: str, key: str, default: Any = None) -> Any:
+        location = self._entries.get(section, {}).get(key)
+        if location is None:
+            return default
+        offset, length = location
+        return orjson.loads(self._buffer[offset:offset + length])
+
+    def section(self, section: str) -> Dict[str, Any]:
+        return {key: self.get(section, key) for key in self.keys(section)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {section: self.section(section) for section in self._entries}
+
+
+def _file_identity(stat: os.stat_result) -> Tuple[int, int, int]:
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+# Catalog of the tenant the current request is served for; None means the default catalog
+current_knowledge: ContextVar[Optional[KnowledgeSnapshot]] = ContextVar("current_knowledge", default=None)
+
+
+class KnowledgeRegistry:
+    """
+    Tenant snapshots under one directory, opened on first use
+    At most max_resident snapshots stay mapped; the least recently used is
+    dropped (and unmapped once no request still holds it). Each lookup stats
+    the file, so a recompiled snapshot is remapped on the next request
+    """
+
+    def __init__(self, directory: str, max_resident: int = 64):
+        self.directory = directory
+        self.max_resident = max_resident
+        self._resident: "OrderedDict[str, KnowledgeSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        metrics.register_gauge("knowledge_tenants_resident", lambda: len(self._resident))
+
+    def path(self, tenant: str) -> str:
+        if not is_valid_tenant(tenant):
+            raise UnknownTenant(tenant)
+        return os.path.join(self.directory, f"{tenant}{SNAPSHOT_SUFFIX}")
+
+    def get(self, tenant: str) -> KnowledgeSnapshot:
+        """Snapshot for a tenant, mapping it if it is not resident or its file was replaced"""
+        path = self.path(tenant)
+        try:
+            identity = _file_identity(os.stat(path))
+        except FileNotFoundError:
+            with self._lock:
+                self._resident.pop(tenant, None)
+            raise UnknownTenant(tenant)
+
+        with self._lock:
+            snapshot = self._resident.get(tenant)
+            if snapshot is not None and snapshot.file_identity == identity:
+                self._resident.move_to_end(tenant)
+                return snapshot
+
+        try:
+            snapshot = KnowledgeSnapshot.open(path, tenant)
+        except FileNotFoundError:
+            raise UnknownTenant(tenant)
+        metrics.increment("knowledge_snapshot_loads")
+        logger.info(f"Mapped knowledge snapshot for tenant {tenant} (version {snapshot.version})")
+
+        with self._lock:
+            # Another request may have mapped the same file meanwhile; keep the first
+            current = self._resident.get(tenant)
+            if current is not None and current.file_identity == snapshot.file_identity:
+                snapshot = current
+            else:
+                self._resident[tenant] = snapshot
+            self._resident.move_to_end(tenant)
+            while len(self._resident) > self.max_resident:
+                evicted, _ = self._resident.popitem(last=False)
+                metrics.increment("knowledge_snapshot_evictions")
+                logger.debug(f"Dropped knowledge snapshot for tenant {evicted}")
+        return snapshot
+
+    def resident(self) -> List[str]:
+        with self._lock:
+            return list(self._resident)
+
+    def tenants(self) -> List[str]:
+        """Tenants with a compiled snapshot, resident or not"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(SNAPSHOT_SUFFIX)] for name in names if name.endswith(SNAPSHOT_SUFFIX))
@@ -1,13 +1,38 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import ValidationError
+import base64
 import logging
+import time
+import uuid
 from contextlib import asynccontextmanager
-from typing import Dict, Any, Optional
+from functools import partial
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Type
+
+import orjson
 
 from config.settings import settings
-from .models import MessageRequest, MessageResponse, HealthStatus
+from .models import MessageRequest, MessageResponse, HealthStatus, IllustrationRequest, SessionReleaseRequest
 from .agent import InsuranceAgent
+from .metrics import metrics
+from .http_layer import CompressionMiddleware, DuplexStreamingResponse, VersionedResponseCache
+from .illustration import illustrate, to_serializable
+from .templates import QuoteRenderer, QuoteTemplate, load_templates
+from .suggest import SuggestionIndex
+from .documents import DocumentTooLarge
+from .recorder import TrafficRecorder
+from .shadow import ShadowRunner, runner_from_settings
+from .auth import authorized
+from .profiling import MODES as PROFILE_MODES, request_profile, start_process_sampling
+from .tracing import start_trace
+from .knowledge import UnknownTenant
+from .session_store import SessionFilter
+from .streaming import stream_turn
+
+if TYPE_CHECKING:
+    from .ingress import IngressServer
 
 # Setup logging
 logging.basicConfig(
@@ -22,8 +47,29 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Life Insurance Support Assistant...")
     try:
-        global insurance_agent
+        global insurance_agent, quote_templates, suggestion_index, traffic_recorder, internal_ingress, shadow_runner
+        if settings.profiling_enabled and settings.profile_sample_mode not in PROFILE_MODES:
+            raise ValueError(f"profile_sample_mode must be one of: {', '.join(PROFILE_MODES)}")
         insurance_agent = InsuranceAgent()
+        if settings.traffic_recording:
+            traffic_recorder = TrafficRecorder(
+                settings.traffic_record_path,
+                settings.traffic_record_salt,
+                settings.traffic_sample_rate
+            )
+        if settings.shadow_enabled:
+            shadow_runner = runner_from_settings(settings)
+        quote_templates = load_templates(settings.quote_templates_path)
+        suggestion_index = SuggestionIndex(insurance_agent.knowledge_base)
+        if settings.internal_ingress_enabled:
+            # Imported lazily: ormsgpack is an optional dependency
+            from .ingress import IngressServer
+            internal_ingress = IngressServer(
+                insurance_agent,
+                settings.internal_ingress_max_frame_bytes,
+                settings.internal_ingress_max_inflight
+            )
+            await internal_ingress.start(settings.internal_ingress_host, settings.internal_ingress_port)
         logger.info("Application started successfully")
     except Exception as e:
         logger.error(f"Failed to start application: {str(e)}")
@@ -33,13 +79,23 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Life Insurance Support Assistant...")
+    if internal_ingress is not None:
+        await internal_ingress.close()
+    if insurance_agent is not None:
+        insurance_agent.sessions.close()
+        insurance_agent.tool_runtime.shutdown()
+    if traffic_recorder is not None:
+        traffic_recorder.close()
+    if shadow_runner is not None:
+        shadow_runner.close()
 
 # Create FastAPI app
 app = FastAPI(
     title="Life Insurance Support Assistant",
     description="A conversational AI agent for life insurance inquiries",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -51,9 +107,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (brotli when installed, otherwise gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_bytes)
+
+# Knowledge listings only change with the knowledge base version
+knowledge_cache = VersionedResponseCache(max_age=settings.knowledge_cache_max_age)
+
 # Global agent instance
 insurance_agent: Optional[InsuranceAgent] = None
 
+# Quote templates compiled at startup
+quote_templates: Dict[str, QuoteTemplate] = {}
+
+# Typeahead index over the knowledge base, built at startup
+suggestion_index: Optional[SuggestionIndex] = None
+
+# Set when traffic_recording is enabled
+traffic_recorder: Optional[TrafficRecorder] = None
+
+# Set when internal_ingress_enabled is set
+internal_ingress: Optional["IngressServer"] = None
+
+# Set when shadow_enabled is set
+shadow_runner: Optional[ShadowRunner] = None
+
 @app.get("/health", response_model=HealthStatus)
 async def health_check():
     """Health check endpoint"""
@@ -68,21 +145,98 @@ async def health_check():
         logger.error(f"Health check failed: {str(e)}")
         raise HTTPException(status_code=503, detail=str(e))
 
+async def process_chat_turn(
+    request: MessageRequest,
+    route: str,
+    session_id: Optional[str],
+    tenant: Optional[str],
+    profile_mode: Optional[str],
+    admin_token: Optional[str],
+    traceparent: Optional[str],
+    invalid: Type[Exception]
+) -> MessageResponse:
+    """
+    Run one chat turn with the bookkeeping shared by /chat and /chat/stream
+    Opens the root span, profiles the turn when asked or sampled, records the
+    traffic and mirrors answered turns to the shadow agent. Errors propagate to
+    the endpoint; invalid is the exception type it answers with 422.
+    """
+    # Callers could otherwise force every request into a trace; only trusted ones decide sampling
+    trust_parent = settings.trace_trust_parent or authorized(admin_token)
+    with start_trace(
+        f"POST {route}", traceparent, {"http.route": route, "user.id": request.user_id}, trust_parent=trust_parent
+    ) as root:
+        arrived_at = time.time()
+        start = time.perf_counter()
+        response = None
+        status_code = 500
+        profile = request_profile(profile_mode, admin_token) if settings.profiling_enabled else None
+        try:
+            # Run off the event loop so other sessions proceed in parallel
+            process = insurance_agent.process_message if profile is None else partial(
+                profile.run, insurance_agent.process_message
+            )
+            response = await run_in_threadpool(
+                process,
+                user_id=request.user_id,
+                message=request.message,
+                session_id=session_id,
+                timeout=settings.endpoint_sla_seconds.get(route, settings.default_sla_seconds),
+                tenant=tenant
+            )
+            status_code = 200
+        except UnknownTenant:
+            status_code = 404
+            raise
+        except invalid:
+            status_code = 422
+            raise
+        finally:
+            if root is not None:
+                root.set_attribute("http.status_code", status_code)
+            if profile is not None:
+                try:
+                    await run_in_threadpool(
+                        profile.save,
+                        response.session_id if response is not None else session_id,
+                        response.query_type if response is not None else None
+                    )
+                except OSError as e:
+                    logger.error(f"Could not write profile: {str(e)}")
+            if traffic_recorder is not None:
+                # A failed turn that would have started a session gets an id of its own,
+                # so replay does not chain unrelated failures into one conversation
+                traffic_recorder.record(
+                    arrived_at,
+                    request.user_id,
+                    response.session_id if response is not None else session_id or str(uuid.uuid4()),
+                    request.session_id is None,
+                    request.message,
+                    status_code,
+                    time.perf_counter() - start,
+                    response.query_type if response is not None else None
+                )
+        if shadow_runner is not None:
+            shadow_runner.mirror(request.user_id, request.message, response, time.perf_counter() - start, tenant)
+        return response
+
 @app.post("/chat", response_model=MessageResponse)
-async def chat_endpoint(request: MessageRequest):
+async def chat_endpoint(
+    request: MessageRequest,
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+    traceparent: Optional[str] = Header(None),
+    x_tenant: Optional[str] = Header(None)
+):
     """Process user message and return response"""
+    if insurance_agent is None:
+        raise HTTPException(status_code=503, detail="Service unavailable")
     try:
-        if insurance_agent is None:
-            raise HTTPException(status_code=503, detail="Service unavailable")
-        
-        response = insurance_agent.process_message(
-            user_id=request.user_id,
-            message=request.message,
-            session_id=request.session_id
+        return await process_chat_turn(
+            request, "/chat", request.session_id, x_tenant, x_profile, x_admin_token, traceparent, ValidationError
         )
-        
-        return response
-        
+    except UnknownTenant:
+        raise HTTPException(status_code=404, detail="Unknown tenant")
     except ValidationError as e:
         logger.error(f"Validation error: {str(e)}")
         raise HTTPException(status_code=422, detail=str(e))
@@ -90,6 +244,149 @@ async def chat_endpoint(request: MessageRequest):
         logger.error(f"Error in chat endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(
+    request: MessageRequest,
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+    traceparent: Optional[str] = Header(None),
+    x_tenant: Optional[str] = Header(None)
+):
+    """
+    Process user message and stream the turn as NDJSON events
+    A "start" event carries the session id, "tool" events follow as the agent
+    calls tools, then "delta" events with the answer and a final "done" event
+    with the remaining response fields (or ok=false and the error).
+    """
+    if insurance_agent is None:
+        raise HTTPException(status_code=503, detail="Service unavailable")
+    if not request.message.strip():
+        raise HTTPException(status_code=422, detail="Message cannot be empty")
+    # Fixed up front so the client learns it before the answer
+    session_id = request.session_id or str(uuid.uuid4())
+
+    async def run():
+        try:
+            response = await process_chat_turn(
+                request, "/chat/stream", session_id, x_tenant, x_profile, x_admin_token, traceparent, ValueError
+            )
+        except UnknownTenant:
+            return 404, {"ok": False, "status": 404, "error": "Unknown tenant"}
+        except ValueError as e:
+            return 422, {"ok": False, "status": 422, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Error in chat stream endpoint: {str(e)}")
+            return 500, {"ok": False, "status": 500, "error": "Internal server error"}
+        return 200, {
+            "ok": True,
+            "response": response.response,
+            "session_id": response.session_id,
+            "query_type": response.query_type,
+            "context": response.context,
+        }
+
+    async def body():
+        yield orjson.dumps({"event": "start", "session_id": session_id}) + b"\n"
+        async for event in stream_turn(run):
+            yield orjson.dumps(event, default=str) + b"\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+def session_filter(
+    user_id: Optional[str] = None,
+    min_age: Optional[float] = Query(None, ge=0, description="Seconds since creation"),
+    max_age: Optional[float] = Query(None, ge=0, description="Seconds since creation"),
+    min_messages: Optional[int] = Query(None, ge=0),
+    max_messages: Optional[int] = Query(None, ge=0)
+) -> SessionFilter:
+    """Session filter from query parameters"""
+    return SessionFilter(user_id, min_age, max_age, min_messages, max_messages)
+
+def encode_cursor(session_id: str) -> str:
+    return base64.urlsafe_b64encode(session_id.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+
+@app.get("/sessions")
+async def list_sessions(
+    criteria: SessionFilter = Depends(session_filter),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """List sessions matching the filters, one page at a time"""
+    if insurance_agent is None:
+        raise HTTPException(status_code=503, detail="Service unavailable")
+    if not authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    after = decode_cursor(cursor) if cursor else None
+    page = await run_in_threadpool(insurance_agent.sessions.query, criteria, after, limit)
+    return {
+        "sessions": page,
+        "next_cursor": encode_cursor(page[-1]["session_id"]) if len(page) == limit else None
+    }
+
+@app.get("/sessions/export")
+async def export_sessions(
+    criteria: SessionFilter = Depends(session_filter),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Stream matching conversations as NDJSON, one session per line"""
+    if insurance_agent is None:
+        raise HTTPException(status_code=503, detail="Service unavailable")
+    if not authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    sessions = insurance_agent.sessions
+
+    def body():
+        # Starlette pulls sync iterators on a worker thread; batching lines keeps hops rare
+        lines = []
+        size = 0
+        for record in sessions.export(criteria):
+            line = orjson.dumps(record) + b"\n"
+            lines.append(line)
+            size += len(line)
+            if size >= 64 * 1024:
+                yield b"".join(lines)
+                lines, size = [], 0
+        if lines:
+            yield b"".join(lines)
+
+    return StreamingResponse(
+        body(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="sessions.ndjson"'}
+    )
+
+@app.delete("/sessions")
+async def delete_sessions(
+    criteria: SessionFilter = Depends(session_filter),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Delete every session matching the filters"""
+    if insurance_agent is None:
+        raise HTTPException(status_code=503, detail="Service unavailable")
+    if not authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    if criteria.is_empty():
+        raise HTTPException(status_code=422, detail="At least one filter is required")
+
+    def purge() -> int:
+        deleted = 0
+        for batch in insurance_agent.sessions.delete_matching(criteria):
+            for session_id in batch:
+                insurance_agent.documents.discard(session_id)
+            deleted += len(batch)
+        return deleted
+
+    deleted = await run_in_threadpool(purge)
+    logger.info(f"Bulk deleted {deleted} sessions")
+    return {"status": "deleted", "deleted": deleted}
+
 @app.get("/sessions/{session_id}")
 async def get_session_info(session_id: str):
     """Get information about a specific session"""
@@ -97,14 +394,14 @@ async def get_session_info(session_id: str):
         if insurance_agent is None or session_id not in insurance_agent.sessions:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session_data = insurance_agent.sessions[session_id]
+        session = insurance_agent.sessions[session_id]
         return {
             "session_id": session_id,
-            "user_id": session_data["user_id"],
-            "created_at": session_data["created_at"],
-            "last_active": session_data["last_active"],
-            "message_count": session_data["message_count"],
-            "context_summary": str(session_data["context"])[:200] + "..." if session_data["context"] else ""
+            "user_id": session.user_id,
+            "created_at": session.created_datetime(),
+            "last_active": session.last_active_datetime(),
+            "message_count": session.message_count,
+            "context_summary": str(session.context)[:200] + "..." if session.context else ""
         }
     except Exception as e:
         logger.error(f"Error retrieving session info: {str(e)}")
@@ -118,20 +415,221 @@ async def delete_session(session_id: str):
             raise HTTPException(status_code=404, detail="Session not found")
         
         del insurance_agent.sessions[session_id]
+        insurance_agent.documents.discard(session_id)
         return {"status": "deleted", "session_id": session_id}
     except Exception as e:
         logger.error(f"Error deleting session: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def _owned_session(session_id: str, user_id: str) -> None:
+    """404 unless the session exists and belongs to user_id, so other users' sessions are not revealed"""
+    session = insurance_agent.sessions.get(session_id) if insurance_agent is not None else None
+    if session is None or session.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+@app.post("/sessions/{session_id}/documents", status_code=201)
+async def upload_document(request: Request, session_id: str, user_id: str, name: str = "policy"):
+    """
+    Stream a policy document (plain text or PDF) into the session's index
+    The body is read and sectioned chunk by chunk rather than buffered whole
+    """
+    await run_in_threadpool(_owned_session, session_id, user_id)
+
+    try:
+        index = insurance_agent.documents.get_or_create(session_id)
+        ingestor = index.ingestor(
+            name,
+            request.headers.get("content-type", "text/plain"),
+            max_bytes=settings.max_document_bytes,
+            spool_bytes=settings.document_spool_bytes,
+            section_chars=settings.document_section_chars
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        with metrics.timer("document_ingest_seconds"):
+            async for chunk in request.stream():
+                if chunk:
+                    await run_in_threadpool(ingestor.feed, chunk)
+            info = await run_in_threadpool(ingestor.finish)
+        await run_in_threadpool(insurance_agent.documents.charge, session_id, index)
+        return info
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error ingesting document: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        ingestor.close()
+
+@app.get("/sessions/{session_id}/documents")
+async def list_documents(session_id: str, user_id: str, q: Optional[str] = None, limit: int = 3):
+    """List a session's documents, or search them when q is given"""
+    if insurance_agent is None:
+        raise HTTPException(status_code=503, detail="Service unavailable")
+    await run_in_threadpool(_owned_session, session_id, user_id)
+    index = insurance_agent.documents.get(session_id)
+    if index is None:
+        return {"documents": [], "results": []} if q else {"documents": []}
+    if q:
+        results = await run_in_threadpool(index.search, q, max(1, min(limit, 20)))
+        return {"documents": list(index.documents.values()), "results": results}
+    return {"documents": list(index.documents.values())}
+
 @app.get("/knowledge/types")
-async def get_policy_types():
+async def get_policy_types(request: Request, x_tenant: Optional[str] = Header(None)):
     """Get available policy types"""
+    if insurance_agent is not None and x_tenant:
+        try:
+            knowledge = insurance_agent.tenants.get(x_tenant)
+        except UnknownTenant:
+            raise HTTPException(status_code=404, detail="Unknown tenant")
+        return knowledge_cache.respond(
+            request,
+            f"policy_types:{x_tenant}",
+            knowledge.version,
+            lambda: {"policy_types": knowledge.keys("policy_types")},
+            vary="X-Tenant"
+        )
     try:
         if insurance_agent is None:
             raise HTTPException(status_code=503, detail="Service unavailable")
         
-        policy_types = list(insurance_agent.knowledge_base.get("policy_types", {}).keys())
-        return {"policy_types": policy_types}
+        knowledge_base = insurance_agent.knowledge_base
+        return knowledge_cache.respond(
+            request,
+            "policy_types",
+            insurance_agent.knowledge_version,
+            lambda: {"policy_types": list(knowledge_base.get("policy_types", {}).keys())},
+            vary="X-Tenant"
+        )
     except Exception as e:
         logger.error(f"Error retrieving policy types: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/suggest")
+async def suggest(q: str = "", limit: int = 8):
+    """Typeahead suggestions linking to precomputed answers"""
+    if suggestion_index is None:
+        raise HTTPException(status_code=503, detail="Service unavailable")
+    start = time.perf_counter()
+    suggestions = suggestion_index.suggest(q, max(1, min(limit, 20)))
+    metrics.observe("suggest_seconds", time.perf_counter() - start)
+    return {"query": q, "suggestions": suggestions}
+
+@app.get("/suggest/answers/{entry_id}")
+async def get_suggested_answer(request: Request, entry_id: str):
+    """Precomputed answer for a suggestion, served without an LLM call"""
+    if suggestion_index is None or insurance_agent is None:
+        raise HTTPException(status_code=503, detail="Service unavailable")
+    answer = suggestion_index.answer(entry_id)
+    if answer is None:
+        raise HTTPException(status_code=404, detail="Answer not found")
+    metrics.increment("suggest_answers_served")
+    return knowledge_cache.respond(request, f"answer:{entry_id}", insurance_agent.knowledge_version, lambda: answer)
+
+@app.post("/illustrations")
+async def create_illustration(request: IllustrationRequest):
+    """Project year-by-year values for a permanent policy"""
+    try:
+        illustration = await run_in_threadpool(illustrate, **request.dict())
+        return to_serializable(illustration)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error building illustration: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.get("/quotes/templates")
+async def get_quote_templates():
+    """List quote templates and their typed fields"""
+    return {"templates": [template.describe() for template in quote_templates.values()]}
+
+@app.post("/quotes/render")
+async def render_quotes(request: Request, format: str = "markdown", output: str = "ndjson"):
+    """
+    Render quote documents from a stream of NDJSON applicant records
+    Output is NDJSON ({"id", "template", "document"} per record) or a zip archive;
+    both are streamed as records arrive, so memory does not grow with batch size
+    """
+    if not quote_templates:
+        raise HTTPException(status_code=503, detail="Quote templates unavailable")
+    if output not in ("ndjson", "zip"):
+        raise HTTPException(status_code=422, detail="Output must be 'ndjson' or 'zip'")
+    try:
+        renderer = QuoteRenderer(quote_templates, format)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def body():
+        stream = renderer.zip(request.stream()) if output == "zip" else renderer.ndjson(request.stream())
+        with metrics.timer("quote_render_batch_seconds"):
+            async for chunk in stream:
+                yield chunk
+        metrics.increment("quotes_rendered", renderer.rendered)
+        metrics.increment("quote_render_errors", renderer.failed)
+
+    if output == "zip":
+        return DuplexStreamingResponse(
+            body(),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="quotes.zip"'}
+        )
+    return DuplexStreamingResponse(body(), media_type="application/x-ndjson")
+
+@app.post("/admin/profile", status_code=202)
+async def profile_process(seconds: float = 30.0, x_admin_token: Optional[str] = Header(None)):
+    """
+    Sample every thread of this process for a number of seconds
+    Returns immediately with the path of the collapsed-stack file written
+    when the session ends
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    if not 0 < seconds <= settings.max_profile_seconds:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Seconds must be between 0 and {settings.max_profile_seconds}"
+        )
+    try:
+        path = start_process_sampling(seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "sampling", "seconds": seconds, "path": path}
+
+@app.post("/admin/sessions/release")
+async def release_sessions(request: SessionReleaseRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Write sessions to the shared store and drop them here
+    Called by the affinity router before it routes these sessions to another node
+    """
+    if insurance_agent is None:
+        raise HTTPException(status_code=503, detail="Service unavailable")
+    if insurance_agent.sessions.shared is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not authorized(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+    def release() -> List[str]:
+        # The router has stopped sending these sessions here; let running turns finish
+        for session_id in request.session_ids:
+            with insurance_agent.session_locks.hold(session_id):
+                pass
+        released = insurance_agent.sessions.release(request.session_ids)
+        for session_id in released:
+            insurance_agent.documents.discard(session_id)
+        return released
+
+    released = await run_in_threadpool(release)
+    logger.info(f"Released {len(released)} sessions to the shared store")
+    return {"status": "released", "released": len(released)}
+
+@app.get("/metrics")
+async def get_metrics():
+    """Get service metrics"""
+    return metrics.snapshot()
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator
+
+# Number of recent observations kept per timing for percentile estimates
+_TIMING_WINDOW = 2048
+
+# Prefix for metric names recorded in the current context, so work such as
+# shadow turns is reported apart from live traffic
+metrics_namespace: ContextVar[str] = ContextVar("metrics_namespace", default="")
+
+
+class Metrics:
+    """
+    Thread-safe in-process metrics registry
+    Holds counters, gauges (static or computed on read) and timing summaries
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._gauge_callbacks: Dict[str, Callable[[], float]] = {}
+        self._timing_counts: Dict[str, int] = defaultdict(int)
+        self._timing_totals: Dict[str, float] = defaultdict(float)
+        self._timing_windows: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=_TIMING_WINDOW))
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Increase a counter"""
+        name = metrics_namespace.get() + name
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to a fixed value"""
+        name = metrics_namespace.get() + name
+        with self._lock:
+            self._gauges[name] = value
+
+    def register_gauge(self, name: str, callback: Callable[[], float]) -> None:
+        """Register a gauge whose value is computed when metrics are read"""
+        name = metrics_namespace.get() + name
+        with self._lock:
+            self._gauge_callbacks[name] = callback
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration in seconds"""
+        name = metrics_namespace.get() + name
+        with self._lock:
+            self._timing_counts[name] += 1
+            self._timing_totals[name] += seconds
+            self._timing_windows[name].append(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def counter(self, name: str) -> float:
+        """Current value of a counter"""
+        name = metrics_namespace.get() + name
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a point-in-time copy of all metrics"""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            callbacks = dict(self._gauge_callbacks)
+            timings = {
+                name: _summarize(self._timing_counts[name], self._timing_totals[name], list(window))
+                for name, window in self._timing_windows.items()
+            }
+
+        for name, callback in callbacks.items():
+            try:
+                gauges[name] = callback()
+            except Exception:
+                gauges[name] = float("nan")
+
+        return {"counters": counters, "gauges": gauges, "timings": timings}
+
+    def reset(self) -> None:
+        """Clear all recorded values (registered gauges are kept)"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timing_counts.clear()
+            self._timing_totals.clear()
+            self._timing_windows.clear()
+
+
+def _summarize(count: int, total: float, window: list) -> Dict[str, float]:
+    """Summarize a timing series"""
+    window.sort()
+
+    def percentile(p: float) -> float:
+        if not window:
+            return 0.0
+        return window[min(len(window) - 1, int(p * len(window)))]
+
+    return {
+        "count": count,
+        "mean": total / count if count else 0.0,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": window[-1] if window else 0.0,
+    }
+
+
+# Process-wide registry
+metrics = Metrics()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
@@ -47,4 +47,25 @@ class SessionInfo(BaseModel):
     created_at: datetime
     last_active: datetime
     message_count: int
-    context_summary: str
\ No newline at end of file
+    context_summary: str
+
+class IllustrationRequest(BaseModel):
+    """
+    Request model for policy illustrations
+    """
+    policy_type: str
+    issue_age: int = Field(..., ge=0, le=119)
+    face_amount: float = Field(..., gt=0)
+    annual_premium: float = Field(..., ge=0)
+    premium_years: Optional[int] = Field(None, ge=0)
+    years: int = Field(100, ge=1, le=121)
+    health_class: str = "standard"
+    smoker: bool = False
+    paths: int = Field(10000, ge=1, le=20000)
+    seed: Optional[int] = None
+
+class SessionReleaseRequest(BaseModel):
+    """
+    Request model for handing sessions over to another node
+    """
+    session_ids: List[str] = Field(..., max_items=10000)
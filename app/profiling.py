@@ -0,0 +1,223 @@
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional, Set
+
+from config.settings import settings
+from .auth import authorized
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CPROFILE = "cprofile"
+SAMPLE = "sample"
+MODES = (CPROFILE, SAMPLE)
+
+# Profile of the request running in the current context; None almost always
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame: Any) -> str:
+    """Root-first stack in the collapsed format used by flamegraph.pl and speedscope"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """
+    Statistical sampler over thread stacks
+    Every interval the stacks of the watched threads (all other threads when
+    threads is None) are counted; the result is written as collapsed stacks
+    """
+
+    def __init__(self, interval: float = 0.005, threads: Optional[Set[int]] = None):
+        self.interval = interval
+        self.threads = threads
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run_for(self, seconds: float) -> None:
+        self.start()
+        self._stop.wait(seconds)
+        self.stop()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.threads is not None and ident not in self.threads):
+                    continue
+                self.samples[_collapse(frame)] += 1
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfile:
+    """
+    Profile of one process_message call across the threads it uses
+    In cprofile mode each participating thread gets its own cProfile.Profile and
+    the results are merged into one pstats file; in sample mode a StackSampler
+    watches only the participating threads. Work handed to pools joins the
+    profile through profiled().
+    """
+
+    def __init__(self, mode: str, directory: str, interval: float = 0.005):
+        if mode not in MODES:
+            raise ValueError(f"Profile mode must be one of: {', '.join(MODES)}")
+        self.mode = mode
+        self.directory = directory
+        self._profiles: List[cProfile.Profile] = []
+        self._threads: Set[int] = set()
+        self._lock = threading.Lock()
+        self._sampler = StackSampler(interval, self._threads) if mode == SAMPLE else None
+        self.started = time.time()
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call fn as the profiled request"""
+        token = current_profile.set(self)
+        if self._sampler is not None:
+            self._sampler.start()
+        try:
+            return self.call(fn, *args, **kwargs)
+        finally:
+            if self._sampler is not None:
+                self._sampler.stop()
+            current_profile.reset(token)
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call fn in the current thread as part of this profile"""
+        if self.mode == SAMPLE:
+            ident = threading.get_ident()
+            with self._lock:
+                self._threads.add(ident)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._threads.discard(ident)
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active in this thread
+            return fn(*args, **kwargs)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+
+    def save(self, session_id: Optional[str], query_type: Optional[str]) -> Optional[str]:
+        """Write the profile tagged with session and query type; returns the path, or None if empty"""
+        if self.mode == CPROFILE:
+            with self._lock:
+                profiles = list(self._profiles)
+            if not profiles:
+                logger.warning("No cProfile data to write; another profiler was active")
+                return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        session_tag = re.sub(r"[^A-Za-z0-9-]", "", session_id or "none")[:12]
+        query_tag = re.sub(r"[^A-Za-z0-9_]", "", query_type or "unknown")
+        base = os.path.join(self.directory, f"{stamp}-{session_tag}-{query_tag}-{self.mode}")
+
+        if self.mode == SAMPLE:
+            path = f"{base}.collapsed"
+            self._sampler.write(path)
+        else:
+            path = f"{base}.pstats"
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(path)
+        metrics.increment("profiles_written")
+        logger.info(f"Wrote {self.mode} profile {path}")
+        return path
+
+
+def profiled(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call fn, joining the current request's profile if there is one"""
+    profile = current_profile.get()
+    if profile is None:
+        return fn(*args, **kwargs)
+    return profile.call(fn, *args, **kwargs)
+
+
+def request_profile(requested_mode: Optional[str], admin_token: Optional[str]) -> Optional[RequestProfile]:
+    """
+    Profile for this request, if any
+    An admin may ask for one with a header; otherwise profile_sample_rate of
+    requests are profiled in profile_sample_mode
+    """
+    if requested_mode and authorized(admin_token) and requested_mode in MODES:
+        mode = requested_mode
+    elif settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate:
+        mode = settings.profile_sample_mode
+    else:
+        return None
+    return RequestProfile(mode, settings.profile_dir, settings.profile_sample_interval)
+
+
+_process_sampler: Optional[StackSampler] = None
+_process_lock = threading.Lock()
+
+
+def start_process_sampling(seconds: float) -> str:
+    """
+    Sample every thread for a fixed time in the background
+    Returns the path the collapsed stacks will be written to; raises
+    RuntimeError while another session is running
+    """
+    global _process_sampler
+    with _process_lock:
+        if _process_sampler is not None:
+            raise RuntimeError("A process sampling session is already running")
+        sampler = _process_sampler = StackSampler(settings.profile_sample_interval)
+
+    os.makedirs(settings.profile_dir, exist_ok=True)
+    path = os.path.join(settings.profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-process-{int(seconds)}s.collapsed")
+
+    def run() -> None:
+        global _process_sampler
+        try:
+            sampler.run_for(seconds)
+            sampler.write(path)
+            logger.info(f"Wrote process profile {path}")
+        finally:
+            with _process_lock:
+                _process_sampler = None
+
+    threading.Thread(target=run, name="process-sampling", daemon=True).start()
+    return path
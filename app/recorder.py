@@ -0,0 +1,149 @@
+import hashlib
+import hmac
+import logging
+import os
+import queue
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Replaced before a message is written; ages and term lengths survive because
+# they drive query classification and eligibility answers
+SCRUB_PATTERNS = [
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"\b\d{3}-\d{2}-\d{4}\b"), "<ssn>"),
+    (re.compile(r"\b(?:\d[ -]?){13,19}\b"), "<card>"),
+    (re.compile(r"(?:\+?\d{1,2}[ .-]?)?\(?\d{3}\)?[ .-]?\d{3}[ .-]?\d{4}\b"), "<phone>"),
+    (re.compile(r"\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b"), "<date>"),
+    (re.compile(r"\b[A-Z]{1,4}-?\d{5,}\b"), "<id>"),
+    (re.compile(r"\b\d{5,}\b"), "<number>"),
+]
+
+
+def scrub(message: str) -> str:
+    """
+    Remove contact details, identifiers and long numbers from a message
+    Personal names and other free-text details are not detected, so scrubbed
+    messages can still identify people
+    """
+    for pattern, replacement in SCRUB_PATTERNS:
+        message = pattern.sub(replacement, message)
+    return message
+
+
+class JsonLinesWriter:
+    """
+    Appends JSON lines to a file from a background thread
+    write() never blocks: when the queue is full the entry is dropped and counted
+    """
+
+    def __init__(self, path: str, max_queue: int = 10000, name: str = "jsonl-writer"):
+        self.path = path
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_queue)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, name=name, daemon=True)
+        self._thread.start()
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(orjson.dumps(entry) + b"\n")
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Flush queued lines and stop the writer"""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _write_loop(self) -> None:
+        with open(self.path, "ab") as f:
+            while True:
+                line = self._queue.get()
+                if line is None:
+                    break
+                lines: List[bytes] = [line]
+                stop = False
+                while True:
+                    try:
+                        line = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if line is None:
+                        stop = True
+                        break
+                    lines.append(line)
+                f.write(b"".join(lines))
+                f.flush()
+                if stop:
+                    break
+
+
+class TrafficRecorder:
+    """
+    Opt-in capture of /chat traffic for replay
+    Each turn becomes one JSONL line with its arrival time, pseudonymous user
+    and session ids (keyed hashes, stable within a recording), the scrubbed
+    message and the observed query type and latency. Scrubbing does not remove
+    personal names, so treat recordings as personal data. Lines are written by a
+    background thread so requests never wait on the file.
+    """
+
+    def __init__(self, path: str, salt: Optional[str] = None, sample_rate: float = 1.0, max_queue: int = 10000):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._salt = (salt or os.urandom(16).hex()).encode("utf-8")
+        self._writer = JsonLinesWriter(path, max_queue, name="traffic-recorder")
+        logger.info(f"Recording /chat traffic to {path}")
+
+    @property
+    def dropped(self) -> int:
+        return self._writer.dropped
+
+    def pseudonym(self, value: str) -> str:
+        return hmac.new(self._salt, value.encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+    def sampled(self, session_id: str) -> bool:
+        """Whole sessions are sampled so replayed conversations stay intact"""
+        if self.sample_rate >= 1.0:
+            return True
+        bucket = int(hmac.new(self._salt, session_id.encode("utf-8"), hashlib.sha256).hexdigest()[:8], 16)
+        return bucket / 0xFFFFFFFF < self.sample_rate
+
+    def record(
+        self,
+        arrived_at: float,
+        user_id: str,
+        session_id: str,
+        new_session: bool,
+        message: str,
+        status: int,
+        latency: float,
+        query_type: Optional[str] = None
+    ) -> None:
+        """Queue one turn; arrived_at is the wall-clock arrival time"""
+        if not self.sampled(session_id):
+            return
+        entry: Dict[str, Any] = {
+            "ts": round(arrived_at, 4),
+            "session": self.pseudonym(session_id),
+            "user": self.pseudonym(user_id),
+            "new_session": new_session,
+            "message": scrub(message),
+            "query_type": query_type,
+            "status": status,
+            "latency_ms": round(latency * 1000, 1),
+        }
+        self._writer.write(entry)
+
+    def close(self) -> None:
+        """Flush queued lines and stop the writer"""
+        self._writer.close()
+        if self.dropped:
+            logger.warning(f"Traffic recorder dropped {self.dropped} turns")
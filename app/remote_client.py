@@ -0,0 +1,142 @@
+import json
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import httpx
+
+# Idle seconds before the connection is refreshed; below uvicorn's default keep-alive timeout of 5s
+KEEPALIVE_SECONDS = 4.0
+
+
+class RemoteChatClient:
+    """
+    Thin client for an assistant server, for the CLI's remote mode
+    Holds a single HTTP/1.1 connection for its whole life: turns stream over it
+    from POST /chat/stream, and while the user is typing a light /health request
+    keeps the server from closing it. Imports nothing beyond httpx, so it starts
+    without the LangChain stack.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        tenant: Optional[str] = None,
+        timeout: float = 60.0,
+        keepalive: Optional[float] = KEEPALIVE_SECONDS,
+        transport: Optional[httpx.BaseTransport] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            headers={"X-Tenant": tenant} if tenant else None,
+            timeout=httpx.Timeout(timeout, connect=5.0),
+            limits=httpx.Limits(max_connections=1, max_keepalive_connections=1, keepalive_expiry=None),
+            transport=transport
+        )
+        # One connection, so requests take turns
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+        self._closed = threading.Event()
+        self._keepalive: Optional[threading.Thread] = None
+        if keepalive:
+            self._keepalive = threading.Thread(
+                target=self._keepalive_loop, args=(keepalive,), name="remote-keepalive", daemon=True
+            )
+            self._keepalive.start()
+
+    def stream_chat(self, user_id: str, message: str, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Events of one turn as they arrive: start, tool, delta and done
+        A reader thread owns the connection for the turn, so the lock is never
+        held while the caller handles an event, and a caller that stops early
+        does not keep the connection from other requests
+        """
+        events: "queue.Queue[Any]" = queue.Queue()
+        abandoned = threading.Event()
+        payload = {"user_id": user_id, "message": message, "session_id": session_id}
+        threading.Thread(
+            target=self._read_turn, args=(payload, events, abandoned), name="remote-stream", daemon=True
+        ).start()
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    return
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            abandoned.set()
+
+    def _read_turn(self, payload: Dict[str, Any], events: "queue.Queue[Any]", abandoned: threading.Event) -> None:
+        with self._lock:
+            try:
+                with self.client.stream("POST", "/chat/stream", json=payload) as response:
+                    if response.status_code != 200:
+                        response.read()
+                        events.put({"event": "done", "ok": False, "status": response.status_code,
+                                    "error": _detail(response)})
+                        return
+                    for line in response.iter_lines():
+                        if abandoned.is_set():
+                            break  # closing the unread response drops the connection
+                        if line:
+                            events.put(json.loads(line))
+            except Exception as e:
+                events.put(e)
+            finally:
+                self._last_used = time.monotonic()
+                events.put(None)
+
+    def session_info(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Summary of a session, or None when the server does not know it"""
+        response = self._get(f"/sessions/{session_id}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def policy_types(self) -> Dict[str, Any]:
+        response = self._get("/knowledge/types")
+        response.raise_for_status()
+        return response.json()
+
+    def health(self) -> Dict[str, Any]:
+        response = self._get("/health")
+        response.raise_for_status()
+        return response.json()
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            self.client.close()
+
+    def _get(self, path: str) -> httpx.Response:
+        with self._lock:
+            try:
+                return self.client.get(path)
+            finally:
+                self._last_used = time.monotonic()
+
+    def _keepalive_loop(self, interval: float) -> None:
+        while not self._closed.wait(interval / 4):
+            if time.monotonic() - self._last_used < interval or not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if not self._closed.is_set():
+                    self.client.get("/health")
+            except httpx.HTTPError:
+                pass  # reconnects on the next request
+            finally:
+                self._last_used = time.monotonic()
+                self._lock.release()
+
+
+def _detail(response: httpx.Response) -> str:
+    try:
+        body = response.json()
+    except ValueError:
+        return response.reason_phrase
+    return str(body.get("detail", response.reason_phrase)) if isinstance(body, dict) else response.reason_phrase
@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work would run past the current request deadline"""
+
+
+class Deadline:
+    """
+    Absolute time budget for a request, measured on the monotonic clock
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (negative once passed)"""
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, stage: str) -> None:
+        """Raise DeadlineExceeded if the deadline has passed"""
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline exceeded before {stage}")
+
+
+# Deadline of the request running in the current context
+current_deadline: ContextVar[Optional[Deadline]] = ContextVar("current_deadline", default=None)
+
+
+def check_deadline(stage: str) -> None:
+    """Raise DeadlineExceeded if the current request's deadline has passed"""
+    deadline = current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency until it has had time to recover
+    Opens after failure_threshold consecutive failures; after reset_seconds a
+    single trial call is let through and its outcome closes or reopens it
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        metrics.register_gauge(f"{name}_breaker_open", lambda: float(self._state != self.CLOSED))
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit breaker '{self.name}' closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit breaker '{self.name}' opened after {self._failures} failures")
+                    metrics.increment(f"{self.name}_breaker_trips")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
@@ -0,0 +1,93 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Replies that mean the agent did not really answer
+_FAILED_ANSWER_MARKERS = (
+    "agent stopped due to",
+    "i'm having trouble processing your request",
+)
+
+
+class ModelTier(BaseModel):
+    """
+    One configured model tier with its token prices (USD per 1k tokens)
+    """
+    name: str
+    model: str
+    input_cost_per_1k: float = 0.0
+    output_cost_per_1k: float = 0.0
+
+
+class ModelRouter:
+    """
+    Picks the cheapest model tier likely to answer a turn well
+    Starts from the query type's base tier, moves up for long messages, deep
+    conversations and multi-tool questions, and escalates one tier at a time
+    when an answer fails validation
+    """
+
+    def __init__(
+        self,
+        tiers: Dict[str, Dict[str, Any]],
+        tier_order: List[str],
+        routing_table: Dict[str, str],
+        long_message_chars: int = 400,
+        deep_conversation_turns: int = 10
+    ):
+        self.tiers = {name: ModelTier(name=name, **config) for name, config in tiers.items()}
+        self.tier_order = [name for name in tier_order if name in self.tiers]
+        if not self.tier_order:
+            raise ValueError("At least one configured model tier is required")
+        self.routing_table = routing_table
+        self.long_message_chars = long_message_chars
+        self.deep_conversation_turns = deep_conversation_turns
+
+    def route(self, query_type: str, message: str, history_turns: int, tool_calls_expected: int = 1) -> str:
+        """Choose the tier for a turn"""
+        base = self.routing_table.get(query_type, self.tier_order[0])
+        level = self.tier_order.index(base) if base in self.tier_order else 0
+
+        if len(message) > self.long_message_chars:
+            level += 1
+        if history_turns > self.deep_conversation_turns:
+            level += 1
+        if tool_calls_expected > 1:
+            level += 1
+
+        return self.tier_order[min(level, len(self.tier_order) - 1)]
+
+    def escalate(self, tier: str) -> Optional[str]:
+        """Next tier up, or None at the top"""
+        index = self.tier_order.index(tier)
+        if index + 1 >= len(self.tier_order):
+            return None
+        metrics.increment(f"model_tier_{tier}_escalations")
+        return self.tier_order[index + 1]
+
+    def is_acceptable(self, answer: str) -> bool:
+        """Whether an answer is good enough to return without escalating"""
+        text = (answer or "").strip()
+        if len(text) < 20:
+            return False
+        text_lower = text.lower()
+        return not any(marker in text_lower for marker in _FAILED_ANSWER_MARKERS)
+
+    def record(self, tier: str, seconds: float, prompt_tokens: int, completion_tokens: int) -> float:
+        """Track latency, tokens and cost of one call; returns the cost in USD"""
+        config = self.tiers[tier]
+        cost = (
+            prompt_tokens / 1000 * config.input_cost_per_1k
+            + completion_tokens / 1000 * config.output_cost_per_1k
+        )
+        metrics.observe(f"model_tier_{tier}_seconds", seconds)
+        metrics.increment(f"model_tier_{tier}_calls")
+        metrics.increment(f"model_tier_{tier}_prompt_tokens", prompt_tokens)
+        metrics.increment(f"model_tier_{tier}_completion_tokens", completion_tokens)
+        metrics.increment(f"model_tier_{tier}_cost_usd", cost)
+        return cost
@@ -0,0 +1,223 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain.callbacks.base import BaseCallbackHandler
+
+from .metrics import metrics
+from .resilience import DeadlineExceeded, current_deadline
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+
+# (user_id, priority class) of the request running in the current context
+current_caller: ContextVar[Tuple[str, str]] = ContextVar("current_caller", default=("anonymous", INTERACTIVE))
+
+
+class TokenBucket:
+    """Continuously refilling budget, e.g. requests or tokens per minute"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount is available (0 if it is now)"""
+        # A request larger than the bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+
+class _Waiter:
+    __slots__ = ("flow", "priority", "tokens", "finish_tag", "granted", "enqueued_at")
+
+    def __init__(self, flow: Tuple[str, str], priority: str, tokens: int):
+        self.flow = flow
+        self.priority = priority
+        self.tokens = tokens
+        self.finish_tag = 0.0
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+class LLMScheduler:
+    """
+    Central admission control for LLM calls
+    Each (priority class, user_id) pair is a flow in a weighted fair queue, so
+    interactive traffic outweighs batch and background work and one heavy user
+    cannot starve others. Calls are dispatched only while the request and
+    token buckets (aligned with the provider's RPM/TPM limits) have room.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        priority_weights: Dict[str, float],
+        max_concurrency: int = 64
+    ):
+        self.priority_weights = priority_weights
+        self.max_concurrency = max_concurrency
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._condition = threading.Condition()
+        self._queue: List[Tuple[float, int, _Waiter]] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: Dict[Tuple[str, str], float] = {}
+        self._in_flight = 0
+        metrics.register_gauge("llm_queue_depth", lambda: len(self._queue))
+        metrics.register_gauge("llm_in_flight", lambda: self._in_flight)
+
+    def acquire(self, user_id: str, priority: str = INTERACTIVE, estimated_tokens: int = 1000) -> _Waiter:
+        """Block until this call may go to the provider"""
+        weight = self.priority_weights.get(priority, 1.0)
+        flow = (priority, user_id)
+        waiter = _Waiter(flow, priority, estimated_tokens)
+        deadline = current_deadline.get()
+
+        with self._condition:
+            start_tag = max(self._virtual_time, self._last_finish.get(flow, 0.0))
+            waiter.finish_tag = start_tag + estimated_tokens / weight
+            self._last_finish[flow] = waiter.finish_tag
+            heapq.heappush(self._queue, (waiter.finish_tag, next(self._sequence), waiter))
+
+            try:
+                while not waiter.granted:
+                    wait = self._dispatch()
+                    if waiter.granted:
+                        break
+                    if deadline is not None:
+                        remaining = deadline.remaining()
+                        if remaining <= 0:
+                            raise DeadlineExceeded("Deadline exceeded while queued for the LLM")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._condition.wait(timeout=wait)
+            except BaseException:
+                if not waiter.granted:
+                    self._queue = [item for item in self._queue if item[2] is not waiter]
+                    heapq.heapify(self._queue)
+                    self._condition.notify_all()
+                raise
+
+        waited = time.monotonic() - waiter.enqueued_at
+        metrics.observe("llm_queue_wait_seconds", waited)
+        metrics.observe(f"llm_queue_wait_{priority}_seconds", waited)
+        return waiter
+
+    def release(self, waiter: _Waiter, actual_tokens: Optional[int] = None) -> None:
+        """Finish a call, reconciling the token estimate with actual usage"""
+        with self._condition:
+            self._in_flight -= 1
+            if actual_tokens is not None:
+                self._tokens.level -= actual_tokens - waiter.tokens
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, user_id: str, priority: str = INTERACTIVE, estimated_tokens: int = 1000) -> Iterator[_Waiter]:
+        """Hold a dispatch slot for the enclosed call"""
+        waiter = self.acquire(user_id, priority, estimated_tokens)
+        try:
+            yield waiter
+        finally:
+            self.release(waiter)
+
+    def _dispatch(self) -> Optional[float]:
+        """Grant queued calls while capacity allows; returns seconds until the next retry"""
+        while self._queue:
+            if self._in_flight >= self.max_concurrency:
+                return None
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+
+            finish_tag, _, head = self._queue[0]
+            wait = max(self._requests.wait_time(1), self._tokens.wait_time(head.tokens))
+            if wait > 0:
+                return wait
+
+            heapq.heappop(self._queue)
+            self._requests.level -= 1
+            self._tokens.level -= head.tokens
+            self._virtual_time = max(self._virtual_time, finish_tag)
+            self._in_flight += 1
+            head.granted = True
+            self._condition.notify_all()
+
+        if not self._queue:
+            # Forget finished flows so the table does not grow without bound
+            self._last_finish = {
+                flow: tag for flow, tag in self._last_finish.items() if tag > self._virtual_time
+            }
+        return None
+
+
+class SchedulerCallbackHandler(BaseCallbackHandler):
+    """
+    Routes every chat model call through an LLMScheduler
+    The caller identity comes from current_caller; the token estimate from the prompt size
+    """
+
+    raise_error = True
+
+    def __init__(self, scheduler: LLMScheduler, completion_estimate: int = 256):
+        self.scheduler = scheduler
+        self.completion_estimate = completion_estimate
+        self._active: Dict[UUID, _Waiter] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *,
+                            run_id: UUID, **kwargs: Any) -> None:
+        prompt_chars = sum(len(str(message.content)) for batch in messages for message in batch)
+        user_id, priority = current_caller.get()
+        waiter = self.scheduler.acquire(user_id, priority, prompt_chars // 4 + self.completion_estimate)
+        with self._lock:
+            self._active[run_id] = waiter
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        usage = (response.llm_output or {}).get("token_usage", {}) if response is not None else {}
+        self._finish(run_id, usage.get("total_tokens"))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, None)
+
+    def _finish(self, run_id: UUID, actual_tokens: Optional[int]) -> None:
+        with self._lock:
+            waiter = self._active.pop(run_id, None)
+        if waiter is not None:
+            self.scheduler.release(waiter, actual_tokens)
+
+
+_shared_scheduler: Optional[LLMScheduler] = None
+_shared_lock = threading.Lock()
+
+
+def shared_scheduler() -> LLMScheduler:
+    """Process-wide scheduler built from settings, so every agent shares one rate limit"""
+    global _shared_scheduler
+    from config.settings import settings
+
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = LLMScheduler(
+                settings.llm_rpm_limit,
+                settings.llm_tpm_limit,
+                settings.llm_priority_weights,
+                settings.llm_max_concurrency
+            )
+        return _shared_scheduler
@@ -0,0 +1,136 @@
+import marshal
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from langchain.schema import AIMessage, BaseMessage, HumanMessage
+
+# Role codes stored with each turn (small ints are shared singletons)
+ROLE_HUMAN = 0
+ROLE_AI = 1
+
+_MESSAGE_CLASSES = {
+    ROLE_HUMAN: HumanMessage,
+    ROLE_AI: AIMessage,
+}
+
+# Version of the serialized session record; bump it when the fields change
+SCHEMA_VERSION = 1
+
+
+class Session:
+    """
+    Compact per-conversation state held by InsuranceAgent
+    Timestamps are time.monotonic() floats and turns are (role, UTF-8 bytes)
+    tuples; LangChain message objects are only built when a turn is executed
+    """
+
+    __slots__ = ("user_id", "created_at", "last_active", "message_count", "turns", "context")
+
+    def __init__(self, user_id: str, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self.user_id = sys.intern(user_id)
+        self.created_at = now
+        self.last_active = now
+        self.message_count = 0
+        self.turns: List[Tuple[int, bytes]] = []
+        self.context: Optional[Dict[str, Any]] = None
+
+    def touch(self, now: Optional[float] = None) -> None:
+        """Mark the session as active"""
+        self.last_active = time.monotonic() if now is None else now
+
+    def add_exchange(self, message: str, response: str) -> None:
+        """Append a user message and the assistant reply"""
+        self.turns.append((ROLE_HUMAN, message.encode("utf-8")))
+        self.turns.append((ROLE_AI, response.encode("utf-8")))
+
+    def messages(self, last: Optional[int] = None) -> List[BaseMessage]:
+        """Materialize the history (or its last messages) as LangChain messages for the next turn"""
+        turns = self.turns if last is None else self.turns[-last:] if last > 0 else []
+        return [
+            _MESSAGE_CLASSES[role](content=text.decode("utf-8"))
+            for role, text in turns
+        ]
+
+    def idle_seconds(self, now: Optional[float] = None) -> float:
+        """Seconds since the session was last active"""
+        now = time.monotonic() if now is None else now
+        return now - self.last_active
+
+    def duration_seconds(self, now: Optional[float] = None) -> float:
+        """Seconds since the session was created"""
+        now = time.monotonic() if now is None else now
+        return now - self.created_at
+
+    def approx_size(self) -> int:
+        """Approximate resident bytes held by this session"""
+        size = sys.getsizeof(self) + sys.getsizeof(self.turns)
+        for turn in self.turns:
+            size += sys.getsizeof(turn) + sys.getsizeof(turn[1])
+        return size
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize for the cold and shared session tiers
+        A versioned JSON record, so payloads outlive Python upgrades and are
+        readable across a mixed-version fleet. Timestamps are stored as
+        wall-clock; context values JSON cannot represent are stored as strings.
+        """
+        offset = time.time() - time.monotonic()
+        return orjson.dumps(
+            {
+                "v": SCHEMA_VERSION,
+                "user_id": self.user_id,
+                "created_at": self.created_at + offset,
+                "last_active": self.last_active + offset,
+                "message_count": self.message_count,
+                "turns": [[role, text.decode("utf-8")] for role, text in self.turns],
+                "context": self.context,
+            },
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS
+        )
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "Session":
+        """Rebuild a session serialized with to_bytes()"""
+        if payload[:1] != b"{":
+            return cls._from_marshal(payload)
+        record = orjson.loads(payload)
+        if record.get("v") != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported session schema version: {record.get('v')}")
+        offset = time.time() - time.monotonic()
+        session = cls(record["user_id"], now=record["created_at"] - offset)
+        session.last_active = record["last_active"] - offset
+        session.message_count = record["message_count"]
+        session.turns = [(role, text.encode("utf-8")) for role, text in record["turns"]]
+        session.context = record["context"]
+        return session
+
+    @classmethod
+    def _from_marshal(cls, payload: bytes) -> "Session":
+        """Read a record written by earlier releases, which used marshal"""
+        user_id, created_at, last_active, message_count, turns, context = marshal.loads(payload)
+        offset = time.time() - time.monotonic()
+        session = cls(user_id, now=created_at - offset)
+        session.last_active = last_active - offset
+        session.message_count = message_count
+        session.turns = [tuple(turn) for turn in turns]
+        session.context = context
+        return session
+
+    def created_datetime(self) -> datetime:
+        """Wall-clock creation time, for display"""
+        return _to_datetime(self.created_at)
+
+    def last_active_datetime(self) -> datetime:
+        """Wall-clock last activity time, for display"""
+        return _to_datetime(self.last_active)
+
+
+def _to_datetime(monotonic_ts: float) -> datetime:
+    """Convert a time.monotonic() timestamp to a wall-clock datetime"""
+    return datetime.now() - timedelta(seconds=time.monotonic() - monotonic_ts)
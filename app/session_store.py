@@ -0,0 +1,672 @@
+import bisect
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Set, Tuple
+
+from .metrics import metrics
+from .session import ROLE_HUMAN, Session
+
+logger = logging.getLogger(__name__)
+
+
+# Hot sessions examined per lock acquisition while listing, so chat turns
+# waiting on the store lock are held up by at most one chunk
+_SCAN_CHUNK = 256
+
+# Seconds between expiry sweeps of the shared tier
+_SHARED_EXPIRY_INTERVAL = 60.0
+
+
+class SessionFilter:
+    """
+    Criteria for listing, exporting and deleting sessions
+    Ages are seconds since creation; all bounds are inclusive
+    """
+
+    __slots__ = ("user_id", "min_age", "max_age", "min_messages", "max_messages")
+
+    def __init__(
+        self,
+        user_id: Optional[str] = None,
+        min_age: Optional[float] = None,
+        max_age: Optional[float] = None,
+        min_messages: Optional[int] = None,
+        max_messages: Optional[int] = None
+    ):
+        self.user_id = user_id
+        self.min_age = min_age
+        self.max_age = max_age
+        self.min_messages = min_messages
+        self.max_messages = max_messages
+
+    def is_empty(self) -> bool:
+        return all(getattr(self, name) is None for name in self.__slots__)
+
+    def matches(self, user_id: str, created_at: float, message_count: int, now: float) -> bool:
+        """Check a session given its wall-clock creation time"""
+        if self.user_id is not None and user_id != self.user_id:
+            return False
+        age = now - created_at
+        if self.min_age is not None and age < self.min_age:
+            return False
+        if self.max_age is not None and age > self.max_age:
+            return False
+        if self.min_messages is not None and message_count < self.min_messages:
+            return False
+        if self.max_messages is not None and message_count > self.max_messages:
+            return False
+        return True
+
+    def where(self, now: float) -> Tuple[str, List[Any]]:
+        """SQL conditions and parameters for the cold tier"""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if self.user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(self.user_id)
+        if self.min_age is not None:
+            clauses.append("created_at <= ?")
+            params.append(now - self.min_age)
+        if self.max_age is not None:
+            clauses.append("created_at >= ?")
+            params.append(now - self.max_age)
+        if self.min_messages is not None:
+            clauses.append("message_count >= ?")
+            params.append(self.min_messages)
+        if self.max_messages is not None:
+            clauses.append("message_count <= ?")
+            params.append(self.max_messages)
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+
+class SharedSessionStore:
+    """
+    Session payloads shared by every node, keyed by session id
+    This implementation is a SQLite file, which worker processes on one host (or
+    nodes on a shared volume) can open together. A network store only needs the
+    same load/save_many/delete/expire methods.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS shared_sessions ("
+            "session_id TEXT PRIMARY KEY, payload BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_shared_updated ON shared_sessions(updated_at)")
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload FROM shared_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def save_many(self, payloads: Dict[str, bytes]) -> None:
+        """Write several sessions in one transaction"""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO shared_sessions (session_id, payload, updated_at) VALUES (?, ?, ?)",
+                    [(session_id, payload, now) for session_id, payload in payloads.items()]
+                )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def delete(self, session_ids: List[str]) -> None:
+        if not session_ids:
+            return
+        placeholders = ",".join("?" * len(session_ids))
+        with self._lock:
+            self._db.execute(f"DELETE FROM shared_sessions WHERE session_id IN ({placeholders})", session_ids)
+
+    def expire(self, max_idle_seconds: float) -> int:
+        """Drop sessions not written for max_idle_seconds"""
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM shared_sessions WHERE updated_at < ?", (time.time() - max_idle_seconds,)
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class SessionStore(MutableMapping):
+    """
+    Two-tier session cache
+    Hot sessions stay in memory under an LRU cap; colder ones are spilled to a
+    local SQLite file and rehydrated transparently on next access. Listings use
+    secondary indexes on both tiers (session ids in order and sessions per user
+    in memory; user, creation time and message count in SQLite) and page by
+    session id, so they never materialize the whole store.
+
+    With a shared store, sessions missing locally are loaded from it and every
+    write is copied to it in the background every flush_interval seconds
+    (write-behind). That is only safe when each session is served by a single
+    node at a time, which AffinityRing routing provides; release() hands
+    sessions over when routing changes. Listings cover this node's sessions.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_hot: int = 10000,
+        shared: Optional[SharedSessionStore] = None,
+        flush_interval: float = 0.5
+    ):
+        self.max_hot = max_hot
+        self._hot: "OrderedDict[str, Session]" = OrderedDict()
+        self._hot_ids: List[str] = []
+        self._hot_by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+        # Without a configured path, spill to a private temp file removed on close
+        self._owns_file = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="sessions-", suffix=".db")
+            os.close(fd)
+        elif os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, user_id TEXT NOT NULL, "
+            "last_active REAL NOT NULL, payload BLOB NOT NULL, "
+            "created_at REAL NOT NULL DEFAULT 0, message_count INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(sessions)")}
+        for column, definition in (("created_at", "REAL"), ("message_count", "INTEGER")):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE sessions ADD COLUMN {column} {definition} NOT NULL DEFAULT 0")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_last_active ON sessions(last_active)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id, session_id)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions(created_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_messages ON sessions(message_count)")
+        
+        # Listings and exports read the cold tier through their own connection,
+        # which WAL lets run alongside spills without taking the store lock
+        self._reader = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._reader_lock = threading.Lock()
+
+        metrics.register_gauge("sessions_hot", lambda: len(self._hot))
+        metrics.register_gauge("sessions_cold", self.cold_count)
+        metrics.register_gauge("sessions_hot_bytes", self.hot_bytes)
+        metrics.register_gauge("sessions_cold_bytes", self.cold_bytes)
+
+        self.shared = shared
+        self.flush_interval = flush_interval
+        self._dirty: Set[str] = set()
+        self._shared_max_idle: Optional[float] = None
+        # Serializes writes to the shared tier so an older copy never lands after a newer one
+        self._flush_lock = threading.Lock()
+        self._closing = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if shared is not None:
+            metrics.register_gauge("sessions_dirty", lambda: len(self._dirty))
+            self._flusher = threading.Thread(target=self._flush_loop, name="session-write-behind", daemon=True)
+            self._flusher.start()
+
+    def __getitem__(self, session_id: str) -> Session:
+        with self._lock:
+            session = self._hot.get(session_id)
+            if session is not None:
+                self._hot.move_to_end(session_id)
+                return session
+
+            session = self._rehydrate(session_id)
+            if session is not None:
+                return session
+
+        # Read from the shared tier without holding up other sessions
+        session = self._load_shared(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __setitem__(self, session_id: str, session: Session) -> None:
+        with self._lock:
+            if self.shared is not None:
+                self._dirty.add(session_id)
+            previous = self._hot.get(session_id)
+            if previous is None:
+                # A spilled copy would otherwise shadow this write once it leaves the hot tier
+                self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            if previous is not session:
+                if previous is not None:
+                    self._unindex(session_id, previous)
+                self._index(session_id, session)
+            self._hot[session_id] = session
+            self._hot.move_to_end(session_id)
+            self._evict()
+
+    def __delitem__(self, session_id: str) -> None:
+        if self.shared is not None:
+            # Without a local copy the session may still live in the shared tier
+            self[session_id]
+        # Held across the shared delete, so a flush that already collected the session cannot write it back
+        with self._flush_lock:
+            with self._lock:
+                self._dirty.discard(session_id)
+                session = self._hot.pop(session_id, None)
+                if session is not None:
+                    self._unindex(session_id, session)
+                cursor = self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                if session is None and cursor.rowcount == 0:
+                    raise KeyError(session_id)
+            if self.shared is not None:
+                self.shared.delete([session_id])
+
+    def __contains__(self, session_id: object) -> bool:
+        with self._lock:
+            if session_id in self._hot:
+                return True
+            row = self._db.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is not None:
+                return True
+        return self._load_shared(session_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = list(self._hot)
+            keys.extend(row[0] for row in self._db.execute("SELECT session_id FROM sessions"))
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._hot) + self.cold_count()
+
+    def expire(self, max_idle_seconds: float) -> List[str]:
+        """Drop sessions idle longer than max_idle_seconds from both tiers"""
+        now = time.monotonic()
+        # The shared tier is swept by the write-behind thread
+        self._shared_max_idle = max_idle_seconds
+        with self._lock:
+            # Access order is not idle order (reads and shared-tier loads reorder without
+            # touching), so every hot session is checked
+            expired = [
+                session_id for session_id, session in self._hot.items()
+                if session.idle_seconds(now) > max_idle_seconds
+            ]
+            for session_id in expired:
+                self._unindex(session_id, self._hot.pop(session_id))
+
+            cutoff = time.time() - max_idle_seconds
+            cold_expired = [
+                row[0] for row in self._db.execute(
+                    "SELECT session_id FROM sessions WHERE last_active < ?", (cutoff,)
+                )
+            ]
+            if cold_expired:
+                self._db.execute("DELETE FROM sessions WHERE last_active < ?", (cutoff,))
+        return expired + cold_expired
+
+    def query(
+        self,
+        criteria: Optional[SessionFilter] = None,
+        after: Optional[str] = None,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        Summaries of matching sessions with ids greater than after, in id order
+        Pass the last session_id of a page as after to get the next page. A
+        session that moves between tiers while a page is read may be missed
+        on that page.
+        """
+        criteria = criteria or SessionFilter()
+        now = time.time()
+        hot = self._query_hot(criteria, after, limit, now)
+        cold = self._query_cold(criteria, after, limit, now)
+        merged: Dict[str, Dict[str, Any]] = {summary["session_id"]: summary for summary in cold}
+        merged.update((summary["session_id"], summary) for summary in hot)
+        return [merged[session_id] for session_id in sorted(merged)[:limit]]
+
+    def scan(self, criteria: Optional[SessionFilter] = None, page_size: int = 500) -> Iterator[List[Dict[str, Any]]]:
+        """Pages of matching session summaries across the whole store"""
+        after = None
+        while True:
+            page = self.query(criteria, after, page_size)
+            if not page:
+                return
+            yield page
+            if len(page) < page_size:
+                return
+            after = page[-1]["session_id"]
+
+    def export(self, criteria: Optional[SessionFilter] = None, page_size: int = 200) -> Iterator[Dict[str, Any]]:
+        """Full records (summary plus turns and context) of matching sessions"""
+        for page in self.scan(criteria, page_size):
+            conversations: Dict[str, Tuple[List[Tuple[int, bytes]], Optional[Dict[str, Any]]]] = {}
+            cold_ids = []
+            with self._lock:
+                for summary in page:
+                    session = self._hot.get(summary["session_id"])
+                    if session is not None:
+                        # Turns are immutable tuples, so copying the list is a consistent view
+                        conversations[summary["session_id"]] = (list(session.turns), session.context)
+                    else:
+                        cold_ids.append(summary["session_id"])
+            if cold_ids:
+                placeholders = ",".join("?" * len(cold_ids))
+                with self._reader_lock:
+                    rows = self._reader.execute(
+                        f"SELECT session_id, payload FROM sessions WHERE session_id IN ({placeholders})", cold_ids
+                    ).fetchall()
+                for session_id, payload in rows:
+                    session = Session.from_bytes(payload)
+                    conversations[session_id] = (session.turns, session.context)
+
+            for summary in page:
+                conversation = conversations.get(summary["session_id"])
+                if conversation is None:
+                    continue  # deleted or expired since it was listed
+                turns, context = conversation
+                yield {
+                    **summary,
+                    "turns": [
+                        {"role": "user" if role == ROLE_HUMAN else "assistant", "text": text.decode("utf-8")}
+                        for role, text in turns
+                    ],
+                    "context": context,
+                }
+
+    def delete_matching(self, criteria: SessionFilter, batch_size: int = 500) -> Iterator[List[str]]:
+        """Delete matching sessions in batches, yielding the ids of each batch"""
+        for page in self.scan(criteria, batch_size):
+            deleted = []
+            # As in __delitem__, no flush may write these sessions back after the shared delete
+            with self._flush_lock:
+                with self._lock:
+                    for summary in page:
+                        session_id = summary["session_id"]
+                        session = self._hot.pop(session_id, None)
+                        if session is not None:
+                            self._unindex(session_id, session)
+                            deleted.append(session_id)
+                    # Hot sessions may also have a spilled copy, so the cold tier is cleared for the whole page
+                    from_hot = set(deleted)
+                    page_ids = [summary["session_id"] for summary in page]
+                    placeholders = ",".join("?" * len(page_ids))
+                    deleted.extend(row[0] for row in self._db.execute(
+                        f"SELECT session_id FROM sessions WHERE session_id IN ({placeholders})", page_ids
+                    ) if row[0] not in from_hot)
+                    self._db.execute(f"DELETE FROM sessions WHERE session_id IN ({placeholders})", page_ids)
+                    self._dirty.difference_update(deleted)
+                if self.shared is not None:
+                    self.shared.delete(deleted)
+            metrics.increment("sessions_bulk_deleted", len(deleted))
+            yield deleted
+
+    def cold_count(self) -> int:
+        """Number of sessions spilled to disk"""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def hot_bytes(self) -> int:
+        """Approximate memory held by resident sessions"""
+        with self._lock:
+            return sum(session.approx_size() for session in self._hot.values())
+
+    def cold_bytes(self) -> int:
+        """Bytes of serialized session payloads on disk"""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(LENGTH(payload)), 0) FROM sessions").fetchone()[0]
+
+    def flush(self) -> int:
+        """Write sessions changed since the last flush to the shared tier; returns how many"""
+        if self.shared is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                sessions, payloads = self._collect(dirty)
+            payloads.update((session_id, session.to_bytes()) for session_id, session in sessions.items())
+            if payloads:
+                start = time.perf_counter()
+                try:
+                    self.shared.save_many(payloads)
+                except Exception:
+                    with self._lock:
+                        self._dirty.update(payloads)
+                    raise
+                metrics.increment("session_shared_writes", len(payloads))
+                metrics.observe("session_flush_seconds", time.perf_counter() - start)
+        return len(payloads)
+
+    def release(self, session_ids: List[str]) -> List[str]:
+        """
+        Hand sessions over to another node
+        Each one is written to the shared tier and dropped locally, so the next
+        owner loads its latest state. Returns the ids that were held here.
+        """
+        if self.shared is None:
+            return []
+        with self._flush_lock:
+            with self._lock:
+                sessions, payloads = self._collect(set(session_ids))
+                self._dirty.difference_update(session_ids)
+                for session_id, session in sessions.items():
+                    self._unindex(session_id, self._hot.pop(session_id))
+                cold_ids = list(payloads)
+                if cold_ids:
+                    placeholders = ",".join("?" * len(cold_ids))
+                    self._db.execute(f"DELETE FROM sessions WHERE session_id IN ({placeholders})", cold_ids)
+            payloads.update((session_id, session.to_bytes()) for session_id, session in sessions.items())
+            if payloads:
+                self.shared.save_many(payloads)
+        metrics.increment("sessions_released", len(payloads))
+        return sorted(payloads)
+
+    def close(self) -> None:
+        """Close the backing database (removing it if it was a temp file)"""
+        if self._flusher is not None:
+            self._closing.set()
+            self._flusher.join(timeout=5)
+            self.flush()
+            self.shared.close()
+        with self._lock:
+            self._db.close()
+            with self._reader_lock:
+                self._reader.close()
+            if self._owns_file:
+                for suffix in ("", "-wal", "-shm"):
+                    try:
+                        os.remove(self.path + suffix)
+                    except FileNotFoundError:
+                        pass
+
+    def _collect(self, session_ids: Set[str]) -> Tuple[Dict[str, Session], Dict[str, bytes]]:
+        """Resident sessions and spilled payloads among session_ids; the caller holds the lock"""
+        sessions = {session_id: self._hot[session_id] for session_id in session_ids if session_id in self._hot}
+        payloads: Dict[str, bytes] = {}
+        cold_ids = [session_id for session_id in session_ids if session_id not in sessions]
+        for offset in range(0, len(cold_ids), 500):
+            batch = cold_ids[offset:offset + 500]
+            placeholders = ",".join("?" * len(batch))
+            payloads.update(self._db.execute(
+                f"SELECT session_id, payload FROM sessions WHERE session_id IN ({placeholders})", batch
+            ))
+        return sessions, payloads
+
+    def _load_shared(self, session_id: str) -> Optional[Session]:
+        """Bring a session held in the shared tier into the hot tier"""
+        if self.shared is None:
+            return None
+        start = time.perf_counter()
+        payload = self.shared.load(session_id)
+        if payload is None:
+            return None
+        session = Session.from_bytes(payload)
+        with self._lock:
+            resident = self._hot.get(session_id)
+            if resident is not None:
+                return resident
+            self._hot[session_id] = session
+            self._index(session_id, session)
+            self._evict()
+        metrics.increment("session_shared_loads")
+        metrics.observe("session_shared_load_seconds", time.perf_counter() - start)
+        return session
+
+    def _flush_loop(self) -> None:
+        last_expiry = time.monotonic()
+        while not self._closing.wait(self.flush_interval):
+            try:
+                self.flush()
+                if self._shared_max_idle is not None and time.monotonic() - last_expiry >= _SHARED_EXPIRY_INTERVAL:
+                    last_expiry = time.monotonic()
+                    self.shared.expire(self._shared_max_idle)
+            except Exception as e:
+                metrics.increment("session_flush_errors")
+                logger.error(f"Session write-behind failed: {type(e).__name__}: {str(e)}")
+
+    def _index(self, session_id: str, session: Session) -> None:
+        bisect.insort(self._hot_ids, session_id)
+        self._hot_by_user.setdefault(session.user_id, set()).add(session_id)
+
+    def _unindex(self, session_id: str, session: Session) -> None:
+        position = bisect.bisect_left(self._hot_ids, session_id)
+        if position < len(self._hot_ids) and self._hot_ids[position] == session_id:
+            del self._hot_ids[position]
+        user_sessions = self._hot_by_user.get(session.user_id)
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._hot_by_user[session.user_id]
+
+    def _query_hot(
+        self,
+        criteria: SessionFilter,
+        after: Optional[str],
+        limit: int,
+        now: float
+    ) -> List[Dict[str, Any]]:
+        """Matching resident sessions, taking the store lock one chunk at a time"""
+        offset = now - time.monotonic()
+        found: List[Dict[str, Any]] = []
+        with self._lock:
+            candidates = None
+            if criteria.user_id is not None:
+                candidates = sorted(
+                    session_id for session_id in self._hot_by_user.get(criteria.user_id, ())
+                    if after is None or session_id > after
+                )
+
+        position = 0
+        last = after
+        while len(found) < limit:
+            with self._lock:
+                if candidates is not None:
+                    chunk = candidates[position:position + _SCAN_CHUNK]
+                    position += len(chunk)
+                else:
+                    # Ids may have moved while the lock was released; resume after the last one seen
+                    start = 0 if last is None else bisect.bisect_right(self._hot_ids, last)
+                    chunk = self._hot_ids[start:start + _SCAN_CHUNK]
+                if not chunk:
+                    break
+                last = chunk[-1]
+                for session_id in chunk:
+                    session = self._hot.get(session_id)
+                    if session is None:
+                        continue
+                    created_at = session.created_at + offset
+                    if criteria.matches(session.user_id, created_at, session.message_count, now):
+                        found.append({
+                            "session_id": session_id,
+                            "user_id": session.user_id,
+                            "created_at": created_at,
+                            "last_active": session.last_active + offset,
+                            "message_count": session.message_count,
+                        })
+                        if len(found) == limit:
+                            break
+        return found
+
+    def _query_cold(
+        self,
+        criteria: SessionFilter,
+        after: Optional[str],
+        limit: int,
+        now: float
+    ) -> List[Dict[str, Any]]:
+        """Matching spilled sessions, read without the store lock"""
+        conditions, params = criteria.where(now)
+        with self._reader_lock:
+            rows = self._reader.execute(
+                "SELECT session_id, user_id, created_at, last_active, message_count FROM sessions "
+                f"WHERE session_id > ?{conditions} ORDER BY session_id LIMIT ?",
+                [after or "", *params, limit]
+            ).fetchall()
+        return [
+            {
+                "session_id": session_id,
+                "user_id": user_id,
+                "created_at": created_at,
+                "last_active": last_active,
+                "message_count": message_count,
+            }
+            for session_id, user_id, created_at, last_active, message_count in rows
+        ]
+
+    def _evict(self) -> None:
+        """Spill least recently used sessions beyond the hot cap"""
+        while len(self._hot) > self.max_hot:
+            session_id, session = self._hot.popitem(last=False)
+            self._unindex(session_id, session)
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions "
+                "(session_id, user_id, last_active, payload, created_at, message_count) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    session.user_id,
+                    time.time() - session.idle_seconds(),
+                    session.to_bytes(),
+                    time.time() - session.duration_seconds(),
+                    session.message_count
+                )
+            )
+            metrics.increment("session_spills")
+            logger.debug(f"Spilled idle session to disk: {session_id}")
+
+    def _rehydrate(self, session_id: str) -> Optional[Session]:
+        """Move a spilled session back into the hot tier"""
+        start = time.perf_counter()
+        row = self._db.execute(
+            "SELECT payload FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        session = Session.from_bytes(row[0])
+        self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        self._hot[session_id] = session
+        self._index(session_id, session)
+        self._evict()
+
+        metrics.increment("session_rehydrations")
+        metrics.observe("session_rehydrate_seconds", time.perf_counter() - start)
+        logger.debug(f"Rehydrated session from disk: {session_id}")
+        return session
@@ -0,0 +1,252 @@
+import contextvars
+import difflib
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from config.settings import settings
+from .agent import InsuranceAgent
+from .metrics import metrics, metrics_namespace
+from .models import MessageResponse
+from .recorder import JsonLinesWriter, scrub
+from .scheduler import BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+# Answer diffs keep at most this many changed spans of at most _DIFF_CHARS each
+_MAX_DIFF_OPS = 20
+_DIFF_CHARS = 200
+
+# Sessions remembered as having lost a mirrored turn
+_MAX_DIVERGED = 10000
+
+
+@contextmanager
+def settings_overrides(overrides: Dict[str, Any]) -> Iterator[None]:
+    """Temporarily apply overrides to the global settings"""
+    previous = {name: getattr(settings, name) for name in overrides}
+    try:
+        for name, value in overrides.items():
+            setattr(settings, name, value)
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+def build_shadow_agent(overrides: Dict[str, Any]) -> InsuranceAgent:
+    """
+    InsuranceAgent built with overrides applied to the settings
+    Only settings read at construction take effect (model, temperature, prompt,
+    tool set and tool policies, routing, speculation, iteration limits), so the
+    executors of routed model tiers are built up front rather than on first use.
+    The shadow agent always gets its own temporary session store, and its
+    metrics are recorded under the shadow_ prefix.
+    """
+    unknown = [name for name in overrides if not hasattr(settings, name)]
+    if unknown:
+        raise ValueError(f"Unknown shadow override settings: {', '.join(unknown)}")
+
+    def build() -> InsuranceAgent:
+        metrics_namespace.set("shadow_")
+        with settings_overrides({**overrides, "session_store_path": None, "shared_session_store_path": None}):
+            agent = InsuranceAgent()
+            agent.prepare_tiers()
+            return agent
+
+    return contextvars.Context().run(build)
+
+
+def answer_diff(primary: str, shadow: str) -> List[Dict[str, str]]:
+    """Word-level changes from the primary answer to the shadow answer, scrubbed and truncated"""
+    primary_words, shadow_words = primary.split(), shadow.split()
+    matcher = difflib.SequenceMatcher(None, primary_words, shadow_words, autojunk=False)
+    changes = []
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            continue
+        if len(changes) == _MAX_DIFF_OPS:
+            break
+        changes.append({
+            "op": op,
+            "primary": scrub(" ".join(primary_words[i1:i2]))[:_DIFF_CHARS],
+            "shadow": scrub(" ".join(shadow_words[j1:j2]))[:_DIFF_CHARS],
+        })
+    return changes
+
+
+def answer_similarity(primary: str, shadow: str) -> float:
+    """Share of words the two answers have in common, from 0.0 to 1.0"""
+    return difflib.SequenceMatcher(None, primary.split(), shadow.split(), autojunk=False).ratio()
+
+
+class ShadowRunner:
+    """
+    Mirrors a sample of live turns to an alternate agent configuration
+    mirror() returns at once: turns run on a small pool of their own, at
+    background LLM priority, and are skipped outright when max_concurrency
+    shadow turns are already in flight. Whole sessions are sampled so the
+    shadow agent sees complete conversations in its own session store. Each
+    mirrored turn becomes one JSONL line comparing latency, token usage and the
+    two answers (similarity and a scrubbed word diff).
+    """
+
+    def __init__(
+        self,
+        agent: InsuranceAgent,
+        path: str,
+        sample_rate: float = 1.0,
+        max_concurrency: int = 2,
+        timeout: float = 60.0,
+        salt: Optional[str] = None
+    ):
+        self.agent = agent
+        self.sample_rate = sample_rate
+        self.timeout = timeout
+        self._salt = (salt or os.urandom(16).hex()).encode("utf-8")
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="shadow")
+        self._writer = JsonLinesWriter(path, name="shadow-recorder")
+        self._diverged: "OrderedDict[str, None]" = OrderedDict()
+        self._diverged_lock = threading.Lock()
+        logger.info(f"Mirroring {sample_rate:.0%} of /chat sessions to a shadow agent, recorded to {path}")
+
+    def sampled(self, session_id: str) -> bool:
+        if self.sample_rate >= 1.0:
+            return True
+        bucket = int(hmac.new(self._salt, session_id.encode("utf-8"), hashlib.sha256).hexdigest()[:8], 16)
+        return bucket / 0xFFFFFFFF < self.sample_rate
+
+    def mirror(
+        self,
+        user_id: str,
+        message: str,
+        primary: MessageResponse,
+        primary_latency: float,
+        tenant: Optional[str] = None
+    ) -> bool:
+        """Queue the shadow turn for an answered primary turn; False when not mirrored"""
+        session_id = primary.session_id
+        if not self.sampled(session_id):
+            return False
+        if not self._slots.acquire(blocking=False):
+            metrics.increment("shadow_dropped")
+            self._mark_diverged(session_id)
+            return False
+        with self._diverged_lock:
+            history_complete = session_id not in self._diverged
+        try:
+            # A fresh context: the shadow turn inherits no trace, profile or deadline
+            self._pool.submit(
+                contextvars.Context().run,
+                self._run, user_id, message, primary, primary_latency, tenant, history_complete
+            )
+        except RuntimeError:
+            self._slots.release()
+            return False
+        return True
+
+    def close(self) -> None:
+        """Abandon queued shadow turns and flush the record"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._writer.close()
+        self.agent.sessions.close()
+        self.agent.tool_runtime.shutdown()
+        if self._writer.dropped:
+            logger.warning(f"Shadow recorder dropped {self._writer.dropped} turns")
+
+    def _run(
+        self,
+        user_id: str,
+        message: str,
+        primary: MessageResponse,
+        primary_latency: float,
+        tenant: Optional[str],
+        history_complete: bool
+    ) -> None:
+        try:
+            start = time.perf_counter()
+            shadow = None
+            error = None
+            token = metrics_namespace.set("shadow_")
+            try:
+                shadow = self.agent.process_message(
+                    user_id,
+                    message,
+                    primary.session_id,
+                    timeout=self.timeout,
+                    priority=BACKGROUND,
+                    tenant=tenant
+                )
+            except Exception as e:
+                error = type(e).__name__
+                logger.warning(f"Shadow turn failed: {error}: {str(e)}")
+            finally:
+                metrics_namespace.reset(token)
+            latency = time.perf_counter() - start
+            metrics.increment("shadow_errors" if shadow is None else "shadow_turns")
+            self._writer.write(self._entry(primary, primary_latency, shadow, latency, error, history_complete))
+        finally:
+            self._slots.release()
+
+    def _entry(
+        self,
+        primary: MessageResponse,
+        primary_latency: float,
+        shadow: Optional[MessageResponse],
+        shadow_latency: float,
+        error: Optional[str],
+        history_complete: bool
+    ) -> Dict[str, Any]:
+        session = hmac.new(self._salt, primary.session_id.encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+        entry: Dict[str, Any] = {
+            "ts": round(time.time(), 4),
+            "session": session,
+            "history_complete": history_complete,
+            "error": error,
+            "primary": _side(primary, primary_latency),
+            "shadow": _side(shadow, shadow_latency) if shadow is not None else None,
+        }
+        if shadow is not None:
+            entry["similarity"] = round(answer_similarity(primary.response, shadow.response), 3)
+            entry["diff"] = answer_diff(primary.response, shadow.response)
+        return entry
+
+    def _mark_diverged(self, session_id: str) -> None:
+        """Later shadow turns of the session run without the skipped turn in their history"""
+        with self._diverged_lock:
+            self._diverged[session_id] = None
+            self._diverged.move_to_end(session_id)
+            while len(self._diverged) > _MAX_DIVERGED:
+                self._diverged.popitem(last=False)
+
+
+def _side(response: MessageResponse, latency: float) -> Dict[str, Any]:
+    context = response.context or {}
+    return {
+        "query_type": response.query_type,
+        "latency_ms": round(latency * 1000, 1),
+        "token_usage": context.get("token_usage"),
+        "model_tier": context.get("model_tier"),
+        "degraded": context.get("degraded_reason"),
+        "answer_chars": len(response.response),
+    }
+
+
+def runner_from_settings(settings: Any) -> ShadowRunner:
+    """ShadowRunner configured by the shadow_* settings"""
+    return ShadowRunner(
+        build_shadow_agent(settings.shadow_overrides),
+        settings.shadow_record_path,
+        settings.shadow_sample_rate,
+        settings.shadow_max_concurrency,
+        settings.shadow_timeout_seconds,
+        settings.traffic_record_salt
+    )
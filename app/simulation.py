@@ -0,0 +1,64 @@
+import math
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class SimulatedChatModel(BaseChatModel):
+    """
+    Offline stand-in for the chat model, used for load tests and replays
+    Answers after a log-normally distributed delay plus generation time and
+    reports token usage like the OpenAI client, so scheduling, routing and
+    metrics behave as in production without provider calls or cost
+    """
+
+    latency_median: float = 0.8
+    latency_sigma: float = 0.5
+    tokens_per_second: float = 60.0
+    seed: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "simulated-chat-model"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        question = next(
+            (str(message.content) for message in reversed(messages) if isinstance(message, HumanMessage)),
+            ""
+        )
+        answer = (
+            f"Here is some general information about your question \"{question[:80]}\". "
+            "Coverage, eligibility and pricing depend on the insurer and your circumstances, "
+            "so please confirm the details with a licensed insurance professional."
+        )
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        completion_tokens = len(answer) // 4
+
+        rng = random.Random(self.seed) if self.seed is not None else random
+        delay = self.latency_median * math.exp(rng.gauss(0.0, self.latency_sigma))
+        time.sleep(delay + completion_tokens / self.tokens_per_second)
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=answer))],
+            llm_output={"token_usage": usage, "model_name": self._llm_type}
+        )
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"latency_median": self.latency_median, "latency_sigma": self.latency_sigma}
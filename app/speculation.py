@@ -0,0 +1,143 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextvars import ContextVar, copy_context
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from langchain.tools import BaseTool
+
+from .knowledge import current_knowledge
+from .metrics import metrics
+from .profiling import profiled
+from .tools import find_policy_types
+
+logger = logging.getLogger(__name__)
+
+# Tool the agent almost always calls for a given query type
+SPECULATIVE_TOOLS = {
+    "claims": "get_claims_process",
+    "policy_type": "get_policy_type_info",
+}
+
+# Prefetch started for the turn running in the current context
+current_prefetch: ContextVar[Optional["Prefetch"]] = ContextVar("current_prefetch", default=None)
+
+
+def _canonical(tool_input: Union[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Normalize tool arguments so equivalent calls compare equal"""
+    if isinstance(tool_input, str):
+        tool_input = {"__arg1": tool_input}
+    return {
+        key: str(value).strip().lower().replace(" ", "_")
+        for key, value in tool_input.items()
+        if value is not None
+    }
+
+
+class Prefetch:
+    """
+    A tool call started before the agent asked for it
+    Tracks whether the result was injected into the prompt or served to the agent
+    """
+
+    __slots__ = ("tool_name", "tool_input", "future", "injected", "served")
+
+    def __init__(self, tool_name: str, tool_input: Dict[str, Any], future: "Future[str]"):
+        self.tool_name = tool_name
+        self.tool_input = tool_input
+        self.future = future
+        self.injected = False
+        self.served = False
+
+    def matches(self, tool_name: str, tool_input: Union[str, Dict[str, Any]]) -> bool:
+        """Whether a requested call is the one that was prefetched"""
+        return tool_name == self.tool_name and _canonical(tool_input) == _canonical(self.tool_input)
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Prefetched output, or None if not ready in time or failed"""
+        try:
+            return self.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return None
+        except Exception as e:
+            logger.warning(f"Speculative {self.tool_name} call failed: {str(e)}")
+            return None
+
+    def record_outcome(self, intermediate_steps: Sequence[Tuple[Any, Any]]) -> str:
+        """Classify the prefetch as a hit or miss once the turn finishes"""
+        called = [action for action, _ in intermediate_steps if action.tool == self.tool_name]
+        if self.served or (self.injected and not called):
+            metrics.increment("speculative_hits")
+            return "hit"
+        metrics.increment("speculative_misses")
+        return "miss"
+
+
+class SpeculativeTool(BaseTool):
+    """Wraps a tool so a matching prefetched result is served instantly"""
+
+    tool: BaseTool
+
+    @classmethod
+    def wrap(cls, tool: BaseTool) -> "SpeculativeTool":
+        return cls(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            tool=tool
+        )
+
+    def _run(self, *args: Any, **kwargs: Any) -> str:
+        prefetch = current_prefetch.get()
+        tool_input = args[0] if args else kwargs
+        if prefetch is not None and prefetch.matches(self.name, tool_input):
+            result = prefetch.result()
+            if result is not None:
+                prefetch.served = True
+                return result
+        return self.tool._run(*args, **kwargs)
+
+
+class ToolPrefetcher:
+    """
+    Starts the tool a query type almost certainly needs, in parallel with the LLM
+    """
+
+    def __init__(self, tools: List[BaseTool], knowledge_base: Dict[str, Any], max_workers: int = 4):
+        self.tools = {tool.name: tool for tool in tools}
+        self.policy_types = list(knowledge_base.get("policy_types", {}).keys())
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        metrics.register_gauge("speculative_hit_rate", self.hit_rate)
+
+    def guess_input(self, query_type: str, message: str) -> Optional[Dict[str, Any]]:
+        """Predict the arguments of the likely tool call, if unambiguous"""
+        if query_type == "claims":
+            return {}
+        if query_type == "policy_type":
+            knowledge = current_knowledge.get()
+            policy_types = knowledge.keys("policy_types") if knowledge is not None else self.policy_types
+            mentioned = find_policy_types(message, policy_types)
+            if len(mentioned) == 1:
+                return {"policy_type": mentioned[0].replace("_", " ")}
+        return None
+
+    def start(self, query_type: str, message: str) -> Optional[Prefetch]:
+        """Launch a speculative tool call for this message, if one applies"""
+        tool_name = SPECULATIVE_TOOLS.get(query_type)
+        tool = self.tools.get(tool_name) if tool_name else None
+        if tool is None:
+            return None
+
+        tool_input = self.guess_input(query_type, message)
+        if tool_input is None:
+            return None
+
+        metrics.increment("speculative_prefetches")
+        future = self._pool.submit(copy_context().run, profiled, tool.run, tool_input)
+        return Prefetch(tool_name, tool_input, future)
+
+    def hit_rate(self) -> float:
+        """Fraction of finished prefetches that the agent actually used"""
+        hits = metrics.counter("speculative_hits")
+        total = hits + metrics.counter("speculative_misses")
+        return hits / total if total else 0.0
@@ -0,0 +1,75 @@
+import asyncio
+import re
+from contextvars import copy_context
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Tuple
+
+from langchain.callbacks.base import BaseCallbackHandler
+
+from .agent import current_callbacks
+
+# Answers are streamed in pieces no longer than this, split after sentences
+_CHUNK_CHARS = 200
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def answer_chunks(text: str) -> Iterator[str]:
+    """Split an answer into sentence-aligned pieces for streaming"""
+    piece = ""
+    for sentence in _SENTENCE_END.split(text):
+        if piece and len(piece) + len(sentence) + 1 > _CHUNK_CHARS:
+            yield piece + " "
+            piece = sentence
+        else:
+            piece = f"{piece} {sentence}" if piece else sentence
+    if piece:
+        yield piece
+
+
+class ProgressCallbackHandler(BaseCallbackHandler):
+    """Forwards tool activity of a streaming turn as events"""
+
+    def __init__(self, emit: Callable[[Dict[str, Any]], None]):
+        self._emit = emit
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        self._emit({"event": "tool", "tool": serialized.get("name", "unknown")})
+
+
+async def stream_turn(run: Callable[[], Awaitable[Tuple[int, Dict[str, Any]]]]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Events of one streaming turn
+    run() processes the turn and returns (status, reply fields). While it runs,
+    a "tool" event is yielded for each tool the agent calls; then the answer
+    follows as "delta" events and the remaining reply fields as "done". A failed
+    turn yields only "done" with its error.
+    """
+    loop = asyncio.get_running_loop()
+    events: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    handler = ProgressCallbackHandler(lambda event: loop.call_soon_threadsafe(events.put_nowait, event))
+    # The handler reaches the agent's worker thread through the task context; the
+    # task copies the context it is created in (create_task(context=) needs 3.11)
+    context = copy_context()
+    context.run(current_callbacks.set, (handler,))
+    turn = context.run(loop.create_task, run())
+
+    try:
+        while not turn.done() or not events.empty():
+            getter = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait({getter, turn}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield getter.result()
+            else:
+                getter.cancel()
+    finally:
+        if not turn.done():
+            # The consumer went away; the turn still finishes in its worker thread
+            turn.cancel()
+
+    status, reply = turn.result()
+    if status != 200:
+        yield {"event": "done", **reply}
+        return
+    reply = dict(reply)
+    for piece in answer_chunks(reply.pop("response")):
+        yield {"event": "delta", "text": piece}
+    yield {"event": "done", **reply}
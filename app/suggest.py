@@ -0,0 +1,185 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Display order of suggestion kinds when match quality is equal
+KIND_RANK = {"policy_type": 0, "faq": 1, "glossary": 2, "rider": 3}
+
+# Canonical phrasings for common_questions entries; other keys get a generated label
+CANONICAL_QUESTIONS = {
+    ("eligibility", "age_requirements"): "What are the age requirements for life insurance?",
+    ("eligibility", "health_requirements"): "What health requirements do I need to meet?",
+    ("eligibility", "lifestyle_factors"): "How do smoking and lifestyle affect eligibility?",
+    ("eligibility", "financial_requirements"): "What financial requirements apply to coverage?",
+    ("eligibility", "residency"): "Do I need to be a resident to buy a policy?",
+    ("claims_process", "required_documents"): "What documents do I need to file a claim?",
+    ("claims_process", "processing_time"): "How long does a claim take to process?",
+    ("claims_process", "claim_submission"): "How do I submit a claim?",
+    ("claims_process", "benefit_payment"): "How is the death benefit paid out?",
+    ("claims_process", "dispute_resolution"): "What can I do if my claim is denied?",
+    ("premium_calculation", "primary_factors"): "What affects my premium?",
+    ("premium_calculation", "secondary_factors"): "What else can change my premium?",
+    ("premium_calculation", "payment_frequency"): "Is it cheaper to pay premiums annually or monthly?",
+    ("renewal_and_lapse", "renewal_terms"): "Can I renew my term policy?",
+    ("renewal_and_lapse", "grace_period"): "What is the grace period for late premiums?",
+    ("renewal_and_lapse", "reinstatement"): "Can I reinstate a lapsed policy?",
+    ("renewal_and_lapse", "automatic_premium_loan"): "What is an automatic premium loan?",
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse punctuation to single spaces (a trailing space is kept)"""
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).lstrip()
+
+
+def _title(key: str) -> str:
+    return key.replace("_", " ").capitalize()
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return " ".join(f"{_title(key)}: {_as_text(item)}" for key, item in value.items())
+    return str(value)
+
+
+class _TrieNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.top: List[Tuple[Tuple[int, int, int], int]] = []
+
+
+class SuggestionIndex:
+    """
+    Typeahead over glossary terms, policy types, riders and canonical FAQ questions
+    Every entry is inserted from each word start, and each trie node keeps its
+    best few entries precomputed, so a lookup is a walk of the query's length.
+    One typo (substitution, insertion or deletion) is tolerated for queries of
+    four or more characters. Answers are built once with the index.
+    """
+
+    def __init__(self, knowledge_base: Dict[str, Any], per_node: int = 10, fuzzy_min_length: int = 4):
+        self.per_node = per_node
+        self.fuzzy_min_length = fuzzy_min_length
+        self.entries: List[Dict[str, str]] = []
+        self.answers: Dict[str, Dict[str, str]] = {}
+        self._root = _TrieNode()
+
+        for entry, answer in self._collect(knowledge_base):
+            self._add(entry, answer)
+        logger.info(f"Suggestion index built with {len(self.entries)} entries")
+
+    def _collect(self, knowledge_base: Dict[str, Any]):
+        for key, info in knowledge_base.get("policy_types", {}).items():
+            answer = info.get("description", "") if isinstance(info, dict) else _as_text(info)
+            yield {"id": f"policy_type:{key}", "kind": "policy_type", "label": f"{_title(key)} insurance"}, answer
+
+        for key, definition in knowledge_base.get("glossary", {}).items():
+            yield {"id": f"glossary:{key}", "kind": "glossary", "label": _title(key)}, _as_text(definition)
+
+        for section, topics in knowledge_base.get("common_questions", {}).items():
+            if not isinstance(topics, dict):
+                continue
+            for key, value in topics.items():
+                if section == "policy_riders":
+                    label = _title(key) if key.endswith("rider") else f"{_title(key)} rider"
+                    yield {"id": f"rider:{key}", "kind": "rider", "label": label}, _as_text(value)
+                else:
+                    label = CANONICAL_QUESTIONS.get((section, key), f"{_title(section)}: {_title(key).lower()}")
+                    yield {"id": f"faq:{section}.{key}", "kind": "faq", "label": label}, _as_text(value)
+
+    def _add(self, entry: Dict[str, str], answer: str) -> None:
+        index = len(self.entries)
+        entry["answer_url"] = f"/suggest/answers/{entry['id']}"
+        self.entries.append(entry)
+        self.answers[entry["id"]] = {"id": entry["id"], "kind": entry["kind"], "label": entry["label"], "answer": answer}
+
+        label = normalize(entry["label"]).rstrip()
+        starts = [0] + [match.end() for match in re.finditer(" ", label)]
+        for position, start in enumerate(starts):
+            # Matches at the start of the label outrank mid-label matches
+            rank = (min(position, 1), KIND_RANK.get(entry["kind"], len(KIND_RANK)), len(label))
+            node = self._root
+            for char in label[start:]:
+                node = node.children.setdefault(char, _TrieNode())
+                self._offer(node, rank, index)
+
+    def _offer(self, node: _TrieNode, rank: Tuple[int, int, int], index: int) -> None:
+        for position, (existing_rank, existing) in enumerate(node.top):
+            if existing == index:
+                if rank < existing_rank:
+                    node.top[position] = (rank, index)
+                    node.top.sort()
+                return
+        node.top.append((rank, index))
+        node.top.sort()
+        del node.top[self.per_node:]
+
+    def _exact(self, query: str) -> Optional[_TrieNode]:
+        node = self._root
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def _fuzzy(self, query: str) -> List[_TrieNode]:
+        """Nodes reached by the query with exactly one edit"""
+        found: List[_TrieNode] = []
+        stack: List[Tuple[_TrieNode, int, bool]] = [(self._root, 0, False)]
+        while stack:
+            node, position, edited = stack.pop()
+            if position == len(query):
+                if edited:
+                    found.append(node)
+                continue
+            char = query[position]
+            child = node.children.get(char)
+            if child is not None:
+                stack.append((child, position + 1, edited))
+            if edited:
+                continue
+            # Deletion: skip a query character
+            stack.append((node, position + 1, True))
+            for other, other_child in node.children.items():
+                if other != char:
+                    # Substitution, then insertion of a character missing from the query
+                    stack.append((other_child, position + 1, True))
+                    stack.append((other_child, position, True))
+        return found
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Best entries for a partial query, exact prefix matches first"""
+        query = normalize(query)
+        if not query.strip():
+            return []
+
+        results: List[Dict[str, Any]] = []
+        seen = set()
+        node = self._exact(query)
+        if node is not None:
+            for _, index in node.top:
+                seen.add(index)
+                results.append(dict(self.entries[index], fuzzy=False))
+                if len(results) == limit:
+                    return results
+
+        if len(query.strip()) >= self.fuzzy_min_length:
+            candidates = sorted(
+                {item for fuzzy_node in self._fuzzy(query) for item in fuzzy_node.top}
+            )
+            for _, index in candidates:
+                if index not in seen:
+                    seen.add(index)
+                    results.append(dict(self.entries[index], fuzzy=True))
+                    if len(results) == limit:
+                        break
+        return results
+
+    def answer(self, entry_id: str) -> Optional[Dict[str, str]]:
+        return self.answers.get(entry_id)
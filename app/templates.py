@@ -0,0 +1,364 @@
+import html
+import logging
+import re
+import zipfile
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_PATTERN = re.compile(r"(\$?)\[([^\]]+)\](%?)")
+SECTION_PATTERN = re.compile(r"^## (.+)$", re.MULTILINE)
+
+MONEY = "money"
+INTEGER = "integer"
+PERCENT = "percent"
+CHOICE = "choice"
+TEXT = "text"
+
+# Failed records kept for errors.ndjson in a zip archive; later ones are only counted
+_MAX_ZIP_ERRORS = 1000
+
+# Longest accepted record; a longer line is skipped and reported as a failed record
+_MAX_LINE_BYTES = 64 * 1024
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+class TemplateField:
+    """
+    A typed placeholder in a quote template
+    convert() validates a raw record value and returns its display text
+    """
+
+    __slots__ = ("name", "kind", "choices")
+
+    def __init__(self, name: str, kind: str, choices: Optional[Tuple[str, ...]] = None):
+        self.name = name
+        self.kind = kind
+        self.choices = choices
+
+    def convert(self, value: Any) -> str:
+        if value is None or value == "":
+            raise ValueError(f"Missing value for '{self.name}'")
+        if self.kind == MONEY:
+            amount = float(str(value).replace(",", "").lstrip("$"))
+            return f"{amount:,.0f}" if amount == int(amount) else f"{amount:,.2f}"
+        if self.kind == INTEGER:
+            return str(int(value))
+        if self.kind == PERCENT:
+            return f"{float(str(value).rstrip('%')):g}"
+        if self.kind == CHOICE:
+            text = str(value)
+            if text not in self.choices:
+                raise ValueError(f"'{self.name}' must be one of: {', '.join(self.choices)}")
+            return text
+        return str(value)
+
+    def describe(self) -> Dict[str, Any]:
+        description: Dict[str, Any] = {"name": self.name, "type": self.kind}
+        if self.choices:
+            description["choices"] = list(self.choices)
+        return description
+
+
+def _classify(label: str, placeholder: str, currency: str, percent: str) -> TemplateField:
+    """Infer a field's name and type from its label and placeholder text"""
+    name = _slug(label) or _slug(placeholder)
+    if currency:
+        return TemplateField(name, MONEY)
+    if percent:
+        return TemplateField(name, PERCENT)
+    if "/" in placeholder:
+        options = [option.strip() for option in placeholder.split("/")]
+        if "etc." in options:
+            # An open-ended list only suggests values
+            return TemplateField(name, TEXT)
+        return TemplateField(name, CHOICE, tuple(options))
+    if placeholder.lower() == "age":
+        return TemplateField(name, INTEGER)
+    return TemplateField(name, TEXT)
+
+
+def _markdown_to_html(markdown: str) -> str:
+    """Convert the Markdown subset used by the templates (headings, bold, lists, rules)"""
+    lines: List[str] = []
+    in_list = False
+    for line in markdown.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("- "):
+            if not in_list:
+                lines.append("<ul>")
+                in_list = True
+            lines.append(f"<li>{_inline(stripped[2:])}</li>")
+            continue
+        if in_list:
+            lines.append("</ul>")
+            in_list = False
+        if not stripped:
+            continue
+        if stripped == "---":
+            lines.append("<hr>")
+        elif stripped.startswith("#"):
+            level = len(stripped) - len(stripped.lstrip("#"))
+            lines.append(f"<h{level}>{_inline(stripped[level:].strip())}</h{level}>")
+        else:
+            lines.append(f"<p>{_inline(stripped)}</p>")
+    if in_list:
+        lines.append("</ul>")
+    return "\n".join(lines)
+
+
+def _inline(text: str) -> str:
+    return re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
+
+
+class QuoteTemplate:
+    """
+    A policy template compiled into format strings
+    Parsing, field typing and the Markdown-to-HTML conversion happen once; a
+    render is field conversion plus a single str.format_map
+    """
+
+    def __init__(self, key: str, title: str, body: str):
+        self.key = key
+        self.title = title
+        self.fields: Dict[str, TemplateField] = {}
+
+        parts: List[str] = []
+        for line in body.splitlines(keepends=True):
+            position = 0
+            for match in PLACEHOLDER_PATTERN.finditer(line):
+                currency, placeholder, percent = match.groups()
+                label = line[:match.start()].rsplit(":", 1)[0] if ":" in line[:match.start()] else ""
+                field = _classify(label.replace("*", "").strip(" -"), placeholder, currency, percent)
+                name = field.name
+                suffix = 2
+                while name in self.fields:
+                    name = f"{field.name}_{suffix}"
+                    suffix += 1
+                field.name = name
+                self.fields[name] = field
+
+                parts.append(_escape_braces(line[position:match.start()]))
+                parts.append(f"{currency}{{{name}}}{percent}")
+                position = match.end()
+            parts.append(_escape_braces(line[position:]))
+
+        self.markdown_format = "".join(parts)
+        self.html_format = _markdown_to_html(self.markdown_format)
+
+    def values(self, record: Dict[str, Any]) -> Dict[str, str]:
+        """Validate a record and return display text for every field"""
+        return {name: field.convert(record.get(name)) for name, field in self.fields.items()}
+
+    def render_markdown(self, record: Dict[str, Any]) -> str:
+        return self.markdown_format.format_map(self.values(record))
+
+    def render_html(self, record: Dict[str, Any]) -> str:
+        values = {name: html.escape(value) for name, value in self.values(record).items()}
+        return self.html_format.format_map(values)
+
+    def renderer(self, output_format: str) -> Callable[[Dict[str, Any]], str]:
+        if output_format == "html":
+            return self.render_html
+        if output_format == "markdown":
+            return self.render_markdown
+        raise ValueError("Format must be 'markdown' or 'html'")
+
+    def describe(self) -> Dict[str, Any]:
+        return {"template": self.key, "title": self.title, "fields": [field.describe() for field in self.fields.values()]}
+
+
+def _escape_braces(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def parse_templates(text: str) -> Dict[str, QuoteTemplate]:
+    """Compile every '## ...' section of the templates document, keyed by policy type"""
+    templates: Dict[str, QuoteTemplate] = {}
+    sections = SECTION_PATTERN.split(text)
+    # split() yields [preamble, title, body, title, body, ...]
+    for title, body in zip(sections[1::2], sections[2::2]):
+        body = body.strip().rstrip("-").strip()
+        key = _slug(title.split("Insurance")[0])
+        templates[key] = QuoteTemplate(key, title.strip(), f"## {title.strip()}\n\n{body}\n")
+    return templates
+
+
+def load_templates(path: str = "knowledge/policy_templates.md") -> Dict[str, QuoteTemplate]:
+    """Load and compile the policy templates document"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            templates = parse_templates(f.read())
+        logger.info(f"Compiled {len(templates)} quote templates")
+        return templates
+    except FileNotFoundError:
+        logger.warning(f"Quote templates not found at {path}")
+        return {}
+
+
+class QuoteRenderer:
+    """
+    Renders a stream of applicant records (one JSON object per line)
+    Records name their template with "template" and may carry an "id" that is
+    echoed back; a bad record yields an error entry instead of ending the batch
+    """
+
+    def __init__(self, templates: Dict[str, QuoteTemplate], output_format: str = "markdown"):
+        if output_format not in ("markdown", "html"):
+            raise ValueError("Format must be 'markdown' or 'html'")
+        self.output_format = output_format
+        self._renderers = {key: template.renderer(output_format) for key, template in templates.items()}
+        self.rendered = 0
+        self.failed = 0
+
+    def render_line(self, line: Optional[bytes], line_number: int) -> Dict[str, Any]:
+        """Render one NDJSON record into a result entry (None stands for an oversized line)"""
+        try:
+            if line is None:
+                raise ValueError(f"Record exceeds {_MAX_LINE_BYTES} bytes")
+            record = orjson.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Each line must be a JSON object")
+            record_id = record.get("id", line_number)
+            render = self._renderers.get(_slug(str(record.get("template", ""))))
+            if render is None:
+                raise ValueError(f"Unknown template '{record.get('template')}'")
+            document = render(record)
+            self.rendered += 1
+            return {"id": record_id, "template": _slug(str(record["template"])), "document": document}
+        except (ValueError, TypeError, OverflowError) as e:
+            self.failed += 1
+            return {"id": line_number, "error": str(e)}
+
+    def _render_batch(self, lines: List[Optional[bytes]], first_line_number: int) -> bytes:
+        return b"".join(
+            orjson.dumps(self.render_line(line, line_number)) + b"\n"
+            for line_number, line in enumerate(lines, first_line_number)
+        )
+
+    async def ndjson(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """NDJSON output, one chunk per input chunk's worth of documents, rendered off the event loop"""
+        line_number = 0
+        async for chunk_lines in _iter_line_batches(chunks):
+            if chunk_lines:
+                yield await run_in_threadpool(self._render_batch, chunk_lines, line_number + 1)
+                line_number += len(chunk_lines)
+
+    async def zip(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Zip archive output, written as the documents are rendered
+        Document bodies are not retained, but the central directory entries
+        (about 1 KB per document) are held until the archive closes, so use
+        NDJSON for unbounded batches. Repeated ids get a numeric suffix; failed
+        records go to errors.ndjson, which keeps the first _MAX_ZIP_ERRORS.
+        Rendering and compression run off the event loop, one batch at a time
+        """
+        extension = "html" if self.output_format == "html" else "md"
+        sink = _ChunkSink()
+        errors: List[bytes] = []
+        omitted = 0
+        duplicates: Dict[str, int] = {}
+
+        def write_batch(archive: zipfile.ZipFile, lines: List[Optional[bytes]], first_line_number: int) -> bytes:
+            nonlocal omitted
+            for line_number, line in enumerate(lines, first_line_number):
+                result = self.render_line(line, line_number)
+                if "error" in result:
+                    if len(errors) < _MAX_ZIP_ERRORS:
+                        errors.append(orjson.dumps(result) + b"\n")
+                    else:
+                        omitted += 1
+                    continue
+                stem = _slug(str(result["id"]))
+                name = f"{stem}.{extension}"
+                if name in archive.NameToInfo:
+                    suffix = duplicates.get(stem, 1)
+                    while name in archive.NameToInfo:
+                        suffix += 1
+                        name = f"{stem}_{suffix}.{extension}"
+                    duplicates[stem] = suffix
+                archive.writestr(name, result["document"])
+            return sink.drain()
+
+        line_number = 0
+        with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            async for chunk_lines in _iter_line_batches(chunks):
+                if not chunk_lines:
+                    continue
+                data = await run_in_threadpool(write_batch, archive, chunk_lines, line_number + 1)
+                line_number += len(chunk_lines)
+                if data:
+                    yield data
+            if omitted:
+                errors.append(orjson.dumps({"omitted": omitted}) + b"\n")
+            if errors:
+                archive.writestr("errors.ndjson", b"".join(errors))
+        yield sink.drain()
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object that zipfile streams into"""
+
+    def __init__(self):
+        self._buffer: List[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._buffer.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._buffer)
+        self._buffer = []
+        return data
+
+
+async def _iter_line_batches(chunks: AsyncIterator[bytes]) -> AsyncIterator[List[Optional[bytes]]]:
+    """
+    Complete non-empty lines per incoming chunk; a partial line is carried over
+    A line longer than _MAX_LINE_BYTES comes out as None as soon as it crosses
+    the limit, and the rest of it is discarded up to the next newline, so the
+    carried-over buffer never grows past the limit
+    """
+    pending = b""
+    skipping = False
+    async for chunk in chunks:
+        if skipping:
+            end = chunk.find(b"\n")
+            if end < 0:
+                continue
+            chunk = chunk[end + 1:]
+            skipping = False
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        batch: List[Optional[bytes]] = [
+            None if len(line) > _MAX_LINE_BYTES else line for line in lines if line.strip()
+        ]
+        if len(pending) > _MAX_LINE_BYTES:
+            batch.append(None)
+            pending = b""
+            skipping = True
+        yield batch
+    if pending.strip():
+        yield [pending]
+
+
+def render_records(templates: Dict[str, QuoteTemplate], records: Iterable[Dict[str, Any]],
+                   output_format: str = "markdown") -> Iterator[str]:
+    """Render in-process records (no JSON round trip), e.g. for batch jobs"""
+    renderers = {key: template.renderer(output_format) for key, template in templates.items()}
+    for record in records:
+        yield renderers[_slug(str(record["template"]))](record)
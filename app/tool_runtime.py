@@ -0,0 +1,233 @@
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextvars import copy_context
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+from langchain.tools import BaseTool
+
+from .knowledge import current_knowledge
+from .metrics import metrics
+from .profiling import profiled
+from .resilience import current_deadline
+
+logger = logging.getLogger(__name__)
+
+# Per-tool counters kept in the shared metrics registry as tool_<name>_<stat>
+STATS = ("calls", "errors", "timeouts", "rejected", "cache_hits")
+
+
+class ToolPolicy:
+    """
+    Execution limits for one tool
+    timeout bounds a call (the turn deadline may cut it shorter), max_concurrency
+    bounds calls in flight including abandoned ones, and cache_ttl > 0 memoizes
+    results for that many seconds. Only tools whose output depends on nothing but
+    their arguments and the knowledge base may be cached.
+    """
+
+    __slots__ = ("timeout", "max_concurrency", "cache_ttl")
+
+    def __init__(self, timeout: float = 10.0, max_concurrency: int = 8, cache_ttl: float = 0.0):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.cache_ttl = cache_ttl
+
+    def override(self, **changes: Any) -> "ToolPolicy":
+        return ToolPolicy(**{**{name: getattr(self, name) for name in self.__slots__}, **changes})
+
+
+class ToolRuntime:
+    """
+    Runs tool calls on a bounded pool with per-tool timeouts, concurrency limits and memoization
+    Calls run in a copy of the caller's context, so request state (tenant catalog,
+    documents, applicant profile, trace span) reaches the tool. Failures, timeouts
+    and rejected calls are reported to the agent as short messages it can act on.
+    Memoized results are keyed by knowledge version, so a new catalog or a
+    recompiled tenant snapshot never serves stale output.
+    """
+
+    def __init__(
+        self,
+        default_policy: ToolPolicy,
+        policies: Optional[Dict[str, ToolPolicy]] = None,
+        max_workers: int = 16,
+        max_cache_entries: int = 2048,
+        knowledge_version: Callable[[], str] = lambda: ""
+    ):
+        self.default_policy = default_policy
+        self.policies = dict(policies or {})
+        self.max_cache_entries = max_cache_entries
+        self.knowledge_version = knowledge_version
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool-runtime")
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._slots_lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str, bytes], Tuple[float, str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        metrics.register_gauge("tool_cache_entries", lambda: len(self._cache))
+
+    def policy(self, name: str) -> ToolPolicy:
+        return self.policies.get(name, self.default_policy)
+
+    def call(self, tool: BaseTool, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+        """Run tool._run under the tool's policy"""
+        name = tool.name
+        policy = self.policy(name)
+        metrics.increment(f"tool_{name}_calls")
+
+        key = self._cache_key(tool, args, kwargs) if policy.cache_ttl > 0 else None
+        if key is not None:
+            cached = self._cached(key)
+            if cached is not None:
+                metrics.increment(f"tool_{name}_cache_hits")
+                return cached
+
+        timeout = policy.timeout
+        deadline = current_deadline.get()
+        if deadline is not None:
+            timeout = max(0.0, min(timeout, deadline.remaining()))
+
+        slots = self._slots_for(name, policy)
+        waited_from = time.perf_counter()
+        if not slots.acquire(timeout=timeout):
+            metrics.increment(f"tool_{name}_rejected")
+            logger.warning(f"Tool {name} rejected: {policy.max_concurrency} calls already running")
+            return f"The {name} tool is busy right now. Answer without it or try again later."
+
+        start = time.perf_counter()
+        # One budget covers both waiting for a slot and the call itself
+        remaining = max(0.0, timeout - (start - waited_from))
+
+        def run() -> str:
+            try:
+                return tool._run(*args, **kwargs)
+            finally:
+                # Released when the call really ends, so abandoned calls still count
+                slots.release()
+                metrics.observe(f"tool_{name}_seconds", time.perf_counter() - start)
+
+        try:
+            future = self._pool.submit(copy_context().run, profiled, run)
+        except RuntimeError:
+            slots.release()
+            raise
+        try:
+            result = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            if future.cancel():
+                # Never started, so run() will not release its slot
+                slots.release()
+            metrics.increment(f"tool_{name}_timeouts")
+            logger.warning(f"Tool {name} timed out after {timeout:.1f}s")
+            return f"The {name} tool did not respond in time. Answer without it."
+        except Exception as e:
+            metrics.increment(f"tool_{name}_errors")
+            logger.error(f"Tool {name} failed: {type(e).__name__}: {str(e)}")
+            return f"The {name} tool failed. Answer without it."
+
+        if key is not None:
+            self._store(key, result, policy.cache_ttl)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool counters and latency summary for every tool with a policy or a call"""
+        snapshot = metrics.snapshot()
+        counters, timings = snapshot["counters"], snapshot["timings"]
+        names = set(self.policies) | {
+            name[len("tool_"):-len("_calls")] for name in counters if name.startswith("tool_") and name.endswith("_calls")
+        }
+        return {
+            name: {
+                **{stat: counters.get(f"tool_{name}_{stat}", 0) for stat in STATS},
+                "latency": timings.get(f"tool_{name}_seconds"),
+            }
+            for name in sorted(names)
+        }
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _slots_for(self, name: str, policy: ToolPolicy) -> threading.BoundedSemaphore:
+        with self._slots_lock:
+            slots = self._slots.get(name)
+            if slots is None:
+                slots = self._slots[name] = threading.BoundedSemaphore(policy.max_concurrency)
+            return slots
+
+    def _cache_key(self, tool: BaseTool, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[Tuple[str, str, bytes]]:
+        knowledge = current_knowledge.get()
+        version = knowledge.version if knowledge is not None else self.knowledge_version()
+        try:
+            # Bound by parameter name, so tool.run("x") and tool.run({"arg": "x"}) share an entry
+            arguments = dict(inspect.signature(tool._run).bind(*args, **kwargs).arguments)
+            return tool.name, version, orjson.dumps(arguments, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            return None
+
+    def _cached(self, key: Tuple[str, str, bytes]) -> Optional[str]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, result = entry
+            if expires < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return result
+
+    def _store(self, key: Tuple[str, str, bytes], result: str, ttl: float) -> None:
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic() + ttl, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+
+
+class ManagedTool(BaseTool):
+    """Wraps a tool so every call goes through a ToolRuntime"""
+
+    tool: BaseTool
+    runtime: Any
+
+    @classmethod
+    def wrap(cls, tool: BaseTool, runtime: ToolRuntime) -> "ManagedTool":
+        return cls(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            tool=tool,
+            runtime=runtime
+        )
+
+    def _run(self, *args: Any, **kwargs: Any) -> str:
+        return self.runtime.call(self.tool, args, kwargs)
+
+
+def runtime_from_settings(settings: Any, knowledge_version: Callable[[], str]) -> ToolRuntime:
+    """ToolRuntime configured by the tool_* settings"""
+    default_policy = ToolPolicy(
+        settings.tool_timeout_seconds,
+        settings.tool_max_concurrency,
+        settings.tool_cache_ttl_seconds
+    )
+    policies = {
+        name: default_policy.override(**overrides)
+        for name, overrides in settings.tool_policies.items()
+    }
+    return ToolRuntime(
+        default_policy,
+        policies,
+        max_workers=settings.tool_pool_workers,
+        max_cache_entries=settings.tool_cache_max_entries,
+        knowledge_version=knowledge_version
+    )
@@ -1,12 +1,27 @@
 from langchain.tools import BaseTool
-from typing import Optional, Type, Dict, Any
+from typing import Optional, Type, Dict, Any, List
 from pydantic import BaseModel, Field
 import json
 import logging
 from datetime import datetime
 
+from .applicant import current_applicant
+from .illustration import illustrate, summarize
+from .documents import current_documents
+from .knowledge import current_knowledge
+
 logger = logging.getLogger(__name__)
 
+def find_policy_types(message: str, policy_types: List[str]) -> List[str]:
+    """Return the policy type keys (e.g. 'term_life') mentioned in a message"""
+    message_lower = message.lower()
+    words = message_lower.replace("?", " ").replace(",", " ").split()
+    return [
+        policy_type for policy_type in policy_types
+        if policy_type.replace("_", " ") in message_lower
+        or policy_type.split("_")[0] in words
+    ]
+
 class PolicyTypeInput(BaseModel):
     policy_type: str = Field(description="Type of life insurance policy to get information about")
 
@@ -17,30 +32,28 @@ class PolicyTypeTool(BaseTool):
 
     def _run(self, policy_type: str) -> str:
         """Get information about a specific policy type"""
-        try:
-            knowledge_base = self._load_knowledge_base()
-            
-            # Normalize input
-            normalized_type = policy_type.lower().replace(" ", "_")
-            
-            if normalized_type in knowledge_base.get("policy_types", {}):
-                info = knowledge_base["policy_types"][normalized_type]
-                return f"""{info['description']}
+        knowledge_base = self._load_knowledge_base()
+        
+        # Normalize input
+        normalized_type = policy_type.lower().replace(" ", "_")
+        
+        if normalized_type in knowledge_base.get("policy_types", {}):
+            info = knowledge_base["policy_types"][normalized_type]
+            return f"""{info['description']}
                 
 Benefits: {', '.join(info['benefits'])}
 Duration: {info['duration']}
 Eligibility: {info['eligibility']}"""
-            else:
-                available_types = list(knowledge_base.get("policy_types", {}).keys())
-                return f"""I couldn't find information about '{policy_type}' specifically.
+        else:
+            available_types = list(knowledge_base.get("policy_types", {}).keys())
+            return f"""I couldn't find information about '{policy_type}' specifically.
 Available policy types include: {', '.join(available_types)}."""
-                
-        except Exception as e:
-            logger.error(f"Error retrieving policy type info: {str(e)}")
-            return "An error occurred while retrieving policy information. Please try again."
     
     def _load_knowledge_base(self) -> dict:
-        """Load knowledge base from file"""
+        """Load the request tenant's policy types, or the knowledge base file"""
+        knowledge = current_knowledge.get()
+        if knowledge is not None:
+            return {"policy_types": knowledge.section("policy_types")}
         try:
             with open("knowledge/insurance_data.json", "r") as f:
                 return json.load(f)
@@ -62,47 +75,53 @@ class EligibilityTool(BaseTool):
 
     def _run(self, age: Optional[int] = None, health_status: Optional[str] = None) -> str:
         """Return eligibility information based on user inputs"""
-        try:
-            knowledge_base = self._load_common_questions()
-            
-            # Start with general requirements
-            response_parts = [
-                "Life insurance eligibility typically depends on several factors:"
-            ]
-            
-            # Age requirements
-            if age is not None:
-                if age < 18:
-                    response_parts.append(f"- Age: You must be at least 18 years old to qualify. Current age: {age}")
-                elif age > 80:
-                    response_parts.append(f"- Age: Most policies are not available after age 80. Current age: {age}")
-                else:
-                    response_parts.append(f"- Age: Qualifies within standard range (18-80 years). Current age: {age}")
+        knowledge_base = self._load_common_questions()
+        
+        # Details the customer already gave earlier in the session
+        applicant = current_applicant.get()
+        if applicant is not None:
+            if age is None:
+                age = applicant.age
+            if not health_status:
+                health_status = applicant.health_status()
+        
+        # Start with general requirements
+        response_parts = [
+            "Life insurance eligibility typically depends on several factors:"
+        ]
+        
+        # Age requirements
+        if age is not None:
+            if age < 18:
+                response_parts.append(f"- Age: You must be at least 18 years old to qualify. Current age: {age}")
+            elif age > 80:
+                response_parts.append(f"- Age: Most policies are not available after age 80. Current age: {age}")
             else:
-                response_parts.append("- Age: Typically 18-80 years old")
-            
-            # Health requirements
-            if health_status:
-                response_parts.append(f"- Health status: {health_status}")
-            else:
-                response_parts.append("- Health status: Medical examination required")
-            
-            # Other requirements
-            response_parts.extend([
-                "- Medical history: Full disclosure required",
-                "- Lifestyle factors: Smoking, alcohol consumption, etc.",
-                "- Financial stability: Proof of insurable interest needed",
-                "- Occupation risk level: Higher risk occupations may have restrictions"
-            ])
-            
-            return "\n".join(response_parts)
-            
-        except Exception as e:
-            logger.error(f"Error checking eligibility: {str(e)}")
-            return "An error occurred while checking eligibility. Please provide your age and health status."
+                response_parts.append(f"- Age: Qualifies within standard range (18-80 years). Current age: {age}")
+        else:
+            response_parts.append("- Age: Typically 18-80 years old")
+        
+        # Health requirements
+        if health_status:
+            response_parts.append(f"- Health status: {health_status}")
+        else:
+            response_parts.append("- Health status: Medical examination required")
+        
+        # Other requirements
+        response_parts.extend([
+            "- Medical history: Full disclosure required",
+            "- Lifestyle factors: Smoking, alcohol consumption, etc.",
+            "- Financial stability: Proof of insurable interest needed",
+            "- Occupation risk level: Higher risk occupations may have restrictions"
+        ])
+        
+        return "\n".join(response_parts)
     
     def _load_common_questions(self) -> dict:
         """Load common questions from knowledge base"""
+        knowledge = current_knowledge.get()
+        if knowledge is not None:
+            return knowledge.section("common_questions")
         try:
             with open("knowledge/insurance_data.json", "r") as f:
                 data = json.load(f)
@@ -120,12 +139,11 @@ class ClaimsProcessTool(BaseTool):
 
     def _run(self, **kwargs) -> str:
         """Return claims process information"""
-        try:
-            knowledge_base = self._load_claims_info()
-            
-            required_docs = ", ".join(knowledge_base.get("required_documents", []))
-            
-            return f"""The life insurance claims process involves these steps:
+        knowledge_base = self._load_claims_info()
+        
+        required_docs = ", ".join(knowledge_base.get("required_documents", []))
+        
+        return f"""The life insurance claims process involves these steps:
 
 1. Notify the insurance company of the policyholder's death
 2. Submit the following documents:
@@ -135,13 +153,12 @@ class ClaimsProcessTool(BaseTool):
 4. Upon approval, the death benefit will be paid to beneficiaries
 
 Contact your insurance provider directly to initiate the claims process."""
-                
-        except Exception as e:
-            logger.error(f"Error retrieving claims process: {str(e)}")
-            return "An error occurred while retrieving claims information."
     
     def _load_claims_info(self) -> dict:
         """Load claims information from knowledge base"""
+        knowledge = current_knowledge.get()
+        if knowledge is not None:
+            return knowledge.get("common_questions", "claims_process", {})
         try:
             with open("knowledge/insurance_data.json", "r") as f:
                 data = json.load(f)
@@ -152,9 +169,48 @@ Contact your insurance provider directly to initiate the claims process."""
                 "processing_time": "30-60 days"
             }
 
-# List of all tools
+class IllustrationInput(BaseModel):
+    policy_type: str = Field(description="Permanent policy type: whole life, universal life or variable life")
+    issue_age: int = Field(description="Insured's age when the policy is issued")
+    face_amount: float = Field(description="Death benefit amount in dollars")
+    annual_premium: float = Field(description="Annual premium in dollars")
+
+class IllustrationTool(BaseTool):
+    name = "get_policy_illustration"
+    description = "Project year-by-year cash value, surrender value and death benefit for whole, universal or variable life"
+    args_schema: Type[BaseModel] = IllustrationInput
+
+    def _run(self, policy_type: str, issue_age: int, face_amount: float, annual_premium: float) -> str:
+        """Return a summary of a policy illustration"""
+        try:
+            illustration = illustrate(policy_type, issue_age, face_amount, annual_premium)
+            return summarize(illustration)
+        except ValueError as e:
+            return f"I can't build that illustration: {str(e)}"
+
+class PolicyDocumentInput(BaseModel):
+    query: str = Field(description="What to look up in the customer's own policy documents")
+
+class PolicyDocumentTool(BaseTool):
+    name = "search_policy_documents"
+    description = "Search the customer's uploaded policy documents and return matching sections to cite"
+    args_schema: Type[BaseModel] = PolicyDocumentInput
+
+    def _run(self, query: str) -> str:
+        """Return the best-matching sections of the session's documents"""
+        index = current_documents.get()
+        if index is None or not index.documents:
+            return "The customer has not uploaded any policy documents in this session."
+        hits = index.search(query)
+        if not hits:
+            return "No section of the uploaded documents matches that question."
+        return "\n\n".join(f"[{hit['document']}, {hit['section']}]\n{hit['snippet']}" for hit in hits)
+
+# List of all tools (unexpected failures propagate; ToolRuntime reports them to the agent)
 TOOLS = [
     PolicyTypeTool(),
     EligibilityTool(),
-    ClaimsProcessTool()
+    ClaimsProcessTool(),
+    IllustrationTool(),
+    PolicyDocumentTool()
 ]
\ No newline at end of file
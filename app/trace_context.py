@@ -0,0 +1,148 @@
+import logging
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# Longest attribute value kept on a span (tool inputs, error messages)
+_MAX_ATTRIBUTE_CHARS = 256
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span_id, sampled) from a W3C traceparent header"""
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+class _Trace:
+    """Spans of one sampled trace, exported together when the local root ends"""
+
+    __slots__ = ("trace_id", "exporter", "spans", "finished", "lock")
+
+    def __init__(self, trace_id: str, exporter: Any):
+        self.trace_id = trace_id
+        self.exporter = exporter
+        self.spans: List[Span] = []
+        self.finished = False
+        self.lock = threading.Lock()
+
+    def start(self, name: str, parent_id: Optional[str], attributes: Optional[Dict[str, Any]]) -> "Span":
+        return Span(self, name, parent_id, attributes)
+
+    def ended(self, span: "Span", root: bool) -> None:
+        with self.lock:
+            if self.finished:
+                # Work abandoned by the request (e.g. a timed-out LLM call) ends late
+                late = [span]
+            else:
+                self.spans.append(span)
+                late = None
+                if root:
+                    self.finished = True
+                    spans, self.spans = self.spans, []
+        try:
+            if late is not None:
+                self.exporter.export(late)
+            elif root:
+                self.exporter.export(spans)
+        except Exception as e:
+            logger.error(f"Could not export trace {self.trace_id}: {str(e)}")
+
+
+class Span:
+    """One timed operation within a sampled trace"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "status")
+
+    def __init__(self, trace: _Trace, name: str, parent_id: Optional[str], attributes: Optional[Dict[str, Any]]):
+        self.trace = trace
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "ok"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if isinstance(value, str) and len(value) > _MAX_ATTRIBUTE_CHARS:
+            value = value[:_MAX_ATTRIBUTE_CHARS]
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.set_attribute("error.type", type(error).__name__)
+        self.set_attribute("error.message", str(error))
+
+    def end(self, root: bool = False) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.ended(self, root)
+
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms(), 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+# Innermost open span of the sampled trace running in the current context
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Optional[Span]]:
+    """Child of the current span; a no-op outside a sampled trace"""
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.trace.start(name, parent.span_id, attributes)
+    token = current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.record_error(e)
+        raise
+    finally:
+        current_span.reset(token)
+        child.end()
+
+
+def inject(headers: Dict[str, str]) -> None:
+    """Add the current trace context to outgoing request headers"""
+    current = current_span.get()
+    if current is not None:
+        headers["traceparent"] = current.traceparent
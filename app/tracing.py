@@ -0,0 +1,174 @@
+import logging
+import random
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+from uuid import UUID
+
+import orjson
+from langchain.callbacks.base import BaseCallbackHandler
+
+from config.settings import settings
+# Span bookkeeping lives in a module without settings or LangChain so HTTP
+# clients can propagate trace context; re-exported here for the server side
+from .trace_context import (
+    _MAX_ATTRIBUTE_CHARS, Span, _new_id, _Trace, current_span, inject, parse_traceparent, span
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FileSpanExporter:
+    """Appends finished spans to a JSONL file, one trace per write"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List["Span"]) -> None:
+        data = b"".join(orjson.dumps(span.to_dict()) + b"\n" for span in spans)
+        with self._lock, open(self.path, "ab") as f:
+            f.write(data)
+
+
+class ConsoleSpanExporter:
+    """Prints each trace as an indented tree of span durations"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def export(self, spans: List["Span"]) -> None:
+        depths: Dict[str, int] = {}
+        lines = []
+        for span in sorted(spans, key=lambda span: span.start_ns):
+            depth = depths.get(span.parent_id, -1) + 1
+            depths[span.span_id] = depth
+            attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+            status = " ERROR" if span.status == "error" else ""
+            lines.append(f"{'  ' * depth}{span.name} {span.duration_ms():.1f} ms{status} {attributes}".rstrip())
+        with self._lock:
+            self.stream.write(f"trace {spans[0].trace.trace_id}\n" + "\n".join(lines) + "\n")
+            self.stream.flush()
+
+
+_exporter: Any = None
+_exporter_lock = threading.Lock()
+
+
+def default_exporter() -> Any:
+    """Exporter configured by settings, created on first use"""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            if settings.trace_exporter == "console":
+                _exporter = ConsoleSpanExporter()
+            else:
+                _exporter = FileSpanExporter(settings.trace_file)
+        return _exporter
+
+
+@contextmanager
+def start_trace(
+    name: str,
+    traceparent: Optional[str] = None,
+    attributes: Optional[Dict[str, Any]] = None,
+    sample_rate: Optional[float] = None,
+    exporter: Any = None,
+    trust_parent: Optional[bool] = None
+) -> Iterator[Optional[Span]]:
+    """
+    Open the local root span of a request
+    The sampling decision is made here, once per trace. An incoming traceparent
+    is always continued, but its sampled flag only decides for trusted callers
+    (trust_parent, by default trace_trust_parent); otherwise sample_rate
+    (trace_sample_rate) of traces are kept. Yields None, and records nothing
+    below it, when the trace is not sampled.
+    """
+    if not settings.tracing_enabled and exporter is None:
+        yield None
+        return
+    trace_id, parent_id, sampled = parse_traceparent(traceparent) or (None, None, False)
+    if trust_parent is None:
+        trust_parent = settings.trace_trust_parent
+    if trace_id is None or not trust_parent:
+        rate = settings.trace_sample_rate if sample_rate is None else sample_rate
+        sampled = rate > 0 and random.random() < rate
+    if not sampled:
+        yield None
+        return
+
+    trace = _Trace(trace_id or _new_id(128), exporter or default_exporter())
+    root = trace.start(name, parent_id, attributes)
+    token = current_span.set(root)
+    try:
+        yield root
+    except Exception as e:
+        root.record_error(e)
+        raise
+    finally:
+        current_span.reset(token)
+        root.end(root=True)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Records LLM calls (with token counts) and tool runs as spans
+    Spans are children of the span current where LangChain starts the run,
+    i.e. the agent step that planned the call
+    """
+
+    def __init__(self):
+        self._spans: Dict[UUID, Span] = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id: UUID, name: str, attributes: Dict[str, Any]) -> None:
+        parent = current_span.get()
+        if parent is None:
+            return
+        child = parent.trace.start(name, parent.span_id, attributes)
+        with self._lock:
+            self._spans[run_id] = child
+
+    def _finish(self, run_id: UUID, error: Optional[BaseException] = None) -> Optional[Span]:
+        with self._lock:
+            finished = self._spans.pop(run_id, None)
+        if finished is not None:
+            if error is not None:
+                finished.record_error(error)
+            finished.end()
+        return finished
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *,
+                            run_id: UUID, **kwargs: Any) -> None:
+        params = kwargs.get("invocation_params") or {}
+        model = params.get("model_name") or params.get("model") or params.get("_type", "unknown")
+        self._start(run_id, "llm", {"llm.model": model, "llm.messages": sum(len(batch) for batch in messages)})
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            llm_span = self._spans.get(run_id)
+        if llm_span is not None and response is not None:
+            usage = (response.llm_output or {}).get("token_usage", {})
+            for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+                if key in usage:
+                    llm_span.set_attribute(f"llm.{key}", usage[key])
+        self._finish(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error)
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = serialized.get("name", "unknown")
+        self._start(run_id, f"tool {name}", {"tool.name": name, "tool.input": input_str[:_MAX_ATTRIBUTE_CHARS]})
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error)
+
+
+# Passed to agent runs inside a sampled trace
+tracing_callbacks = TracingCallbackHandler()
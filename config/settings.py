@@ -1,5 +1,5 @@
 from pydantic import BaseSettings
-from typing import Optional
+from typing import Any, Dict, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -7,11 +7,75 @@ class Settings(BaseSettings):
     openai_api_key: str
     openai_model: str = "gpt-3.5-turbo"
     openai_temperature: float = 0.3
+    simulated_llm: bool = False  # answer with SimulatedChatModel instead of calling OpenAI (load tests)
+    simulated_llm_latency: float = 0.8  # median seconds per simulated call
+    
+    # Agent Settings
+    speculative_tools: bool = False  # prefetch the likely tool call in parallel with the LLM
+    speculative_inject_timeout: float = 0.05  # seconds to wait before injecting a prefetched result
+    agent_max_iterations: int = 6  # model steps per turn
+    agent_max_execution_time: float = 30.0  # seconds per turn, checked between steps
+    max_parallel_tools: int = 4  # concurrent tool calls within one model step
+    agent_system_prompt: Optional[str] = None  # replaces the built-in system prompt
+    agent_tools: Optional[List[str]] = None  # tool names offered to the model; all when unset
+    
+    # Tool Runtime (tool_policies override timeout, max_concurrency and cache_ttl per tool)
+    tool_timeout_seconds: float = 10.0
+    tool_max_concurrency: int = 8  # calls in flight per tool
+    tool_pool_workers: int = 16
+    tool_cache_ttl_seconds: float = 0.0  # memoize only tools that opt in below
+    tool_cache_max_entries: int = 2048
+    tool_policies: Dict[str, Dict[str, Any]] = {
+        "get_policy_type_info": {"cache_ttl": 300.0},
+        "get_claims_process": {"cache_ttl": 300.0},
+        "get_policy_illustration": {"timeout": 20.0, "max_concurrency": 4, "cache_ttl": 300.0},
+    }
+    
+    # Model Routing (tiers ordered cheapest first; costs are USD per 1k tokens)
+    model_routing: bool = False
+    model_tiers: Dict[str, Dict[str, Any]] = {
+        "fast": {"model": "gpt-3.5-turbo", "input_cost_per_1k": 0.0005, "output_cost_per_1k": 0.0015},
+        "standard": {"model": "gpt-4-turbo", "input_cost_per_1k": 0.01, "output_cost_per_1k": 0.03},
+        "advanced": {"model": "gpt-4", "input_cost_per_1k": 0.03, "output_cost_per_1k": 0.06},
+    }
+    model_tier_order: List[str] = ["fast", "standard", "advanced"]
+    routing_table: Dict[str, str] = {
+        "general": "fast",
+        "policy_type": "fast",
+        "claims": "fast",
+        "eligibility": "fast",
+        "benefits": "standard",
+        "cost": "standard",
+        "comparison": "advanced",
+    }
+    
+    # Latency Budgets
+    default_sla_seconds: float = 20.0
+    endpoint_sla_seconds: Dict[str, float] = {"/chat": 20.0, "/chat/stream": 20.0}
+    degraded_reserve_seconds: float = 0.5  # kept back from the deadline to build a fallback answer
+    llm_request_timeout: float = 15.0
+    llm_max_retries: int = 1
+    llm_max_workers: int = 32
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+    
+    # LLM Scheduling (align limits with the provider's RPM/TPM quota)
+    llm_scheduler_enabled: bool = True
+    llm_rpm_limit: int = 3500
+    llm_tpm_limit: int = 90000
+    llm_max_concurrency: int = 64
+    llm_priority_weights: Dict[str, float] = {"interactive": 8.0, "batch": 2.0, "background": 1.0}
     
     # Application Settings
     app_host: str = "0.0.0.0"
     app_port: int = 8000
     debug: bool = False
+    compression_min_bytes: int = 1024
+    knowledge_cache_max_age: int = 300  # seconds clients may reuse knowledge listings
+    quote_templates_path: str = "knowledge/policy_templates.md"
+    knowledge_snapshot_dir: str = "knowledge/snapshots"  # compiled tenant catalogs (scripts/compile_knowledge.py)
+    max_resident_tenants: int = 64  # tenant snapshots kept mapped per worker
+    admin_token: Optional[str] = None  # X-Admin-Token for /admin/*, bulk /sessions, X-Profile and trusted traceparent
     
     # Database Settings
     database_url: str = "sqlite:///./insurance_agent.db"
@@ -19,6 +83,59 @@ class Settings(BaseSettings):
     # Session Management
     session_timeout_minutes: int = 30
     max_session_history: int = 50
+    profile_history_messages: int = 8  # history sent with an applicant profile summary
+    max_hot_sessions: int = 10000
+    session_store_path: Optional[str] = None  # SQLite spill file; temp file when unset
+    shared_session_store_path: Optional[str] = None  # write-behind tier shared by nodes; needs affinity routing
+    session_flush_interval: float = 0.5  # seconds between write-behind flushes
+    
+    # Customer Documents
+    max_document_bytes: int = 20 * 1024 * 1024
+    max_documents_per_session: int = 10
+    max_document_sessions: int = 1000  # sessions with an in-memory document index
+    max_document_store_bytes: int = 256 * 1024 * 1024  # all sessions' indexes; least recently used evicted past it
+    document_section_chars: int = 2000
+    document_spool_bytes: int = 1024 * 1024  # PDF uploads beyond this are spooled to disk
+    
+    # Traffic Recording (opt-in; pseudonymized /chat turns for replay)
+    traffic_recording: bool = False
+    traffic_record_path: str = "logs/traffic.jsonl"
+    traffic_sample_rate: float = 1.0  # fraction of sessions recorded
+    traffic_record_salt: Optional[str] = None  # keeps pseudonyms stable across restarts; random when unset
+    
+    # Profiling (opt-in; profiles are written to profile_dir)
+    profiling_enabled: bool = False
+    profiling_admin_token: Optional[str] = None  # deprecated; used when admin_token is unset
+    profile_sample_rate: float = 0.0  # fraction of /chat requests profiled without a header
+    profile_sample_mode: str = "sample"  # "sample" (statistical, low overhead) or "cprofile"
+    profile_sample_interval: float = 0.005  # seconds between stack samples
+    profile_dir: str = "logs/profiles"
+    max_profile_seconds: int = 300  # longest whole-process sampling session
+    
+    # Tracing (head-based sampling; spans are exported per trace)
+    tracing_enabled: bool = False
+    trace_sample_rate: float = 0.01  # fraction of traces kept when no trusted traceparent header decides
+    trace_trust_parent: bool = False  # honour incoming sampled flags; only behind a gateway that strips traceparent
+    trace_exporter: str = "file"  # "file" (JSONL at trace_file) or "console"
+    trace_file: str = "logs/traces.jsonl"
+    
+    # Compliance (answers are checked against the catalog's regulatory_information)
+    compliance_filter_enabled: bool = True
+    
+    # Internal ingress (MessagePack over persistent TCP; needs the "ingress" extra)
+    internal_ingress_enabled: bool = False
+    internal_ingress_host: str = "127.0.0.1"
+    internal_ingress_port: int = 8100
+    internal_ingress_max_frame_bytes: int = 1024 * 1024
+    internal_ingress_max_inflight: int = 64  # concurrent requests per connection
+    
+    # Shadow Traffic (opt-in; sampled /chat turns are replayed against shadow_overrides)
+    shadow_enabled: bool = False
+    shadow_sample_rate: float = 0.05  # fraction of sessions mirrored
+    shadow_max_concurrency: int = 2  # shadow turns in flight; further turns are skipped
+    shadow_timeout_seconds: float = 60.0
+    shadow_overrides: Dict[str, Any] = {}  # settings the shadow agent is built with, e.g. {"openai_model": "gpt-4o-mini"}
+    shadow_record_path: str = "logs/shadow.jsonl"
     
     # Logging
     log_level: str = "INFO"
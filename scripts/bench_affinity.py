@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark session affinity against loading and storing the session every turn
+Plays long conversations against a shared store with a simulated network round
+trip, once fetching and deserializing the session from it on every turn and once
+through a SessionStore that keeps sessions hot and writes behind. Also reports
+node loads and how many sessions move when a node joins or leaves an AffinityRing.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.affinity import AffinityRing
+from app.session import Session
+from app.session_store import SessionStore, SharedSessionStore
+
+QUESTION = "I am 45 and a non-smoker; how much would $500k of 20-year term coverage cost me? " * 2
+ANSWER = (
+    "Term life premiums depend on age, health, coverage amount and term length. For a healthy "
+    "45-year-old non-smoker, $500,000 of 20-year term coverage typically costs a few hundred dollars a year. "
+) * 3
+
+
+class RemoteStore(SharedSessionStore):
+    """Shared store that pays a network round trip per call"""
+
+    def __init__(self, path: str, rtt: float):
+        super().__init__(path)
+        self.rtt = rtt
+        self.calls = 0
+
+    def load(self, session_id: str) -> Optional[bytes]:
+        self.calls += 1
+        time.sleep(self.rtt)
+        return super().load(session_id)
+
+    def save_many(self, payloads: Dict[str, bytes]) -> None:
+        self.calls += 1
+        time.sleep(self.rtt)
+        super().save_many(payloads)
+
+
+def percentile(samples: List[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+
+def store_every_turn(shared: RemoteStore, session_ids: List[str], turns: int) -> List[float]:
+    """Session load and save time per turn when the shared store is read and written every turn"""
+    timings = []
+    for turn in range(turns):
+        for session_id in session_ids:
+            start = time.perf_counter()
+            payload = shared.load(session_id)
+            session = Session.from_bytes(payload) if payload is not None else Session("bench-user")
+            session.add_exchange(QUESTION, ANSWER)
+            shared.save_many({session_id: session.to_bytes()})
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def with_affinity(store: SessionStore, session_ids: List[str], turns: int) -> List[float]:
+    """Session load and save time per turn on the node that holds the session"""
+    timings = []
+    for turn in range(turns):
+        for session_id in session_ids:
+            start = time.perf_counter()
+            session = store.get(session_id) or Session("bench-user")
+            session.add_exchange(QUESTION, ANSWER)
+            store[session_id] = session
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, timings: List[float], calls: int) -> None:
+    print(f"  {label:<18} p50 {percentile(timings, 0.5) * 1000:7.3f} ms  p95 {percentile(timings, 0.95) * 1000:7.3f} ms  "
+          f"p99 {percentile(timings, 0.99) * 1000:7.3f} ms  store calls {calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="simulated shared store round trip")
+    parser.add_argument("--routed-sessions", type=int, default=2000)
+    args = parser.parse_args()
+    session_ids = [f"session-{n:06d}" for n in range(args.sessions)]
+
+    print(f"{args.sessions} sessions x {args.turns} turns, {args.rtt_ms:.1f} ms store round trip")
+    with tempfile.TemporaryDirectory() as directory:
+        shared = RemoteStore(os.path.join(directory, "baseline.db"), args.rtt_ms / 1000)
+        report("store every turn", store_every_turn(shared, session_ids, args.turns), shared.calls)
+        shared.close()
+
+        shared = RemoteStore(os.path.join(directory, "affinity.db"), args.rtt_ms / 1000)
+        store = SessionStore(max_hot=10000, shared=shared, flush_interval=0.5)
+        timings = with_affinity(store, session_ids, args.turns)
+        store.flush()
+        report("affinity", timings, shared.calls)
+        store.close()
+
+    random.seed(7)
+    routed = [f"{random.getrandbits(64):016x}" for _ in range(args.routed_sessions)]
+    for load_factor in (1.1, 1.25, 100.0):
+        ring = AffinityRing([f"node-{n}" for n in range(8)], load_factor)
+        for session_id in routed:
+            ring.route(session_id)
+        loads = ring.loads()
+        average = len(routed) / len(loads)
+        joined = ring.set_nodes([f"node-{n}" for n in range(9)])
+        left = ring.set_nodes([f"node-{n}" for n in range(9) if n != 3])
+        label = "unbounded" if load_factor > 10 else f"load factor {load_factor}"
+        print(f"  {label:<18} max/avg load {max(loads.values()) / average:.3f}  "
+              f"moved on join {len(joined) / len(routed):.1%}  on leave {len(left) / len(routed):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming compliance filter
+Feeds typical answers to a ComplianceScan in token-sized pieces and reports
+scan throughput in tokens per second next to a typical LLM generation rate
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.compliance import ComplianceFilter
+from app.tools import ClaimsProcessTool, EligibilityTool, PolicyTypeTool
+
+TOKEN_CHARS = 4
+LLM_TOKENS_PER_SECOND = 100
+ROUNDS = 50
+
+
+def main():
+    with open("knowledge/insurance_data.json") as f:
+        compliance = ComplianceFilter.from_knowledge(json.load(f)["regulatory_information"])
+    answers = [
+        PolicyTypeTool()._run(policy_type="term life"),
+        PolicyTypeTool()._run(policy_type="variable life"),
+        ClaimsProcessTool()._run(),
+        EligibilityTool()._run(age=45),
+    ]
+    chars = sum(len(answer) for answer in answers) * ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for answer in answers:
+            scan = compliance.scan()
+            for offset in range(0, len(answer), TOKEN_CHARS):
+                scan.feed(answer[offset:offset + TOKEN_CHARS])
+            scan.finish()
+    elapsed = time.perf_counter() - start
+
+    tokens_per_second = chars / TOKEN_CHARS / elapsed
+    print(f"Scanned {chars / 1e3:.0f} KB in {elapsed * 1000:.0f} ms: {chars / elapsed / 1e6:.2f} MB/s, "
+          f"{tokens_per_second:,.0f} tokens/s ({tokens_per_second / LLM_TOKENS_PER_SECOND:,.0f}x a "
+          f"{LLM_TOKENS_PER_SECOND} tokens/s LLM)")
+    for answer in answers:
+        report = compliance.check(answer)
+        print(f"  {answer.splitlines()[0][:48]:<48} disclosures={report.disclosures} violations={report.violations}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark policy document ingestion and retrieval
+Generates large synthetic policies, streams them through DocumentIngestor in
+64 KB chunks and reports ingestion throughput, index memory per document and
+search latency
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.documents import DocumentIndex
+
+CHUNK = 64 * 1024
+TOPICS = ["death benefit", "exclusions", "grace period", "beneficiary", "premium payment", "policy loans",
+          "surrender value", "reinstatement", "conversion", "riders", "contestability", "claims"]
+VOCABULARY = ("insured policyowner coverage payable proof notice written request company premium benefit "
+              "amount annual monthly interest loan value rider term renewal lapse terminate effective date "
+              "age misstatement assignment ownership contract endorsement schedule accelerated terminal "
+              "illness disability waiver exclusion aviation suicide hazardous occupation residence").split()
+QUERIES = ["is suicide excluded", "how long is the grace period", "can I borrow against cash value",
+           "what happens if I miss a premium", "accelerated death benefit terminal illness", "change beneficiary"]
+
+
+def synthetic_policy(megabytes: float, seed: int) -> bytes:
+    """Numbered sections of random policy language until the target size"""
+    rng = random.Random(seed)
+    parts = ["ACME LIFE INSURANCE COMPANY\nINDIVIDUAL LIFE INSURANCE POLICY\n"]
+    size = 0
+    section = 0
+    while size < megabytes * 1024 * 1024:
+        section += 1
+        parts.append(f"\nSECTION {section} - {rng.choice(TOPICS).upper()}\n")
+        for _ in range(rng.randint(3, 8)):
+            sentence = " ".join(rng.choices(VOCABULARY, k=rng.randint(12, 30)))
+            parts.append(sentence.capitalize() + ".\n")
+            size += len(parts[-1])
+    return "".join(parts).encode("utf-8")
+
+
+def ingest(index: DocumentIndex, data: bytes, name: str) -> None:
+    ingestor = index.ingestor(name, max_bytes=len(data) + 1)
+    for start in range(0, len(data), CHUNK):
+        ingestor.feed(data[start:start + CHUNK])
+    ingestor.finish()
+
+
+def main():
+    for megabytes in (1, 5, 20):
+        data = synthetic_policy(megabytes, seed=megabytes)
+        index = DocumentIndex()
+
+        start = time.perf_counter()
+        ingest(index, data, f"policy-{megabytes}mb.txt")
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        traced = DocumentIndex()
+        ingest(traced, data, "traced.txt")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        timings = []
+        for _ in range(50):
+            for query in QUERIES:
+                query_start = time.perf_counter()
+                index.search(query)
+                timings.append(time.perf_counter() - query_start)
+        timings.sort()
+        sections = next(iter(index.documents.values()))["sections"]
+        print(
+            f"{megabytes:>3} MB  {sections:>6} sections  ingest {len(data) / 1e6 / elapsed:>6.1f} MB/s  "
+            f"index {index.approx_size() / 1e6:>6.2f} MB  peak during ingest {peak / 1e6:>6.1f} MB  "
+            f"search p50 {timings[len(timings) // 2] * 1000:.2f} ms  p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
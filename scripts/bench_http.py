@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark HTTP serialization cost and bytes on the wire
+Compares FastAPI's default JSON response with ORJSONResponse, and raw bodies
+with gzip/brotli compression, for typical chat and knowledge payloads
+"""
+import json
+import sys
+import timeit
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.models import MessageResponse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ITERATIONS = 2000
+
+
+def payloads():
+    """Representative response bodies"""
+    knowledge_base = json.loads(Path("knowledge/insurance_data.json").read_text())
+    chat = MessageResponse(
+        response="Term life insurance provides coverage for a fixed period. " * 12,
+        session_id="3f1c2d9e-8a7b-4c6d-9e0f-1a2b3c4d5e6f",
+        context={"query_type": "policy_type", "message_count": 4, "session_duration": 81.2},
+        timestamp=datetime.now(),
+        query_type="policy_type"
+    )
+    return {
+        "chat response": chat,
+        "policy types": {"policy_types": list(knowledge_base["policy_types"].keys())},
+        "knowledge base": knowledge_base,
+    }
+
+
+def main():
+    """Print per-call serialization time and encoded sizes"""
+    print(f"{'payload':<16} {'json us':>9} {'orjson us':>10} {'raw B':>8} {'gzip B':>8} {'br B':>8}")
+    for name, payload in payloads().items():
+        default = timeit.timeit(lambda: JSONResponse(jsonable_encoder(payload)).body, number=ITERATIONS)
+        fast = timeit.timeit(lambda: ORJSONResponse(jsonable_encoder(payload)).body, number=ITERATIONS)
+
+        body = ORJSONResponse(jsonable_encoder(payload)).body
+        gzip_size = len(_gzip(body))
+        br_size = len(brotli.compress(body, quality=4)) if brotli else float("nan")
+
+        print(
+            f"{name:<16} {default / ITERATIONS * 1e6:>9.1f} {fast / ITERATIONS * 1e6:>10.1f} "
+            f"{len(body):>8} {gzip_size:>8} {br_size:>8}"
+        )
+
+
+def _gzip(body: bytes) -> bytes:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+if __name__ == "__main__":
+    main()
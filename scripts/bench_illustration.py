@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Benchmark policy illustrations
+Times the whole and universal life projections and the variable life
+Monte Carlo projection at increasing path counts
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.illustration import illustrate
+
+RUNS = 20
+
+
+def report(label: str, timings) -> None:
+    timings = sorted(timings)
+    p50 = timings[len(timings) // 2] * 1000
+    worst = timings[-1] * 1000
+    print(f"{label:<28} {len(timings):>4} runs  p50 {p50:8.2f} ms  max {worst:8.2f} ms")
+
+
+def timed(**kwargs):
+    timings = []
+    for seed in range(RUNS):
+        start = time.perf_counter()
+        illustrate(seed=seed, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    for policy_type in ("whole life", "universal life"):
+        report(policy_type, timed(policy_type=policy_type, issue_age=40, face_amount=300000, annual_premium=4000))
+    for paths in (1000, 10000, 20000):
+        report(f"variable life, {paths} paths", timed(
+            policy_type="variable life", issue_age=40, face_amount=300000, annual_premium=4000, paths=paths
+        ))
+
+
+if __name__ == "__main__":
+    main()
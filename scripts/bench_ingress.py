@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call overhead of the internal MessagePack ingress
+Serves POST /chat (uvicorn) and the ingress from one process with the agent's
+process_message replaced by an instant stub, then times calls from httpx with
+keep-alive, httpx with a new connection per call and IngressClient over one
+persistent connection, sequentially and with concurrent callers
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+import uvicorn
+
+from app import main as app_main
+from app.ingress import IngressClient, IngressServer
+from app.models import MessageResponse
+
+HOST = "127.0.0.1"
+HTTP_PORT = 8765
+INGRESS_PORT = 8766
+ANSWER = "Term life insurance provides coverage for a fixed period. " * 12
+
+
+def stub_process_message(user_id, message, session_id=None, **kwargs):
+    """Answers instantly so only transport and framing are measured"""
+    return MessageResponse(
+        response=ANSWER,
+        session_id=session_id or "3f1c2d9e-8a7b-4c6d-9e0f-1a2b3c4d5e6f",
+        context={"query_type": "policy_type", "message_count": 4},
+        query_type="policy_type"
+    )
+
+
+class Servers:
+    """uvicorn and the ingress on a background event loop"""
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self._server = uvicorn.Server(uvicorn.Config(app_main.app, host=HOST, port=HTTP_PORT, log_level="warning"))
+        self._thread = threading.Thread(target=asyncio.run, args=(self._run(),), daemon=True)
+
+    async def _run(self):
+        serving = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            await asyncio.sleep(0.01)
+        app_main.insurance_agent.process_message = stub_process_message
+        ingress = IngressServer(app_main.insurance_agent)
+        await ingress.start(HOST, INGRESS_PORT)
+        self.ready.set()
+        await serving
+        await ingress.close()
+
+    def __enter__(self):
+        self._thread.start()
+        self.ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.should_exit = True
+        self._thread.join()
+
+
+async def timed(call, calls: int, concurrency: int):
+    """Per-call latencies of `calls` calls spread over `concurrency` callers"""
+    latencies = []
+
+    async def caller(count):
+        for n in range(count):
+            start = time.perf_counter()
+            await call(n)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller(calls // concurrency) for _ in range(concurrency)))
+    return sorted(latencies), time.perf_counter() - start
+
+
+async def run(calls: int, concurrency: int):
+    body = {"message": "What is term life insurance?", "user_id": "bench"}
+    url = f"http://{HOST}:{HTTP_PORT}/chat"
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as pooled:
+        async def keep_alive(n):
+            response = await pooled.post(url, json=body)
+            response.json()
+
+        async def new_connection(n):
+            async with httpx.AsyncClient() as client:
+                response = await client.post(url, json=body, headers={"Connection": "close"})
+                response.json()
+
+        ingress = await IngressClient.connect(HOST, INGRESS_PORT)
+
+        async def msgpack(n):
+            await ingress.chat("bench", body["message"])
+
+        await keep_alive(0)
+        await msgpack(0)
+        for label, call in (
+            ("JSON, keep-alive", keep_alive),
+            ("JSON, new client", new_connection),
+            ("MessagePack ingress", msgpack),
+        ):
+            for callers in (1, concurrency):
+                latencies, elapsed = await timed(call, calls, callers)
+                print(f"{label:<22} x{callers:<3} p50 {latencies[len(latencies) // 2] * 1e6:8.0f} us  "
+                      f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:8.0f} us  "
+                      f"{len(latencies) / elapsed:8.0f} calls/s")
+        await ingress.close()
+
+
+def main():
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    with Servers():
+        asyncio.run(run(args.calls, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
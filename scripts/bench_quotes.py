@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark quote-document rendering throughput
+Reports documents per second for in-process rendering, for the streaming
+NDJSON/zip pipeline with peak traced memory per batch size, and end to end
+through /quotes/render (TestClient buffers whole bodies, so memory is only
+measured on the pipeline)
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import orjson
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.templates import QuoteRenderer, load_templates, render_records
+
+
+def applicant(index: int) -> dict:
+    """A synthetic applicant record for one of the templates"""
+    rng = random.Random(index)
+    template = ("term_life", "whole_life", "universal_life")[index % 3]
+    record = {
+        "id": f"applicant-{index}",
+        "template": template,
+        "issue_age": rng.randint(20, 65),
+        "death_benefit": rng.choice([250000, 500000, 1000000]),
+    }
+    if template == "term_life":
+        record.update(term_length=rng.choice(["10", "20", "30"]), premium=rng.uniform(15, 120),
+                      health_class="Preferred", threshold=1000000)
+    elif template == "whole_life":
+        record.update(annual_premium=rng.uniform(2000, 9000), cash_value=rng.uniform(50000, 300000),
+                      total_benefits=rng.uniform(300000, 900000), dividends_received=rng.uniform(5000, 60000))
+    else:
+        record.update(target_death_benefit=record.pop("death_benefit"), target_premium=rng.uniform(1500, 6000),
+                      current_interest_rate=round(rng.uniform(3, 6), 2))
+    return record
+
+
+def ndjson_chunks(count: int, chunk_records: int = 500):
+    """Request body generator, so the client never holds the whole batch"""
+    batch = []
+    for index in range(count):
+        batch.append(orjson.dumps(applicant(index)) + b"\n")
+        if len(batch) == chunk_records:
+            yield b"".join(batch)
+            batch = []
+    if batch:
+        yield b"".join(batch)
+
+
+def bench_in_process(templates, count: int) -> None:
+    records = [applicant(index) for index in range(count)]
+    for output_format in ("markdown", "html"):
+        start = time.perf_counter()
+        for _ in render_records(templates, records, output_format):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"in-process {output_format:<8} {count / elapsed:>10,.0f} docs/s")
+
+
+async def stream_source(count: int):
+    for chunk in ndjson_chunks(count):
+        yield chunk
+
+
+async def drain(stream) -> int:
+    received = 0
+    async for chunk in stream:
+        received += len(chunk)
+    return received
+
+
+def pipeline(templates, output: str, count: int):
+    renderer = QuoteRenderer(templates)
+    return renderer.zip(stream_source(count)) if output == "zip" else renderer.ndjson(stream_source(count))
+
+
+def bench_pipeline(templates, count: int) -> None:
+    for output in ("ndjson", "zip"):
+        start = time.perf_counter()
+        received = asyncio.run(drain(pipeline(templates, output, count)))
+        elapsed = time.perf_counter() - start
+
+        # Memory is traced in a second pass; tracing slows the run down
+        tracemalloc.start()
+        asyncio.run(drain(pipeline(templates, output, count)))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"pipeline {output:<6} {count:>7,} docs {count / elapsed:>10,.0f} docs/s "
+              f"{received / 1e6:>7.1f} MB out  peak {peak / 1e6:>6.1f} MB")
+
+
+def bench_endpoint(client: TestClient, count: int) -> None:
+    for output in ("ndjson", "zip"):
+        start = time.perf_counter()
+        response = client.post(f"/quotes/render?output={output}", content=ndjson_chunks(count))
+        elapsed = time.perf_counter() - start
+        print(f"endpoint {output:<6} {count:>7,} docs {count / elapsed:>10,.0f} docs/s "
+              f"{len(response.content) / 1e6:>7.1f} MB out")
+
+
+def main():
+    templates = load_templates()
+    bench_in_process(templates, 50000)
+    for count in (1000, 10000, 50000):
+        bench_pipeline(templates, count)
+    with TestClient(app) as client:
+        bench_endpoint(client, 10000)
+
+
+if __name__ == "__main__":
+    main()
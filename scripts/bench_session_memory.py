@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark resident memory per session at 0, 10 and 50 turns
+Compares the legacy dict + ConversationBufferMemory layout with app.session.Session
+"""
+import gc
+import sys
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain.memory import ConversationBufferMemory
+
+from app.session import Session
+
+SESSIONS = 2000
+TURN_COUNTS = (0, 10, 50)
+
+
+def _exchange(session_no: int, turn: int):
+    """Build a distinct, realistically sized user message and reply"""
+    message = f"Session {session_no}: what does a 20 year term policy cost at age {turn + 30}?"
+    response = (
+        f"For a healthy {turn + 30}-year-old, a 20 year term policy with a $500,000 death "
+        f"benefit typically costs between $25 and $40 per month (ref {session_no}-{turn})."
+    )
+    return message, response
+
+
+def _legacy_session(session_no: int, turns: int) -> dict:
+    session = {
+        "user_id": f"user-{session_no}",
+        "created_at": datetime.now(),
+        "last_active": datetime.now(),
+        "message_count": turns,
+        "memory": ConversationBufferMemory(return_messages=True),
+        "context": {},
+    }
+    for turn in range(turns):
+        message, response = _exchange(session_no, turn)
+        session["memory"].save_context({"input": message}, {"output": response})
+    return session
+
+
+def _compact_session(session_no: int, turns: int) -> Session:
+    session = Session(f"user-{session_no}")
+    session.message_count = turns
+    for turn in range(turns):
+        session.add_exchange(*_exchange(session_no, turn))
+    return session
+
+
+def measure(factory, turns: int) -> float:
+    """Return allocated bytes per session for the given factory"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = {f"s-{n}": factory(n, turns) for n in range(SESSIONS)}
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return (after - before) / SESSIONS
+
+
+def main():
+    """Print bytes per session for each layout"""
+    print(f"{'turns':>6} {'legacy B/session':>18} {'compact B/session':>18} {'ratio':>7}")
+    for turns in TURN_COUNTS:
+        legacy = measure(_legacy_session, turns)
+        compact = measure(_compact_session, turns)
+        print(f"{turns:>6} {legacy:>18,.0f} {compact:>18,.0f} {legacy / compact:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
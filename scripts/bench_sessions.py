@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark session listing, export and bulk delete on a large store
+Fills a SessionStore past its hot cap, then measures filtered page latency,
+export throughput and bulk delete rate while a second thread keeps reading
+and writing hot sessions, reporting how long those chat-path operations waited
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app.session import Session
+from app.session_store import SessionFilter, SessionStore
+
+
+def fill(store: SessionStore, count: int, users: int) -> None:
+    for n in range(count):
+        session = Session(f"user-{n % users}")
+        session.created_at -= (n % 48) * 3600
+        for turn in range(n % 5):
+            session.add_exchange(f"question {turn} for session {n}", f"answer {turn} for session {n}")
+            session.message_count += 1
+        store[f"{n:08x}-session"] = session
+
+
+class ChatLoad:
+    """Background reads and writes of hot sessions, recording the slowest one"""
+
+    def __init__(self, store: SessionStore, hot_ids):
+        self.store = store
+        self.hot_ids = hot_ids
+        self.worst = 0.0
+        self.operations = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.is_set():
+            for session_id in self.hot_ids:
+                start = time.perf_counter()
+                session = self.store.get(session_id)
+                if session is not None:
+                    self.store[session_id] = session
+                self.worst = max(self.worst, time.perf_counter() - start)
+                self.operations += 1
+                time.sleep(0.0005)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = SessionStore(os.path.join(directory, "sessions.db"), max_hot=10000)
+        start = time.perf_counter()
+        fill(store, args.sessions, args.users)
+        print(f"Filled {args.sessions} sessions ({store.cold_count()} spilled) in {time.perf_counter() - start:.1f}s")
+        hot_ids = list(store._hot)[-200:]
+
+        with ChatLoad(store, hot_ids) as load:
+            for label, criteria in (
+                ("user", SessionFilter(user_id="user-7")),
+                ("age>24h", SessionFilter(min_age=24 * 3600)),
+                ("messages>=4", SessionFilter(min_messages=4)),
+            ):
+                timings = []
+                after = None
+                for _ in range(20):
+                    page_start = time.perf_counter()
+                    page = store.query(criteria, after, 100)
+                    timings.append(time.perf_counter() - page_start)
+                    if len(page) < 100:
+                        break
+                    after = page[-1]["session_id"]
+                timings.sort()
+                print(f"page of 100 by {label:<12} p50 {timings[len(timings) // 2] * 1000:6.2f} ms  "
+                      f"max {timings[-1] * 1000:6.2f} ms")
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            exported = sum(1 for _ in store.export(SessionFilter(min_messages=1)))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"exported {exported} sessions in {elapsed:.1f}s ({exported / elapsed:,.0f}/s), "
+                  f"peak traced memory {peak / 1e6:.1f} MB")
+
+            start = time.perf_counter()
+            deleted = sum(len(batch) for batch in store.delete_matching(SessionFilter(max_messages=0)))
+            elapsed = time.perf_counter() - start
+            print(f"deleted {deleted} sessions in {elapsed:.1f}s ({deleted / elapsed:,.0f}/s)")
+
+        print(f"concurrent chat-path operations: {load.operations}, slowest {load.worst * 1000:.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark typeahead latency
+Replays every prefix of a set of typed questions (one lookup per keystroke)
+against the suggestion index directly and through GET /suggest
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.suggest import SuggestionIndex
+
+TYPED = [
+    "how long does a claim take",
+    "what is the grace period",
+    "benefciary",
+    "term life insurance",
+    "waiver of premum",
+    "can i reinstate a lapsed policy",
+    "surrender charge",
+]
+
+
+def keystrokes():
+    for text in TYPED:
+        for end in range(1, len(text) + 1):
+            yield text[:end]
+
+
+def report(label: str, timings) -> None:
+    timings = sorted(timings)
+    p50 = timings[len(timings) // 2] * 1000
+    p99 = timings[int(len(timings) * 0.99)] * 1000
+    print(f"{label:<10} {len(timings):>6} lookups  p50 {p50:.3f} ms  p99 {p99:.3f} ms")
+
+
+def main():
+    index = SuggestionIndex(json.loads(Path("knowledge/insurance_data.json").read_text()))
+    queries = list(keystrokes()) * 50
+
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.suggest(query)
+        timings.append(time.perf_counter() - start)
+    report("index", timings)
+
+    with TestClient(app) as client:
+        timings = []
+        for query in queries[:2000]:
+            start = time.perf_counter()
+            client.get("/suggest", params={"q": query})
+            timings.append(time.perf_counter() - start)
+        report("endpoint", timings)
+
+
+if __name__ == "__main__":
+    main()
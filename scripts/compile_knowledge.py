@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Compile tenant knowledge catalogs into memory-mappable snapshots
+Each JSON catalog is validated against the knowledge schema and written to
+<out>/<tenant>.kbs, where the tenant name is the file name without extension.
+Workers map snapshots on first use and remap a replaced one on its next
+request, so compile into the live directory at any time; replacement is atomic.
+
+    python scripts/compile_knowledge.py knowledge/tenants/*.json --out knowledge/snapshots
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "compile")
+
+import orjson
+
+from app.knowledge import KnowledgeSnapshot, KnowledgeValidationError, is_valid_tenant, write_snapshot
+from config.settings import settings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile tenant knowledge catalogs")
+    parser.add_argument("catalogs", nargs="+", help="Tenant catalog JSON files")
+    parser.add_argument("--out", default=settings.knowledge_snapshot_dir, help="Snapshot directory")
+    args = parser.parse_args()
+
+    failed = 0
+    for catalog in args.catalogs:
+        tenant = Path(catalog).stem.lower()
+        if not is_valid_tenant(tenant):
+            print(f"{catalog}: tenant names use a-z, 0-9, '-' and '_'", file=sys.stderr)
+            failed += 1
+            continue
+        try:
+            data = orjson.loads(Path(catalog).read_bytes())
+            path = os.path.join(args.out, f"{tenant}.kbs")
+            size = write_snapshot(data, path)
+        except (OSError, orjson.JSONDecodeError, KnowledgeValidationError) as e:
+            print(f"{catalog}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        snapshot = KnowledgeSnapshot.open(path)
+        print(f"{tenant:<24} {len(snapshot.keys('policy_types')):>3} policy types  "
+              f"{size / 1024:>7.1f} KB  version {snapshot.version}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
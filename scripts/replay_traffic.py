@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Replay recorded /chat traffic against a server
+Turns are sent on the recorded schedule compressed by --speed (1x-50x). A
+session's turns stay in order: a turn waits for the previous turn's answer.
+Prints latency percentiles per query type and how far sends lagged the schedule.
+
+Record with TRAFFIC_RECORDING=true (see config/settings.py), then e.g.
+    python scripts/replay_traffic.py logs/traffic.jsonl --url http://localhost:8000 --speed 10
+Start the target server with SIMULATED_LLM=true to replay without OpenAI calls,
+or use --in-process to replay against this checkout with the simulated model.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+import orjson
+
+
+def load_sessions(path: str, limit: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+    """Recorded turns grouped by session, each group in arrival order"""
+    turns = []
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                turns.append(orjson.loads(line))
+    turns.sort(key=lambda turn: turn["ts"])
+    if limit is not None:
+        turns = turns[:limit]
+    if not turns:
+        return []
+
+    origin = turns[0]["ts"]
+    sessions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for turn in turns:
+        turn["offset"] = turn["ts"] - origin
+        sessions[turn["session"]].append(turn)
+    return list(sessions.values())
+
+
+async def replay_session(
+    client: httpx.AsyncClient,
+    turns: List[Dict[str, Any]],
+    started: float,
+    speed: float,
+    results: List[Dict[str, Any]]
+) -> None:
+    session_id = None
+    for turn in turns:
+        due = started + turn["offset"] / speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        sent = time.perf_counter()
+
+        payload = {"message": turn["message"], "user_id": turn["user"]}
+        if session_id is not None:
+            payload["session_id"] = session_id
+        status = None
+        query_type = turn.get("query_type")
+        try:
+            response = await client.post("/chat", json=payload)
+            status = response.status_code
+            if status == 200:
+                body = response.json()
+                session_id = body["session_id"]
+                query_type = query_type or body.get("query_type")
+        except httpx.HTTPError:
+            pass
+        results.append({
+            "query_type": query_type or "unknown",
+            "latency": time.perf_counter() - sent,
+            "lag": max(0.0, sent - due),
+            "ok": status == 200,
+        })
+
+
+def percentile(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def report(results: List[Dict[str, Any]], elapsed: float) -> None:
+    by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for result in results:
+        by_type[result["query_type"]].append(result)
+    by_type["all"] = results
+
+    print(f"{'query_type':<14} {'count':>6} {'errors':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for query_type, group in sorted(by_type.items(), key=lambda item: (item[0] == "all", item[0])):
+        latencies = [result["latency"] * 1000 for result in group]
+        errors = sum(1 for result in group if not result["ok"])
+        print(
+            f"{query_type:<14} {len(group):>6} {errors:>6} {percentile(latencies, 50):>9.1f} "
+            f"{percentile(latencies, 90):>9.1f} {percentile(latencies, 99):>9.1f} {max(latencies):>9.1f}"
+        )
+    lags = [result["lag"] * 1000 for result in results]
+    print(f"\n{len(results)} turns in {elapsed:.1f}s ({len(results) / elapsed:.1f} turns/s); "
+          f"schedule lag p50 {percentile(lags, 50):.1f} ms, p99 {percentile(lags, 99):.1f} ms")
+
+
+@asynccontextmanager
+async def in_process_client(timeout: float):
+    """Client bound to this checkout's app, running its lifespan"""
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=timeout) as client:
+            yield client
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    sessions = load_sessions(args.recording, args.limit)
+    if not sessions:
+        print("No turns recorded")
+        return
+    turns = sum(len(session) for session in sessions)
+    span = max(turn["offset"] for session in sessions for turn in session)
+    print(f"Replaying {turns} turns in {len(sessions)} sessions ({span:.0f}s recorded) at {args.speed:g}x")
+
+    if args.in_process:
+        client_context = in_process_client(args.timeout)
+    else:
+        limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+        client_context = httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+
+    results: List[Dict[str, Any]] = []
+    async with client_context as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(replay_session(client, session, started, args.speed, results) for session in sessions))
+        elapsed = time.perf_counter() - started
+    report(results, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded /chat traffic")
+    parser.add_argument("recording", help="JSONL file written by the traffic recorder")
+    parser.add_argument("--url", default="http://localhost:8000", help="Server to drive")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay rate multiplier (1-50)")
+    parser.add_argument("--limit", type=int, help="Replay only the first N turns")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--max-connections", type=int, default=500)
+    parser.add_argument("--in-process", action="store_true",
+                        help="Replay against this checkout's app with the simulated LLM instead of --url")
+    parser.add_argument("--llm-latency", type=float, default=0.8,
+                        help="Median simulated LLM latency in seconds (with --in-process)")
+    args = parser.parse_args()
+
+    if not 1.0 <= args.speed <= 50.0:
+        parser.error("--speed must be between 1 and 50")
+    if args.in_process:
+        # Settings are read at import time, so configure them before app.main is imported
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
+        os.environ["SIMULATED_LLM"] = "true"
+        os.environ["SIMULATED_LLM_LATENCY"] = str(args.llm_latency)
+        os.environ["TRAFFIC_RECORDING"] = "false"
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
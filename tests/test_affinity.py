@@ -0,0 +1,169 @@
+import time
+import httpx
+import pytest
+from app.affinity import AffinityRing
+from app.api_client import RoutedAPIClient
+from app.metrics import metrics
+from app.session import Session
+from app.session_store import SessionStore, SharedSessionStore
+
+NODES = ["node-a", "node-b", "node-c", "node-d"]
+
+def test_routing_is_sticky_and_load_is_bounded():
+    """Test rendezvous placement under the load bound"""
+    ring = AffinityRing(NODES, load_factor=1.25)
+    placed = {f"s-{n}": ring.route(f"s-{n}") for n in range(2000)}
+    assert all(ring.route(session_id) == node for session_id, node in placed.items())
+    assert max(ring.loads().values()) <= ring.capacity(2000)
+    # Most sessions still land on their first choice
+    assert sum(ring.ranked(session_id)[0] == node for session_id, node in placed.items()) > 1500
+
+    ring.release("s-0")
+    assert ring.owner("s-0") is None
+    assert sum(ring.loads().values()) == 1999
+    assert ring.expire(0) == 1999
+
+def test_membership_changes_move_few_sessions():
+    """Test that joins and leaves only move the sessions they must"""
+    ring = AffinityRing(NODES)
+    for n in range(2000):
+        ring.route(f"s-{n}")
+    before = {f"s-{n}": ring.owner(f"s-{n}") for n in range(2000)}
+
+    moves = ring.set_nodes(NODES + ["node-e"])
+    assert all(new == "node-e" for _, new in moves.values())
+    assert 250 < len(moves) < 550
+    assert all(ring.owner(session_id) == (moves[session_id][1] if session_id in moves else node)
+               for session_id, node in before.items())
+
+    moves = ring.set_nodes(["node-a", "node-b", "node-c", "node-e"])
+    assert {old for old, _ in moves.values()} == {"node-d"}
+    assert "node-d" not in ring.loads()
+    assert max(ring.loads().values()) <= ring.capacity(2000)
+
+def test_write_behind_and_handover(tmp_path):
+    """Test that a session moves between nodes through the shared store"""
+    path = str(tmp_path / "shared.db")
+    node_a = SessionStore(max_hot=2, shared=SharedSessionStore(path), flush_interval=0.05)
+    node_b = SessionStore(max_hot=2, shared=SharedSessionStore(path), flush_interval=60)
+    try:
+        session = Session("bob")
+        session.add_exchange("What is term life?", "Coverage for a fixed period.")
+        node_a["s-1"] = session
+        time.sleep(0.2)
+        assert node_a.shared.load("s-1") is not None
+        assert metrics.counter("session_shared_writes") >= 1
+
+        # A turn that was not flushed yet is written on release
+        session.add_exchange("How long?", "10 to 30 years.")
+        node_a["s-1"] = session
+        for n in range(3):
+            node_a[f"other-{n}"] = Session("alice")
+        assert node_a.release(["s-1", "missing"]) == ["s-1"]
+        assert "s-1" not in node_a._hot and node_a.cold_count() == 1
+
+        moved = node_b["s-1"]
+        assert [m.content for m in moved.messages()][-1] == "10 to 30 years."
+        assert "s-1" in node_b
+
+        del node_b["s-1"]
+        assert "s-1" not in node_b
+        assert node_a.shared.load("s-1") is None
+    finally:
+        node_a.close()
+        node_b.close()
+
+def test_client_routes_and_hands_over_sessions():
+    """Test that the routed client releases moved sessions before rerouting"""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append((request.url.host, request.url.path, request.content))
+        if request.url.path == "/chat":
+            return httpx.Response(200, json={"response": "ok", "session_id": "x"})
+        return httpx.Response(200, json={"status": "released", "released": 1})
+
+    client = RoutedAPIClient({node: f"http://{node}" for node in NODES}, admin_token="secret")
+    for node_client in client.clients.values():
+        node_client.client = httpx.Client(transport=httpx.MockTransport(handler))
+    session_ids = [f"s-{n}" for n in range(40)]
+    for session_id in session_ids:
+        client.chat("bob", "Hello", session_id)
+    assert {host for host, path, _ in calls} <= set(NODES)
+    first = {session_id: client.ring.owner(session_id) for session_id in session_ids}
+
+    calls.clear()
+    moves = client.set_nodes({node: f"http://{node}" for node in NODES[:3]})
+    assert set(moves) == {session_id for session_id, node in first.items() if node == "node-d"}
+    assert [(host, path) for host, path, _ in calls] == [("node-d", "/admin/sessions/release")]
+    assert "node-d" not in client.clients
+    client.close()
+
+def test_handover_waits_for_turns_in_flight():
+    """Test that a moving session is released only after its running turn returns"""
+    import threading
+    calls = []
+    answering = threading.Event()
+    finish = threading.Event()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/chat" and request.url.host == "node-d" and not finish.is_set():
+            answering.set()
+            finish.wait(5)
+        calls.append((request.url.host, request.url.path))
+        return httpx.Response(200, json={"response": "ok", "session_id": "x", "released": 1})
+
+    client = RoutedAPIClient({node: f"http://{node}" for node in NODES}, admin_token="secret")
+    for node_client in client.clients.values():
+        node_client.client = httpx.Client(transport=httpx.MockTransport(handler))
+    session_id = next(f"s-{n}" for n in range(100) if client.ring.ranked(f"s-{n}")[0] == "node-d")
+
+    turn = threading.Thread(target=client.chat, args=("bob", "Hello", session_id))
+    turn.start()
+    assert answering.wait(5)
+    handover = threading.Thread(target=client.set_nodes, args=({node: f"http://{node}" for node in NODES[:3]},))
+    handover.start()
+    handover.join(0.2)
+    assert handover.is_alive() and calls == []
+
+    finish.set()
+    handover.join(5)
+    turn.join(5)
+    client.chat("bob", "Again", session_id)
+    assert calls[:2] == [("node-d", "/chat"), ("node-d", "/admin/sessions/release")]
+    assert calls[2][0] != "node-d"
+    client.close()
+
+def test_delete_waits_for_an_inflight_flush(tmp_path):
+    """Test that a flush already writing a session cannot resurrect it after delete"""
+    import threading
+
+    class PausedStore(SharedSessionStore):
+        def __init__(self, path):
+            super().__init__(path)
+            self.writing = threading.Event()
+            self.resume = threading.Event()
+
+        def save_many(self, payloads):
+            self.writing.set()
+            self.resume.wait(5)
+            super().save_many(payloads)
+
+    shared = PausedStore(str(tmp_path / "shared.db"))
+    store = SessionStore(max_hot=10, shared=shared, flush_interval=60)
+    try:
+        store["A"] = Session("bob")
+        flusher = threading.Thread(target=store.flush)
+        flusher.start()
+        assert shared.writing.wait(5)
+        deleter = threading.Thread(target=store.__delitem__, args=("A",))
+        deleter.start()
+        time.sleep(0.05)
+        shared.resume.set()
+        flusher.join()
+        deleter.join()
+        assert shared.load("A") is None
+        assert "A" not in store
+    finally:
+        shared.resume.set()
+        store.close()
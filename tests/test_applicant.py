@@ -0,0 +1,106 @@
+import os
+from unittest.mock import patch
+from app.agent import InsuranceAgent
+from app.applicant import ApplicantProfile, current_applicant
+from app.session import Session
+from app.tools import EligibilityTool
+
+def test_profile_accumulates_across_messages():
+    """Test incremental extraction and overrides"""
+    profile = ApplicantProfile()
+    assert profile.update("Hi, I'm 42 and I don't smoke. I have two kids and a mortgage.") == [
+        "age", "smoker", "dependents", "goals"
+    ]
+    assert profile.update("Looking for $500k of coverage, maybe a 20-year term. I have diabetes.") == [
+        "conditions", "coverage_amount", "term_years"
+    ]
+    assert profile.update("What does term life cost?") == []
+    profile.update("Actually I'm 43, in good health, and want to replace my income. Budget is $50 a month.")
+
+    assert profile.to_dict() == {
+        "age": 43, "smoker": False, "health": "good", "conditions": ["diabetes"],
+        "coverage_amount": 500000, "term_years": 20, "dependents": 2,
+        "goals": ["mortgage", "income replacement"],
+    }
+    assert profile.summary() == (
+        "age 43; good health; diabetes; non-smoker; wants $500,000 coverage; 20-year term; "
+        "2 dependents; goals: mortgage, income replacement"
+    )
+
+def test_profile_survives_cold_tier():
+    """Test that the profile round-trips through the session context"""
+    profile = ApplicantProfile()
+    profile.update("I am 35, a smoker, and need $1.5 million")
+    session = Session("bob")
+    session.context = {"applicant": profile.to_dict()}
+    restored = ApplicantProfile.from_dict(Session.from_bytes(session.to_bytes()).context["applicant"])
+    assert restored.to_dict() == {"age": 35, "smoker": True, "coverage_amount": 1500000}
+
+def test_eligibility_tool_reads_the_profile():
+    """Test that tools fall back to the session's profile"""
+    profile = ApplicantProfile()
+    profile.update("I'm 85 and in excellent health")
+    token = current_applicant.set(profile)
+    try:
+        answer = EligibilityTool()._run()
+        explicit = EligibilityTool()._run(age=30)
+    finally:
+        current_applicant.reset(token)
+    assert "Current age: 85" in answer and "excellent health" in answer
+    assert "Current age: 30" in explicit
+    assert "Typically 18-80" in EligibilityTool()._run()
+
+def test_agent_injects_profile_instead_of_long_history():
+    """Test the summary message, trimmed history and response context"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        agent = InsuranceAgent()
+    inputs = []
+    agent.agent_executor = type("Executor", (), {
+        "invoke": lambda self, agent_input: inputs.append(agent_input) or {"output": "Noted."}
+    })()
+
+    first = agent.process_message("bob", "Hello there")
+    session_id = first.session_id
+    for n in range(6):
+        agent.process_message("bob", f"Small talk {n}", session_id)
+    reply = agent.process_message("bob", "I'm 50 and need $250k for my mortgage", session_id)
+    agent.process_message("bob", "Do I qualify?", session_id)
+
+    assert "applicant" not in first.context
+    assert reply.context["applicant"] == {"age": 50, "coverage_amount": 250000, "goals": ["mortgage"]}
+    assert len(inputs[6]["chat_history"]) == 12
+    history = inputs[-1]["chat_history"]
+    assert history[0].content == "Known applicant details: age 50; wants $250,000 coverage; goals: mortgage"
+    assert len(history) == 1 + 8
+    assert agent.sessions[session_id].context["applicant"]["age"] == 50
+    agent.sessions.close()
+
+def test_conditions_come_from_first_person_statements():
+    """Test that questions and other people's health do not become conditions"""
+    profile = ApplicantProfile()
+    assert profile.update("Does whole life cover cancer or heart attack deaths?") == []
+    assert profile.update("My father had heart disease. Do I have to disclose my diabetes?") == []
+    assert profile.update("I have a question about asthma coverage.") == []
+    assert profile.conditions == []
+
+    profile.update("I was diagnosed with hypertension, and I'm diabetic. Can I still get coverage?")
+    assert profile.conditions == ["diabetes", "high blood pressure"]
+    profile.update("Sorry, I don't have diabetes but I have asthma.")
+    assert profile.conditions == ["asthma", "high blood pressure"]
+    assert profile.update("I have no health conditions now.") == ["conditions"]
+    assert "conditions" not in profile.to_dict()
+
+def test_profile_facts_come_from_statements_about_the_customer():
+    """Test that questions and other people's details do not fill the profile"""
+    profile = ApplicantProfile()
+    assert profile.update("My father is 72 years old and a smoker.") == []
+    assert profile.update("Are rates higher for people who smoke cigarettes?") == []
+    assert profile.update("My sister has three children and is in poor health.") == []
+    assert profile.update("My husband has $250,000 of coverage through work. Is $1 million enough?") == []
+    assert profile.update("Rates are lower for someone in excellent health?") == []
+    assert profile.is_empty()
+
+    profile.update("My wife is 40 and I'm 45, and I smoke a pack a day. We want $1,000,000 of coverage.")
+    assert profile.to_dict() == {"age": 45, "smoker": True, "coverage_amount": 1000000}
+    profile.update("My husband and I have two kids, and I'm in great health.")
+    assert (profile.dependents, profile.health) == (2, "excellent")
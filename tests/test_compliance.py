@@ -0,0 +1,69 @@
+import json
+import os
+from unittest.mock import patch
+import pytest
+from app.agent import InsuranceAgent
+from app.compliance import CONSULT_NOTICE, GUARANTEE_NOTICE, ComplianceFilter
+
+@pytest.fixture
+def compliance():
+    """Filter compiled from the shipped regulatory information"""
+    with open("knowledge/insurance_data.json") as f:
+        return ComplianceFilter.from_knowledge(json.load(f)["regulatory_information"])
+
+def test_prohibited_guarantees_are_flagged(compliance):
+    """Test violations and the corrective notice"""
+    report = compliance.check("Good news: we guarantee you'll be approved, and the returns are risk-free.")
+    assert report.violations == ["guaranteed_approval", "guaranteed_returns"]
+    assert report.notices == [GUARANTEE_NOTICE]
+    # Contractual guarantees of permanent policies are not violations
+    assert compliance.check("Whole life has guaranteed cash value growth and a guaranteed death benefit.").violations == []
+
+def test_disclosures_follow_the_catalog(compliance):
+    """Test topic-triggered disclosures, and skipping ones the answer already makes"""
+    report = compliance.check("Variable life invests in subaccounts, and you may surrender the policy later.")
+    assert report.disclosures == ["investment_risk", "surrender_charges"]
+    assert compliance.check("Surrender charges apply if you surrender in the first ten years.").disclosures == []
+
+    without_rules = ComplianceFilter.from_knowledge({"disclosures": ["Policy exclusions must be clearly stated"]})
+    assert without_rules.check("You can surrender a policy.").disclosures == []
+    assert without_rules.check("Read the exclusions.").disclosures == ["policy_exclusions"]
+
+def test_consult_trigger(compliance):
+    """Test the licensed professional notice for advice topics"""
+    answer = compliance.check("Life insurance proceeds are usually free of income tax.")
+    assert answer.disclosures == ["licensed_professional"]
+    assert answer.apply("Proceeds are tax free.") == f"Proceeds are tax free.\n\n{CONSULT_NOTICE}"
+    assert compliance.check("On taxes, ask a licensed insurance professional.").notices == []
+
+def test_streamed_tokens_match_whole_answer(compliance):
+    """Test that matches split across token boundaries are found incrementally"""
+    answer = ("Term life covers a fixed period. " * 20) + "We guarantee you the lowest premium. Ask about taxes."
+    scan = compliance.scan()
+    for start in range(0, len(answer), 3):
+        scan.feed(answer[start:start + 3])
+    assert scan.finish() == compliance.check(answer)
+    assert scan.finish().violations == ["guaranteed_lowest_price"]
+
+def test_agent_appends_disclosures_and_flags():
+    """Test compliance context on a processed turn"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        agent = InsuranceAgent()
+    agent.agent_executor = type("Executor", (), {
+        "invoke": lambda self, agent_input: {"output": "You are certainly approved. You can cancel anytime."}
+    })()
+    response = agent.process_message("bob", "Will I qualify?")
+    assert response.context["compliance_violations"] == ["guaranteed_approval"]
+    assert response.context["disclosures_added"] == ["free_look"]
+    assert response.response.endswith("to cancel a new policy for a full refund.")
+    assert GUARANTEE_NOTICE in response.response
+    agent.sessions.close()
+
+def test_chunk_boundaries_do_not_start_words(compliance):
+    """Test that a scan tail cut inside a word does not create a word start"""
+    for padding in range(256):
+        answer = "a" * padding + " Mind the syntax of the form." + " ok" * 150
+        scan = compliance.scan()
+        for character in answer:
+            scan.feed(character)
+        assert scan.finish() == compliance.check(answer) == compliance.check("")
@@ -0,0 +1,101 @@
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import pytest
+from app.agent import InsuranceAgent
+from app.concurrency import KeyedLock
+
+SESSIONS = 2000
+TURNS_PER_SESSION = 5
+
+class RecordingExecutor:
+    """Stand-in for AgentExecutor that checks per-session exclusivity"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = defaultdict(int)
+        self.total_in_flight = 0
+        self.max_parallel = 0
+        self.overlaps = 0
+
+    def invoke(self, agent_input):
+        session_key = agent_input["input"].split("|")[0]
+        with self.lock:
+            self.in_flight[session_key] += 1
+            self.total_in_flight += 1
+            if self.in_flight[session_key] > 1:
+                self.overlaps += 1
+            self.max_parallel = max(self.max_parallel, self.total_in_flight)
+        time.sleep(0.0005)
+        with self.lock:
+            self.in_flight[session_key] -= 1
+            self.total_in_flight -= 1
+        history_length = len(agent_input["chat_history"])
+        return {"output": f"{agent_input['input']}|seen {history_length}"}
+
+def test_keyed_lock_releases_idle_keys():
+    """Test that per-key queues are garbage-collected after use"""
+    locks = KeyedLock()
+    with locks.hold("a"):
+        with locks.hold("b"):
+            assert len(locks) == 2
+    assert len(locks) == 0
+
+def test_keyed_lock_is_fifo():
+    """Test that waiters are admitted in arrival order"""
+    locks = KeyedLock()
+    order = []
+    started = []
+
+    def worker(n):
+        with locks.hold("session"):
+            order.append(n)
+
+    with locks.hold("session"):
+        for n in range(5):
+            thread = threading.Thread(target=worker, args=(n,))
+            thread.start()
+            started.append(thread)
+            time.sleep(0.02)
+    for thread in started:
+        thread.join()
+
+    assert order == list(range(5))
+
+def test_interleaved_turns_stress():
+    """Test history integrity with many sessions in parallel"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        agent = InsuranceAgent()
+    executor = RecordingExecutor()
+    agent.agent_executor = executor
+
+    session_ids = [f"session-{n}" for n in range(SESSIONS)]
+    jobs = [(sid, turn) for sid in session_ids for turn in range(TURNS_PER_SESSION)]
+    random.Random(7).shuffle(jobs)
+
+    def send(job):
+        sid, turn = job
+        return agent.process_message(user_id="stress", message=f"{sid}|turn {turn}", session_id=sid)
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(send, jobs))
+
+    assert executor.overlaps == 0
+    assert executor.max_parallel > 1
+    assert len(agent.session_locks) == 0
+    assert len(agent.sessions) == SESSIONS
+
+    for sid in session_ids:
+        session = agent.sessions[sid]
+        assert session.message_count == TURNS_PER_SESSION
+        messages = [m.content for m in session.messages()]
+        assert len(messages) == 2 * TURNS_PER_SESSION
+        for index in range(0, len(messages), 2):
+            question, answer = messages[index], messages[index + 1]
+            # Each reply belongs to its question and saw every earlier exchange
+            assert answer == f"{question}|seen {index}"
+        assert sorted(messages[0::2]) == [f"{sid}|turn {t}" for t in range(TURNS_PER_SESSION)]
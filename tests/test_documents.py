@@ -0,0 +1,135 @@
+import os
+from unittest.mock import patch
+import pytest
+from fastapi.testclient import TestClient
+from app.documents import DocumentIndex, DocumentStore, DocumentTooLarge, SectionSplitter, current_documents
+from app.tools import PolicyDocumentTool
+
+POLICY = """ACME LIFE INSURANCE COMPANY
+Policy number TL-2041-88
+
+SECTION 1 - DEFINITIONS
+Insured means the person whose life is covered by this policy.
+
+SECTION 2 - DEATH BENEFIT
+We will pay the face amount of $500,000 to the beneficiary upon receipt of due proof of death.
+
+SECTION 3 - EXCLUSIONS
+Suicide within two years of the issue date is not covered; we will refund premiums paid.
+Death while piloting a private aircraft is excluded.
+
+4.1 Grace Period
+A grace period of 31 days is allowed for payment of each premium after the first.
+"""
+
+def ingest(index, text, name="policy.txt", chunk_size=7):
+    """Feed a document in small chunks"""
+    data = text.encode("utf-8")
+    ingestor = index.ingestor(name)
+    for start in range(0, len(data), chunk_size):
+        ingestor.feed(data[start:start + chunk_size])
+    return ingestor.finish()
+
+def test_splitter_handles_chunk_boundaries():
+    """Test sectioning when headings straddle chunks"""
+    splitter = SectionSplitter()
+    sections = []
+    for start in range(0, len(POLICY), 5):
+        sections.extend(splitter.feed(POLICY[start:start + 5]))
+    sections.extend(splitter.finish())
+
+    titles = [title for title, _ in sections]
+    assert titles == ["ACME LIFE INSURANCE COMPANY", "SECTION 1 - DEFINITIONS", "SECTION 2 - DEATH BENEFIT",
+                      "SECTION 3 - EXCLUSIONS", "4.1 Grace Period"]
+    assert "private aircraft" in sections[3][1]
+
+def test_long_sections_are_split():
+    """Test the section size cap"""
+    splitter = SectionSplitter(max_chars=100)
+    text = "COVERAGE\n" + "\n".join(f"Clause {i} describes covered events." for i in range(20))
+    sections = list(splitter.feed(text)) + list(splitter.finish())
+    assert len(sections) > 1
+    assert all(title == "COVERAGE" and len(body) <= 110 for title, body in sections)
+
+def test_search_finds_section():
+    """Test BM25 retrieval and citation fields"""
+    index = DocumentIndex()
+    info = ingest(index, POLICY)
+    assert info["sections"] == 5
+
+    hits = index.search("Is suicide covered?")
+    assert hits[0]["section"] == "SECTION 3 - EXCLUSIONS"
+    assert hits[0]["document"] == "policy.txt"
+    assert index.search("grace period days")[0]["section"] == "4.1 Grace Period"
+    assert index.search("the of") == []
+
+def test_limits():
+    """Test size and document count limits"""
+    index = DocumentIndex(max_documents=1)
+    ingestor = index.ingestor("big.txt", max_bytes=10)
+    with pytest.raises(DocumentTooLarge):
+        ingestor.feed(b"x" * 11)
+    ingest(index, POLICY)
+    with pytest.raises(ValueError):
+        index.ingestor("second.txt")
+
+def test_store_evicts_past_byte_budget():
+    """Test that the least recently used indexes go once the store's byte budget is spent"""
+    store = DocumentStore(max_bytes=1)
+    for session_id in ("a", "b", "c"):
+        index = store.get_or_create(session_id)
+        ingest(index, POLICY)
+        store.charge(session_id, index)
+    assert store.get("a") is None and store.get("b") is None
+    assert store.get("c") is not None
+
+    store = DocumentStore(max_bytes=10 ** 9)
+    for session_id in ("a", "b"):
+        index = store.get_or_create(session_id)
+        ingest(index, POLICY)
+        store.charge(session_id, index)
+    store.discard("a")
+    store.max_bytes = store.get("b").approx_size()
+    index = store.get_or_create("c")
+    ingest(index, POLICY)
+    store.charge("c", index)
+    assert store.get("b") is None and store.get("c") is not None
+
+def test_tool_reads_session_documents():
+    """Test the retrieval tool through the session context variable"""
+    tool = PolicyDocumentTool()
+    assert "not uploaded" in tool._run("death benefit")
+
+    index = DocumentIndex()
+    ingest(index, POLICY)
+    token = current_documents.set(index)
+    try:
+        output = tool._run("how much is the death benefit")
+    finally:
+        current_documents.reset(token)
+    assert output.startswith("[policy.txt, SECTION 2 - DEATH BENEFIT]")
+    assert "$500,000" in output
+
+def test_upload_endpoint():
+    """Test streaming upload and search over HTTP"""
+    from app.main import app
+    from app.session import Session
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(app) as client:
+            from app import main
+            main.insurance_agent.sessions["doc-session"] = Session("user-1")
+
+            chunks = (POLICY[start:start + 64].encode() for start in range(0, len(POLICY), 64))
+            response = client.post("/sessions/doc-session/documents?name=my-policy.txt&user_id=user-1", content=chunks)
+            assert response.status_code == 201
+            assert response.json()["sections"] == 5
+
+            search = {"q": "aircraft", "user_id": "user-1"}
+            results = client.get("/sessions/doc-session/documents", params=search).json()["results"]
+            assert results[0]["section"] == "SECTION 3 - EXCLUSIONS"
+
+            missing = client.post("/sessions/missing/documents?user_id=user-1", content=b"text")
+            assert missing.status_code == 404
+            foreign_upload = client.post("/sessions/doc-session/documents?user_id=user-2", content=b"text")
+            foreign_search = client.get("/sessions/doc-session/documents", params=dict(search, user_id="user-2"))
+            assert (foreign_upload.status_code, foreign_search.status_code) == (404, 404)
@@ -0,0 +1,69 @@
+import threading
+from typing import Any, List, Tuple, Union
+from langchain.agents import BaseMultiActionAgent
+from langchain.schema import AgentAction, AgentFinish
+from langchain.tools import Tool
+from app.executor import ParallelAgentExecutor
+
+class ComparisonAgent(BaseMultiActionAgent):
+    """Requests one lookup per policy type, then answers from the observations"""
+
+    policy_types: List[str] = ["term", "whole", "universal"]
+
+    @property
+    def input_keys(self) -> List[str]:
+        return ["input"]
+
+    def plan(self, intermediate_steps: List[Tuple[AgentAction, str]], callbacks: Any = None,
+             **kwargs: Any) -> Union[List[AgentAction], AgentFinish]:
+        if not intermediate_steps:
+            return [AgentAction("lookup", policy_type, "") for policy_type in self.policy_types]
+        return AgentFinish({"output": " | ".join(obs for _, obs in intermediate_steps)}, "")
+
+    async def aplan(self, intermediate_steps, callbacks=None, **kwargs):
+        return self.plan(intermediate_steps, callbacks, **kwargs)
+
+def gathered_lookup(barrier: threading.Barrier):
+    """Lookup that only returns once all of a step's calls are running together"""
+    def lookup(policy_type: str) -> str:
+        barrier.wait()
+        return f"{policy_type} info"
+    return lookup
+
+def test_tool_calls_run_in_parallel_and_in_order():
+    """Test that one step's tool calls overlap and keep their order"""
+    executor = ParallelAgentExecutor(
+        agent=ComparisonAgent(),
+        tools=[Tool(name="lookup", func=gathered_lookup(threading.Barrier(3, timeout=5)),
+                    description="Look up a policy type")],
+        return_intermediate_steps=True
+    )
+
+    result = executor.invoke({"input": "term vs whole vs universal"})
+
+    assert result["output"] == "term info | whole info | universal info"
+    assert [action.tool_input for action, _ in result["intermediate_steps"]] == ["term", "whole", "universal"]
+
+def test_iteration_cap_stops_runaway_loops():
+    """Test that max_iterations bounds the agent loop"""
+    class LoopingAgent(ComparisonAgent):
+        def plan(self, intermediate_steps, callbacks=None, **kwargs):
+            return [AgentAction("lookup", "term", "")]
+
+    executor = ParallelAgentExecutor(
+        agent=LoopingAgent(),
+        tools=[Tool(name="lookup", func=lambda q: "again", description="Look up a policy type")],
+        max_iterations=3,
+        return_intermediate_steps=True
+    )
+
+    result = executor.invoke({"input": "loop"})
+    assert len(result["intermediate_steps"]) == 3
+    assert "stopped" in result["output"]
+
+def test_each_parallelism_gets_its_own_pool():
+    """Test that executors with different max_parallel_tools do not share a pool"""
+    from app.executor import _tool_pool
+    assert _tool_pool(4) is _tool_pool(4)
+    assert _tool_pool(1) is not _tool_pool(4)
+    assert _tool_pool(1)._max_workers == 1
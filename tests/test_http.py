@@ -0,0 +1,62 @@
+import os
+from unittest.mock import patch
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from app.http_layer import CompressionMiddleware, choose_encoding
+
+@pytest.fixture
+def small_app():
+    """App with one large and one small response"""
+    test_app = FastAPI()
+    test_app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @test_app.get("/large")
+    async def large():
+        return {"data": "life insurance " * 200}
+
+    @test_app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @test_app.get("/tenant")
+    async def tenant(response: Response):
+        response.headers["Vary"] = "X-Tenant"
+        return {"data": "tenant catalog " * 200}
+
+    return test_app
+
+def test_choose_encoding():
+    """Test Accept-Encoding negotiation"""
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("") is None
+
+def test_compression_threshold(small_app):
+    """Test that only bodies above the threshold are compressed"""
+    client = TestClient(small_app)
+    large = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.json()["data"].startswith("life insurance")
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"ok": True}
+
+    varied = client.get("/tenant", headers={"Accept-Encoding": "gzip"})
+    assert varied.headers["vary"] == "X-Tenant, Accept-Encoding"
+
+def test_knowledge_types_conditional_get():
+    """Test ETag and 304 handling on knowledge listings"""
+    from app.main import app
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(app) as client:
+            first = client.get("/knowledge/types")
+            etag = first.headers["etag"]
+            assert first.status_code == 200
+            assert "term_life" in first.json()["policy_types"]
+            assert "max-age" in first.headers["cache-control"]
+
+            second = client.get("/knowledge/types", headers={"If-None-Match": etag})
+            assert second.status_code == 304
+            assert second.content == b""
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from app.illustration import illustrate, summarize, to_serializable
+from app.tools import IllustrationTool
+
+def test_guaranteed_below_non_guaranteed():
+    """Test that guaranteed values never exceed illustrated values"""
+    result = illustrate("whole_life", 35, 250000, 3000, seed=1)
+    guaranteed = result["guaranteed"]["cash_value"]
+    current = result["non_guaranteed"]["cash_value"]
+    assert np.all(guaranteed <= current + 1e-6)
+    assert current[19] > 0
+
+def test_surrender_and_death_benefit_bounds():
+    """Test surrender charges and the death benefit floor"""
+    result = illustrate("universal_life", 45, 500000, 6000, seed=1)
+    values = result["non_guaranteed"]
+    assert np.all(values["surrender_value"] <= values["cash_value"])
+    in_force = values["cash_value"] > 0
+    assert np.all(values["death_benefit"][in_force] >= 500000)
+
+def test_variable_life_monte_carlo():
+    """Test percentile bands and lapse probability over 10,000 return paths"""
+    result = illustrate("variable life", 40, 300000, 4000, paths=10000, seed=7)
+
+    monte_carlo = result["monte_carlo"]
+    low, median, high = monte_carlo["cash_value"][:, 29]
+    assert low <= median <= high
+    assert 0.0 <= monte_carlo["lapse_probability"] <= 1.0
+
+def test_invalid_input():
+    """Test input validation"""
+    with pytest.raises(ValueError):
+        illustrate("term_life", 35, 250000, 3000)
+    with pytest.raises(ValueError):
+        illustrate("whole_life", 130, 250000, 3000)
+
+def test_serializable_and_summary():
+    """Test JSON conversion and the tool summary"""
+    result = illustrate("whole_life", 35, 250000, 3000)
+    data = to_serializable(result)
+    assert isinstance(data["age"], list)
+    assert isinstance(data["guaranteed"]["cash_value"][0], float)
+    assert "Guaranteed cash value" in summarize(result)
+
+    output = IllustrationTool()._run("whole life", 35, 250000, 3000)
+    assert "not a promise" in output
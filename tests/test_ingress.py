@@ -0,0 +1,112 @@
+import asyncio
+import os
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from app.agent import InsuranceAgent
+
+# The ingress is an optional extra
+pytest.importorskip("ormsgpack")
+
+from app.ingress import IngressClient, IngressServer, ProtocolError, encode_frame, read_frame
+from app.streaming import answer_chunks
+from app.models import MessageResponse
+from app.tools import PolicyTypeTool
+
+class EchoAgent:
+    """Stands in for InsuranceAgent, answering after a short delay"""
+
+    def process_message(self, user_id, message, session_id=None, timeout=None, priority=None, tenant=None):
+        if message == "fail":
+            raise ValueError("bad message")
+        time.sleep(0.05)
+        return MessageResponse(response=f"echo: {message}", session_id=session_id or "new-session",
+                               query_type="general")
+
+class BarrierAgent(EchoAgent):
+    """Answers only once ten calls are in flight together"""
+
+    def __init__(self):
+        self.barrier = threading.Barrier(10, timeout=5)
+
+    def process_message(self, user_id, message, **kwargs):
+        if message.startswith("question"):
+            self.barrier.wait()
+        return super().process_message(user_id, message, **kwargs)
+
+def serve(agent, scenario):
+    """Run scenario(client) against a server on an ephemeral port"""
+    async def run():
+        server = IngressServer(agent)
+        port = await server.start("127.0.0.1", 0)
+        client = await IngressClient.connect("127.0.0.1", port)
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+            await server.close()
+    return asyncio.run(run())
+
+def test_frames_round_trip():
+    """Test framing and rejection of oversized frames"""
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_frame({"id": 1, "op": "ping"}) + encode_frame({"blob": "x" * 100}))
+        reader.feed_eof()
+        first = await read_frame(reader, 64)
+        with pytest.raises(ProtocolError):
+            await read_frame(reader, 64)
+        return first
+    assert asyncio.run(run()) == {"id": 1, "op": "ping"}
+
+def test_answer_chunks_cover_the_answer():
+    """Test sentence-aligned streaming pieces"""
+    answer = "Term life covers a fixed period. " * 20 + "Whole life lasts for life."
+    pieces = list(answer_chunks(answer))
+    assert len(pieces) > 1
+    assert "".join(pieces) == answer
+    assert all(len(piece) <= 201 for piece in pieces)
+
+def test_unary_chat_multiplexes_one_connection():
+    """Test concurrent unary calls, errors and ping on a persistent connection"""
+    async def scenario(client):
+        await client.ping()
+        replies = await asyncio.gather(*(
+            client.chat("bob", f"question {n}", session_id=f"s{n}") for n in range(10)
+        ))
+        failed = await client.chat("bob", "fail")
+        invalid = await client.chat("bob", "")
+        return replies, failed, invalid
+
+    # Every call waits at a barrier for all ten, so they can only succeed if they overlap
+    replies, failed, invalid = serve(BarrierAgent(), scenario)
+    assert [reply["response"] for reply in replies] == [f"echo: question {n}" for n in range(10)]
+    assert [reply["session_id"] for reply in replies] == [f"s{n}" for n in range(10)]
+    assert all(reply["ok"] and reply["query_type"] == "general" for reply in replies)
+    assert failed == {"ok": False, "status": 422, "error": "bad message"}
+    assert invalid["status"] == 422
+
+def test_stream_reports_tools_and_answer():
+    """Test streamed progress and answer frames from the agent core"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        agent = InsuranceAgent()
+    agent.agent_executor = type("Executor", (), {
+        "invoke": lambda self, agent_input, config=None: {
+            "output": PolicyTypeTool().run("term life", callbacks=config["callbacks"])
+        }
+    })()
+
+    async def scenario(client):
+        return [frame async for frame in client.chat_stream("bob", "Tell me about term life")]
+
+    frames = serve(agent, scenario)
+    events = [frame["event"] for frame in frames]
+    assert events[0] == "start" and events[-1] == "done"
+    assert {"event": "tool", "tool": "get_policy_type_info"} in frames
+    assert "delta" in events
+    text = "".join(frame["text"] for frame in frames if frame["event"] == "delta")
+    assert "Fixed term" in text
+    assert frames[-1]["ok"] and frames[-1]["session_id"] == frames[0]["session_id"]
+    assert agent.sessions.get(frames[0]["session_id"]) is not None
+    agent.sessions.close()
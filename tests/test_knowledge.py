@@ -0,0 +1,141 @@
+import copy
+import json
+import os
+from unittest.mock import patch
+import pytest
+from fastapi.testclient import TestClient
+from app.knowledge import (
+    KnowledgeRegistry, KnowledgeSnapshot, KnowledgeValidationError, UnknownTenant,
+    compile_snapshot, current_knowledge, validate_knowledge, write_snapshot
+)
+from app.tools import ClaimsProcessTool, PolicyTypeTool
+
+@pytest.fixture
+def catalog():
+    """The shipped knowledge base as a tenant catalog"""
+    with open("knowledge/insurance_data.json") as f:
+        return json.load(f)
+
+def carrier(catalog, name):
+    """A catalog whose only product is a carrier-specific term policy"""
+    data = copy.deepcopy(catalog)
+    data["policy_types"] = {f"{name}_term": dict(catalog["policy_types"]["term_life"], duration=f"{name} terms")}
+    return data
+
+def test_snapshot_round_trip(catalog, tmp_path):
+    """Test that a mapped snapshot reads back the catalog in order"""
+    path = str(tmp_path / "acme.kbs")
+    write_snapshot(catalog, path)
+    snapshot = KnowledgeSnapshot.open(path)
+
+    assert snapshot.name == "acme"
+    assert snapshot.to_dict() == catalog
+    assert snapshot.keys("policy_types") == list(catalog["policy_types"])
+    assert snapshot.get("glossary", "premium") == catalog["glossary"]["premium"]
+    assert snapshot.get("glossary", "missing", "n/a") == "n/a"
+    assert snapshot.version == KnowledgeSnapshot.from_dict(json.loads(json.dumps(catalog, indent=2))).version
+    assert snapshot.size < len(json.dumps(catalog, indent=2))
+
+def test_validation_rejects_bad_catalogs(catalog):
+    """Test the knowledge schema"""
+    validate_knowledge(catalog)
+    broken = copy.deepcopy(catalog)
+    del broken["policy_types"]["term_life"]["description"]
+    with pytest.raises(KnowledgeValidationError, match="description"):
+        compile_snapshot(broken)
+    with pytest.raises(KnowledgeValidationError):
+        compile_snapshot({"policy_types": {}})
+    with pytest.raises(KnowledgeValidationError, match="processing_time"):
+        compile_snapshot(dict(catalog, common_questions={"claims_process": {"required_documents": []}}))
+    with pytest.raises(KnowledgeValidationError, match="named entries"):
+        compile_snapshot(dict(catalog, notes=["free text"]))
+
+def test_registry_loads_lazily_with_lru_cap(catalog, tmp_path):
+    """Test lazy mapping and eviction of tenant snapshots"""
+    for name in ("acme", "globex", "initech"):
+        write_snapshot(carrier(catalog, name), str(tmp_path / f"{name}.kbs"))
+    registry = KnowledgeRegistry(str(tmp_path), max_resident=2)
+    assert registry.tenants() == ["acme", "globex", "initech"]
+    assert registry.resident() == []
+
+    acme = registry.get("acme")
+    assert registry.get("acme") is acme
+    registry.get("globex")
+    registry.get("acme")
+    registry.get("initech")
+    assert registry.resident() == ["acme", "initech"]
+    # A request still holding an evicted snapshot can keep reading it
+    globex = registry.get("globex")
+    assert registry.resident() == ["initech", "globex"]
+    assert acme.keys("policy_types") == ["acme_term"]
+    assert globex.keys("policy_types") == ["globex_term"]
+
+    with pytest.raises(UnknownTenant):
+        registry.get("umbrella")
+    with pytest.raises(UnknownTenant):
+        registry.get("../acme")
+
+def test_recompiling_keeps_mapped_snapshot_readable(catalog, tmp_path):
+    """Test atomic replacement under a live mapping"""
+    path = str(tmp_path / "acme.kbs")
+    write_snapshot(carrier(catalog, "old"), path)
+    mapped = KnowledgeSnapshot.open(path)
+    write_snapshot(carrier(catalog, "new"), path)
+    assert mapped.keys("policy_types") == ["old_term"]
+    assert KnowledgeSnapshot.open(path).keys("policy_types") == ["new_term"]
+
+def test_registry_remaps_recompiled_snapshot(catalog, tmp_path):
+    """Test that a resident snapshot is replaced once its file is recompiled or removed"""
+    path = tmp_path / "acme.kbs"
+    write_snapshot(carrier(catalog, "old"), str(path))
+    registry = KnowledgeRegistry(str(tmp_path))
+    old = registry.get("acme")
+    assert registry.get("acme") is old
+
+    write_snapshot(carrier(catalog, "new"), str(path))
+    assert registry.get("acme").keys("policy_types") == ["new_term"]
+    assert old.keys("policy_types") == ["old_term"]
+
+    path.unlink()
+    with pytest.raises(UnknownTenant):
+        registry.get("acme")
+    assert registry.resident() == []
+
+def test_tools_read_the_request_tenant(catalog):
+    """Test that tools answer from the current tenant's catalog"""
+    data = carrier(catalog, "acme")
+    data["common_questions"]["claims_process"]["processing_time"] = "5 business days"
+    token = current_knowledge.set(KnowledgeSnapshot.from_dict(data, "acme"))
+    try:
+        assert "acme terms" in PolicyTypeTool()._run(policy_type="acme term")
+        assert "term_life" not in PolicyTypeTool()._run(policy_type="whole life")
+        assert "5 business days" in ClaimsProcessTool()._run()
+    finally:
+        current_knowledge.reset(token)
+    assert "Fixed term" in PolicyTypeTool()._run(policy_type="term life")
+
+def test_endpoints_select_tenant(catalog, tmp_path):
+    """Test per-request tenant selection over HTTP"""
+    from app import main
+    write_snapshot(carrier(catalog, "acme"), str(tmp_path / "acme.kbs"))
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(main.app) as client:
+            main.insurance_agent.tenants = KnowledgeRegistry(str(tmp_path))
+            main.insurance_agent.agent_executor = type("Executor", (), {
+                "invoke": lambda self, agent_input: {
+                    "output": PolicyTypeTool()._run(policy_type="acme term")
+                }
+            })()
+            types = client.get("/knowledge/types", headers={"X-Tenant": "acme"})
+            default_types = client.get("/knowledge/types")
+            chat = client.post("/chat", json={"message": "Tell me about term", "user_id": "bob"},
+                               headers={"X-Tenant": "acme"})
+            unknown = client.post("/chat", json={"message": "Hi", "user_id": "bob"},
+                                  headers={"X-Tenant": "umbrella"})
+
+    assert types.json() == {"policy_types": ["acme_term"]}
+    assert "term_life" in default_types.json()["policy_types"]
+    assert types.headers["etag"] != default_types.headers["etag"]
+    assert types.headers["vary"] == default_types.headers["vary"] == "X-Tenant"
+    assert "acme terms" in chat.json()["response"]
+    assert unknown.status_code == 404
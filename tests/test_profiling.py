@@ -0,0 +1,97 @@
+import os
+import pstats
+import time
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app.profiling import RequestProfile, StackSampler, current_profile, profiled, request_profile
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+    return seconds
+
+def test_cprofile_merges_pool_threads(tmp_path):
+    """Test that work handed to another thread joins the request's cProfile"""
+    from concurrent.futures import ThreadPoolExecutor
+    from contextvars import copy_context
+
+    def request():
+        with ThreadPoolExecutor(1) as pool:
+            return pool.submit(copy_context().run, profiled, busy, 0.05).result()
+
+    profile = RequestProfile("cprofile", str(tmp_path))
+    assert profile.run(request) == 0.05
+    assert current_profile.get() is None
+
+    path = profile.save("0123456789abcdef", "claims")
+    assert path.endswith("-0123456789ab-claims-cprofile.pstats")
+    functions = {name for _, _, name in pstats.Stats(path).stats}
+    assert {"request", "busy"} <= functions
+
+def test_cprofile_without_data_writes_nothing(tmp_path):
+    """Test saving when another profiler kept cProfile from starting"""
+    import cProfile
+    profile = RequestProfile("cprofile", str(tmp_path))
+    with patch.object(cProfile.Profile, "enable", side_effect=ValueError("Another profiling tool is already active")):
+        assert profile.run(busy, 0.01) == 0.01
+    assert profile.save("s-1", "claims") is None
+    assert os.listdir(tmp_path) == []
+
+def test_sampler_writes_collapsed_stacks(tmp_path):
+    """Test statistical sampling of the request thread"""
+    profile = RequestProfile("sample", str(tmp_path), interval=0.001)
+    profile.run(busy, 0.1)
+    path = profile.save(None, None)
+
+    lines = open(path).read().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "busy (test_profiling.py" in stack.split(";")[-1]
+
+def test_stack_sampler_sees_all_threads():
+    """Test whole-process sampling"""
+    sampler = StackSampler(interval=0.001)
+    sampler.start()
+    busy(0.05)
+    sampler.stop()
+    assert any("busy" in stack for stack in sampler.samples)
+
+def test_profile_requires_admin_token():
+    """Test that the header alone does not enable profiling"""
+    with patch("app.auth.settings.admin_token", "secret"):
+        assert request_profile("cprofile", None) is None
+        assert request_profile("cprofile", "wrong") is None
+        assert request_profile("cprofile", "secret").mode == "cprofile"
+    with patch("app.auth.settings.admin_token", None):
+        assert request_profile("cprofile", "") is None
+        # The old profiling-only setting still works until it is removed
+        with patch("app.auth.settings.profiling_admin_token", "legacy"):
+            assert request_profile("cprofile", "legacy").mode == "cprofile"
+
+def test_chat_endpoint_profiles_on_request(tmp_path):
+    """Test an admin-requested profile of a /chat turn"""
+    from app import main
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(main.app) as client:
+            main.insurance_agent.agent_executor = type("Executor", (), {
+                "invoke": lambda self, agent_input: {"output": "Term life covers a fixed period."}
+            })()
+            with patch("app.main.settings.profiling_enabled", True), \
+                    patch("app.auth.settings.admin_token", "secret"), \
+                    patch("app.profiling.settings.profile_dir", str(tmp_path)):
+                response = client.post(
+                    "/chat",
+                    json={"message": "What is term life?", "user_id": "bob"},
+                    headers={"X-Profile": "cprofile", "X-Admin-Token": "secret"}
+                )
+                denied = client.post("/admin/profile?seconds=1", headers={"X-Admin-Token": "wrong"})
+            disabled = client.post("/admin/profile?seconds=1", headers={"X-Admin-Token": "secret"})
+
+    assert response.status_code == 200
+    [path] = list(tmp_path.iterdir())
+    assert path.name.endswith("-policy_type-cprofile.pstats")
+    assert any(name == "process_message" for _, _, name in pstats.Stats(str(path)).stats)
+    assert denied.status_code == 403
+    assert disabled.status_code == 404
@@ -0,0 +1,73 @@
+import os
+from unittest.mock import patch
+import orjson
+from fastapi.testclient import TestClient
+from app.agent import InsuranceAgent
+from app.recorder import TrafficRecorder, scrub
+from app.simulation import SimulatedChatModel
+
+def test_scrub_removes_identifiers():
+    """Test anonymization of free text"""
+    message = "I'm 45, email jane.doe@example.com or call 555-123-4567, policy AB1234567, SSN 123-45-6789"
+    scrubbed = scrub(message)
+    assert "45" in scrubbed
+    for secret in ("jane.doe", "555-123-4567", "AB1234567", "123-45-6789"):
+        assert secret not in scrubbed
+    assert "<email>" in scrubbed and "<phone>" in scrubbed
+
+def test_recorder_writes_pseudonymous_turns(tmp_path):
+    """Test JSONL output and stable pseudonyms"""
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path), salt="test")
+    recorder.record(100.0, "alice", "session-1", True, "What is term life?", 200, 0.5, "policy_type")
+    recorder.record(102.5, "alice", "session-1", False, "Call me at 555-123-4567", 200, 0.25, "general")
+    recorder.close()
+
+    first, second = [orjson.loads(line) for line in path.read_bytes().splitlines()]
+    assert first["session"] == second["session"] != "session-1"
+    assert first["user"] != "alice"
+    assert second["ts"] - first["ts"] == 2.5
+    assert first["new_session"] and not second["new_session"]
+    assert "<phone>" in second["message"]
+    assert first["latency_ms"] == 500.0
+
+def test_session_sampling_is_all_or_nothing():
+    """Test that sampling keeps or drops whole sessions"""
+    recorder = TrafficRecorder(os.devnull, salt="test", sample_rate=0.5)
+    decisions = {session: recorder.sampled(session) for session in (f"s{i}" for i in range(200))}
+    assert all(recorder.sampled(session) == kept for session, kept in decisions.items())
+    assert 50 < sum(decisions.values()) < 150
+    recorder.close()
+
+def test_simulated_llm_answers_turns():
+    """Test a full turn through the agent with the simulated model"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with patch("app.agent.settings.simulated_llm", True), patch("app.agent.settings.simulated_llm_latency", 0.01):
+            agent = InsuranceAgent()
+    assert isinstance(agent.llm, SimulatedChatModel)
+
+    response = agent.process_message("user-1", "What is term life insurance?")
+    assert "general information" in response.response
+    assert not response.context.get("degraded")
+
+def test_chat_endpoint_records(tmp_path):
+    """Test that /chat turns reach the recorder"""
+    from app import main
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(main.app) as client:
+            main.insurance_agent.agent_executor = type("Executor", (), {
+                "invoke": lambda self, agent_input: {"output": "Term life covers a fixed period."}
+            })()
+            recorder = TrafficRecorder(str(tmp_path / "traffic.jsonl"), salt="test")
+            with patch.object(main, "traffic_recorder", recorder):
+                response = client.post("/chat", json={"message": "What is term life?", "user_id": "bob"})
+                failed = [client.post("/chat", json={"message": " ", "user_id": "bob"}) for _ in range(2)]
+            recorder.close()
+
+    entry, *failures = [orjson.loads(line) for line in (tmp_path / "traffic.jsonl").read_bytes().splitlines()]
+    assert response.status_code == 200
+    assert entry["query_type"] == "policy_type"
+    assert entry["session"] == recorder.pseudonym(response.json()["session_id"])
+    # Failed turns that never got a session are not chained together
+    assert [f.status_code for f in failed] == [500, 500]
+    assert len({failure["session"] for failure in failures}) == 2
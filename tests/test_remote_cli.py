@@ -0,0 +1,122 @@
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+import httpx
+from fastapi.testclient import TestClient
+from app.cli_interface import CLIInterface
+from app.remote_client import RemoteChatClient
+
+def invoke_with_tool(self, agent_input, config=None):
+    for handler in (config or {}).get("callbacks", []):
+        handler.on_tool_start({"name": "get_claims_process"}, "")
+    return {"output": "File the claim form. Include the death certificate. Most claims are paid in 30 days."}
+
+def test_chat_stream_endpoint_emits_events():
+    """Test start, tool, delta and done events of a streamed turn"""
+    from app import main
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(main.app) as client:
+            main.insurance_agent.agent_executor = type("Executor", (), {"invoke": invoke_with_tool})()
+            with client.stream("POST", "/chat/stream", json={"user_id": "bob", "message": "How do I file a claim?"}) as response:
+                events = [json.loads(line) for line in response.iter_lines() if line]
+            empty = client.post("/chat/stream", json={"user_id": "bob", "message": " "})
+
+    assert response.status_code == 200
+    assert [event["event"] for event in events[:2]] == ["start", "tool"]
+    assert events[1]["tool"] == "get_claims_process"
+    text = "".join(event["text"] for event in events if event["event"] == "delta")
+    assert text.startswith("File the claim form.")
+    assert events[-1]["event"] == "done" and events[-1]["ok"]
+    assert events[-1]["session_id"] == events[0]["session_id"]
+    assert empty.status_code == 422
+
+def test_chat_routes_use_their_own_sla():
+    """Test that each chat route gets the turn deadline configured for it"""
+    from app import main
+    timeouts = []
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(main.app) as client:
+            process = main.insurance_agent.process_message
+            main.insurance_agent.process_message = lambda **kwargs: timeouts.append(kwargs["timeout"]) or process(**kwargs)
+            main.insurance_agent.agent_executor = type("Executor", (), {"invoke": invoke_with_tool})()
+            with patch.object(main.settings, "endpoint_sla_seconds", {"/chat": 7.0, "/chat/stream": 9.0}):
+                client.post("/chat", json={"user_id": "bob", "message": "How do I file a claim?"})
+                client.post("/chat/stream", json={"user_id": "bob", "message": "How do I file a claim?"})
+    assert timeouts == [7.0, 9.0]
+
+def test_cli_renders_streamed_answer(capsys):
+    """Test the thin client over a single connection"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path == "/knowledge/types":
+            return httpx.Response(200, json={"policy_types": ["term_life", "whole_life"]})
+        events = [
+            {"event": "start", "session_id": "s-1"},
+            {"event": "tool", "tool": "get_policy_type_info"},
+            {"event": "delta", "text": "Term life covers a fixed period. "},
+            {"event": "delta", "text": "It has no cash value."},
+            {"event": "done", "ok": True, "session_id": "s-1", "query_type": "policy_type"},
+        ]
+        return httpx.Response(200, content=b"".join(json.dumps(event).encode() + b"\n" for event in events))
+
+    cli = CLIInterface.__new__(CLIInterface)
+    cli.agent = None
+    cli.remote = RemoteChatClient("http://server", keepalive=None, transport=httpx.MockTransport(handler))
+    cli.current_session_id = None
+    cli.user_id = "cli_user"
+    cli.process_message("What is term life?")
+    cli.process_message("Does it build cash value?")
+    cli.get_policy_types()
+    cli.remote.close()
+
+    output = capsys.readouterr().out
+    assert "[get_policy_type_info] " in output
+    assert "Term life covers a fixed period. It has no cash value.\n" in output
+    assert "Whole Life" in output
+    assert cli.current_session_id == "s-1"
+    assert json.loads(requests[1].content)["session_id"] == "s-1"
+
+def test_stream_does_not_hold_the_connection_between_events():
+    """Test that other requests can run while a streamed turn is being consumed or after it is abandoned"""
+    import threading
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "healthy"})
+        events = [{"event": "start", "session_id": "s-1"}, {"event": "delta", "text": "Hi"}, {"event": "done", "ok": True}]
+        return httpx.Response(200, content=b"".join(json.dumps(event).encode() + b"\n" for event in events))
+
+    remote = RemoteChatClient("http://server", keepalive=None, transport=httpx.MockTransport(handler))
+    stream = remote.stream_chat("bob", "Hello")
+    assert next(stream)["event"] == "start"
+    results = []
+    checker = threading.Thread(target=lambda: results.append(remote.health()), daemon=True)
+    checker.start()
+    checker.join(5)
+    assert results == [{"status": "healthy"}]
+    assert [event["event"] for event in stream] == ["delta", "done"]
+
+    abandoned = remote.stream_chat("bob", "Hello")
+    next(abandoned)
+    abandoned.close()
+    assert remote.health() == {"status": "healthy"}
+    remote.close()
+
+def test_remote_mode_starts_without_langchain():
+    """Test that the thin client never imports LangChain"""
+    script = (
+        "import sys, time; start = time.perf_counter(); "
+        "from app.cli_interface import CLIInterface; CLIInterface('http://127.0.0.1:9').remote.close(); "
+        "print(time.perf_counter() - start, any(name.startswith('langchain') for name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, timeout=60,
+        env={**os.environ, "OPENAI_API_KEY": ""}
+    )
+    elapsed, imported = result.stdout.split()
+    assert imported == "False"
+    assert float(elapsed) < 1.0
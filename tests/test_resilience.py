@@ -0,0 +1,63 @@
+import os
+import time
+from unittest.mock import Mock, patch
+import pytest
+from app.agent import InsuranceAgent
+from app.fallback import KnowledgeFallback, extract_age
+from app.resilience import CircuitBreaker, Deadline, DeadlineExceeded
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test breaker transitions between closed, open and half-open"""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # only one trial call
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_deadline_check():
+    """Test deadline expiry"""
+    deadline = Deadline(0.0)
+    with pytest.raises(DeadlineExceeded):
+        deadline.check("tool")
+    assert not Deadline(10).expired()
+
+def test_fallback_selects_content_by_query_type(sample_knowledge_base):
+    """Test knowledge-base answers for each query type"""
+    fallback = KnowledgeFallback(sample_knowledge_base)
+    assert "claims process" in fallback.answer("claims", "How do I file a claim?")
+    assert "Current age: 45" in fallback.answer("eligibility", "Am I eligible at age 45?")
+    assert "Term Life" in fallback.answer("policy_type", "What is term life?")
+    assert extract_age("I'm 52 years old") == 52
+
+def test_slow_llm_degrades_within_deadline():
+    """Test that a slow agent is abandoned and answered from the knowledge base"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        agent = InsuranceAgent()
+    agent.agent_executor = Mock()
+    agent.agent_executor.invoke.side_effect = lambda _: time.sleep(2) or {"output": "late"}
+
+    with patch("app.agent.settings.degraded_reserve_seconds", 0.1):
+        response = agent.process_message("test_user", "How do I file a claim?", timeout=0.5)
+
+    assert response.context["degraded"] is True
+    assert response.context["degraded_reason"] == "deadline"
+    assert "claim" in response.response.lower()
+
+def test_open_breaker_skips_llm():
+    """Test that an open circuit answers without calling the agent"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        agent = InsuranceAgent()
+    agent.agent_executor = Mock()
+    agent.llm_breaker = CircuitBreaker("test_llm", failure_threshold=1, reset_seconds=60)
+    agent.llm_breaker.record_failure()
+
+    response = agent.process_message("test_user", "What is term life?")
+    agent.agent_executor.invoke.assert_not_called()
+    assert response.context["degraded_reason"] == "circuit_open"
@@ -0,0 +1,54 @@
+import os
+from unittest.mock import Mock, patch
+import pytest
+from app.agent import InsuranceAgent
+from app.metrics import metrics
+from app.routing import ModelRouter
+
+TIERS = {
+    "fast": {"model": "small", "input_cost_per_1k": 0.001, "output_cost_per_1k": 0.002},
+    "standard": {"model": "medium", "input_cost_per_1k": 0.01, "output_cost_per_1k": 0.02},
+    "advanced": {"model": "large", "input_cost_per_1k": 0.1, "output_cost_per_1k": 0.2},
+}
+TABLE = {"general": "fast", "policy_type": "fast", "cost": "standard", "comparison": "advanced"}
+
+@pytest.fixture
+def router():
+    return ModelRouter(TIERS, ["fast", "standard", "advanced"], TABLE)
+
+def test_route_by_query_type_and_complexity(router):
+    """Test tier selection from query type, length, depth and tool needs"""
+    assert router.route("general", "Hello!", history_turns=0) == "fast"
+    assert router.route("comparison", "Term vs whole?", history_turns=0) == "advanced"
+    assert router.route("policy_type", "x" * 500, history_turns=0) == "standard"
+    assert router.route("policy_type", "What is term?", history_turns=20) == "standard"
+    assert router.route("cost", "Price of term and whole?", history_turns=0, tool_calls_expected=2) == "advanced"
+
+def test_escalation_and_validation(router):
+    """Test answer validation and tier escalation"""
+    assert not router.is_acceptable("")
+    assert not router.is_acceptable("Agent stopped due to max iterations.")
+    assert router.is_acceptable("Term life covers you for a fixed number of years.")
+    assert router.escalate("fast") == "standard"
+    assert router.escalate("advanced") is None
+
+def test_record_cost(router):
+    """Test per-tier cost accounting"""
+    before = metrics.counter("model_tier_standard_cost_usd")
+    cost = router.record("standard", 0.5, prompt_tokens=1000, completion_tokens=500)
+    assert cost == pytest.approx(0.02)
+    assert metrics.counter("model_tier_standard_cost_usd") == pytest.approx(before + 0.02)
+
+def test_agent_escalates_failed_cheap_answer(router):
+    """Test that a failed fast-tier answer is retried on the next tier"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        agent = InsuranceAgent()
+    agent.router = router
+    agent._tier_executors = {
+        "fast": Mock(invoke=Mock(return_value={"output": "Agent stopped due to max iterations."})),
+        "standard": Mock(invoke=Mock(return_value={"output": "Term life covers a fixed period of years."})),
+    }
+
+    response = agent.process_message("test_user", "Hello there")
+    assert response.response == "Term life covers a fixed period of years."
+    assert response.context["model_tier"] == "standard"
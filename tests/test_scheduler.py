@@ -0,0 +1,63 @@
+import threading
+import time
+import pytest
+from app.resilience import Deadline, DeadlineExceeded, current_deadline
+from app.scheduler import BACKGROUND, INTERACTIVE, LLMScheduler, TokenBucket
+
+WEIGHTS = {INTERACTIVE: 8.0, "batch": 2.0, BACKGROUND: 1.0}
+
+def grant_order(scheduler, callers):
+    """Queue callers behind a held slot and return the order they are granted"""
+    order = []
+    blocker = scheduler.acquire("blocker", INTERACTIVE, 1)
+
+    def call(user_id, priority):
+        with scheduler.slot(user_id, priority, estimated_tokens=100):
+            order.append(user_id)
+
+    threads = []
+    for user_id, priority in callers:
+        thread = threading.Thread(target=call, args=(user_id, priority))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.01)
+
+    scheduler.release(blocker)
+    for thread in threads:
+        thread.join()
+    return order
+
+def test_heavy_user_cannot_starve_others():
+    """Test weighted fair queuing across users"""
+    scheduler = LLMScheduler(10000, 10**7, WEIGHTS, max_concurrency=1)
+    callers = [("heavy", INTERACTIVE)] * 10 + [("light", INTERACTIVE)]
+    order = grant_order(scheduler, callers)
+    assert order.index("light") <= 2
+
+def test_interactive_outweighs_background():
+    """Test that priority classes are weighted"""
+    scheduler = LLMScheduler(10000, 10**7, WEIGHTS, max_concurrency=1)
+    callers = [("batch-job", BACKGROUND)] * 5 + [("customer", INTERACTIVE)]
+    order = grant_order(scheduler, callers)
+    assert order.index("customer") <= 1
+
+def test_token_bucket_wait_time():
+    """Test TPM accounting"""
+    bucket = TokenBucket(per_minute=600)
+    bucket.level = 0
+    assert bucket.wait_time(10) == pytest.approx(1.0)
+    assert bucket.wait_time(10**6) == pytest.approx(60.0)
+
+def test_deadline_while_queued():
+    """Test that a queued call gives up at the request deadline"""
+    scheduler = LLMScheduler(10000, 10**7, WEIGHTS, max_concurrency=1)
+    blocker = scheduler.acquire("blocker")
+    token = current_deadline.set(Deadline(0.05))
+    try:
+        with pytest.raises(DeadlineExceeded):
+            scheduler.acquire("late")
+    finally:
+        current_deadline.reset(token)
+        scheduler.release(blocker)
+    with scheduler.slot("next"):
+        pass
@@ -0,0 +1,61 @@
+import pytest
+from langchain.schema import AIMessage, HumanMessage
+from app.session import Session, ROLE_HUMAN, ROLE_AI
+
+def test_session_is_slotted():
+    """Test that sessions carry no per-instance __dict__"""
+    session = Session("test_user")
+    assert not hasattr(session, "__dict__")
+    assert session.context is None
+    assert session.message_count == 0
+
+def test_add_exchange_stores_bytes():
+    """Test that turns are stored as role codes and UTF-8 bytes"""
+    session = Session("test_user")
+    session.add_exchange("Qué es un seguro?", "Una póliza de vida.")
+
+    assert session.turns == [
+        (ROLE_HUMAN, "Qué es un seguro?".encode("utf-8")),
+        (ROLE_AI, "Una póliza de vida.".encode("utf-8"))
+    ]
+
+def test_messages_materialized_in_order():
+    """Test that history is rebuilt as LangChain messages in order"""
+    session = Session("test_user")
+    session.add_exchange("first", "reply one")
+    session.add_exchange("second", "reply two")
+
+    messages = session.messages()
+    assert [type(m) for m in messages] == [HumanMessage, AIMessage, HumanMessage, AIMessage]
+    assert [m.content for m in messages] == ["first", "reply one", "second", "reply two"]
+
+def test_idle_and_duration():
+    """Test monotonic idle and duration tracking"""
+    session = Session("test_user", now=100.0)
+    session.touch(now=130.0)
+
+    assert session.idle_seconds(now=160.0) == pytest.approx(30.0)
+    assert session.duration_seconds(now=160.0) == pytest.approx(60.0)
+
+def test_serialized_sessions_are_versioned_json():
+    """Test the portable cold-tier format and reading older marshal records"""
+    import marshal
+    import orjson
+    from datetime import date
+    session = Session("test_user")
+    session.add_exchange("Qué es un seguro?", "Una póliza de vida.")
+    session.message_count = 1
+    session.context = {"applicant": {"age": 40}, "quoted_on": date(2026, 1, 2), 3: "int key"}
+
+    payload = session.to_bytes()
+    record = orjson.loads(payload)
+    assert record["v"] == 1
+    restored = Session.from_bytes(payload)
+    assert restored.turns == session.turns
+    assert restored.context == {"applicant": {"age": 40}, "quoted_on": "2026-01-02", "3": "int key"}
+    assert restored.idle_seconds() == pytest.approx(session.idle_seconds(), abs=0.5)
+
+    legacy = marshal.dumps(("old_user", 1000.0, 1000.0, 2, [(ROLE_HUMAN, b"hi"), (ROLE_AI, b"hello")], None))
+    assert Session.from_bytes(legacy).messages()[1].content == "hello"
+    with pytest.raises(ValueError):
+        Session.from_bytes(orjson.dumps({**record, "v": 99}))
@@ -0,0 +1,189 @@
+import pytest
+from app.metrics import metrics
+from app.session import Session
+from app.session_store import SessionFilter, SessionStore
+
+@pytest.fixture
+def store(tmp_path):
+    """Session store with a tiny hot tier"""
+    store = SessionStore(str(tmp_path / "sessions.db"), max_hot=2)
+    yield store
+    store.close()
+
+def test_lru_spill_and_rehydrate(store):
+    """Test that cold sessions are spilled and transparently rehydrated"""
+    for n in range(3):
+        session = Session(f"user-{n}")
+        session.add_exchange(f"question {n}", f"answer {n}")
+        store[f"s-{n}"] = session
+
+    assert store.cold_count() == 1
+    assert len(store) == 3
+    assert "s-0" in store
+
+    rehydrated = store["s-0"]
+    assert rehydrated.user_id == "user-0"
+    assert [m.content for m in rehydrated.messages()] == ["question 0", "answer 0"]
+    assert store.cold_count() == 1
+    assert metrics.counter("session_rehydrations") >= 1
+
+def test_delete_from_either_tier(store):
+    """Test deleting hot and spilled sessions"""
+    for n in range(3):
+        store[f"s-{n}"] = Session(f"user-{n}")
+
+    del store["s-0"]
+    del store["s-2"]
+    assert len(store) == 1
+    with pytest.raises(KeyError):
+        del store["missing"]
+
+def test_write_back_replaces_spilled_copy(store):
+    """Test that a spilled session written back is neither counted twice nor resurrected"""
+    sessions = {name: Session(name) for name in "ABC"}
+    for name, session in sessions.items():
+        store[name] = session
+    assert store.cold_count() == 1
+
+    # A turn that still held A writes it back without reading it first
+    store["A"] = sessions["A"]
+    assert store.cold_count() == 1
+    assert len(store) == 3
+    assert sorted(store) == ["A", "B", "C"]
+
+    del store["A"]
+    assert "A" not in store
+    assert len(store) == 2
+
+def test_expire_covers_cold_tier(store):
+    """Test that expiry removes idle sessions without rehydrating them"""
+    for n in range(3):
+        session = Session(f"user-{n}")
+        session.touch(now=session.last_active - 3600)
+        store[f"s-{n}"] = session
+
+    expired = store.expire(max_idle_seconds=60)
+    assert sorted(expired) == ["s-0", "s-1", "s-2"]
+    assert len(store) == 0
+
+def test_expire_ignores_access_order(store):
+    """Test that a stale session read after a live one is still expired"""
+    stale, live = Session("user-0"), Session("user-1")
+    stale.touch(now=stale.last_active - 3600)
+    store["stale"] = stale
+    store["live"] = live
+    store["stale"]  # a read moves it to the recently used end without touching it
+
+    assert store.expire(max_idle_seconds=60) == ["stale"]
+    assert list(store) == ["live"]
+
+def populate(store, count, users=3):
+    """Sessions s-000.. spread over users, every third one aged an hour"""
+    for n in range(count):
+        session = Session(f"user-{n % users}")
+        if n % 3 == 0:
+            session.created_at -= 3600
+        for turn in range(n % 4):
+            session.add_exchange(f"question {turn}", f"answer {turn}")
+            session.message_count += 1
+        store[f"s-{n:03d}"] = session
+
+def test_query_pages_across_tiers(store):
+    """Test cursor pagination over hot and spilled sessions"""
+    populate(store, 25)
+    assert store.cold_count() == 23
+
+    seen = []
+    after = None
+    while True:
+        page = store.query(after=after, limit=4)
+        seen.extend(summary["session_id"] for summary in page)
+        if len(page) < 4:
+            break
+        after = page[-1]["session_id"]
+    assert seen == [f"s-{n:03d}" for n in range(25)]
+
+def test_query_filters_use_both_tiers(store):
+    """Test user, age and message count filters"""
+    populate(store, 25)
+    by_user = store.query(SessionFilter(user_id="user-1"), limit=100)
+    assert [summary["session_id"] for summary in by_user] == [f"s-{n:03d}" for n in range(1, 25, 3)]
+
+    old = store.query(SessionFilter(min_age=1800), limit=100)
+    assert {summary["session_id"] for summary in old} == {f"s-{n:03d}" for n in range(0, 25, 3)}
+
+    busy = store.query(SessionFilter(min_messages=3, max_age=1800), limit=100)
+    assert {summary["session_id"] for summary in busy} == {
+        f"s-{n:03d}" for n in range(25) if n % 4 == 3 and n % 3 != 0
+    }
+    assert all(summary["message_count"] == 3 for summary in busy)
+
+def test_export_and_bulk_delete(store):
+    """Test full-record export and deletion by filter"""
+    populate(store, 12)
+    records = list(store.export(SessionFilter(user_id="user-2"), page_size=2))
+    assert [record["session_id"] for record in records] == ["s-002", "s-005", "s-008", "s-011"]
+    assert records[-1]["turns"] == [
+        {"role": "user", "text": "question 0"}, {"role": "assistant", "text": "answer 0"},
+        {"role": "user", "text": "question 1"}, {"role": "assistant", "text": "answer 1"},
+        {"role": "user", "text": "question 2"}, {"role": "assistant", "text": "answer 2"},
+    ]
+
+    store["s-011"]  # rehydrate so the batch spans both tiers
+    deleted = [session_id for batch in store.delete_matching(SessionFilter(user_id="user-2"), 3) for session_id in batch]
+    assert sorted(deleted) == ["s-002", "s-005", "s-008", "s-011"]
+    assert len(store) == 8
+    assert store.query(SessionFilter(user_id="user-2")) == []
+
+def test_bulk_delete_after_write_back(store):
+    """Test that a purge leaves nothing behind for a session spilled and then written back"""
+    sessions = {name: Session("u1" if name == "A" else "u2") for name in "ABC"}
+    for name, session in sessions.items():
+        store[name] = session
+    store["A"] = sessions["A"]
+
+    deleted = [session_id for batch in store.delete_matching(SessionFilter(user_id="u1")) for session_id in batch]
+    assert deleted == ["A"]
+    assert store.query(SessionFilter(user_id="u1")) == []
+    assert "A" not in store
+
+def test_session_admin_endpoints():
+    """Test listing, export and bulk delete over HTTP"""
+    import os
+    from unittest.mock import patch
+    import orjson
+    from fastapi.testclient import TestClient
+    from app import main
+    from config.settings import settings
+    admin = {"X-Admin-Token": "secret"}
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}), patch.object(settings, "admin_token", "secret"):
+        with TestClient(main.app) as client:
+            for n in range(5):
+                session = Session("auditee" if n % 2 else "someone")
+                session.add_exchange("hello", "hi")
+                main.insurance_agent.sessions[f"admin-{n}"] = session
+
+            forbidden = [
+                client.get("/sessions").status_code,
+                client.get("/sessions/export", params={"user_id": "auditee"}).status_code,
+                client.delete("/sessions", params={"min_messages": 0}, headers={"X-Admin-Token": "wrong"}).status_code,
+            ]
+            first = client.get("/sessions", params={"user_id": "auditee", "limit": 1}, headers=admin).json()
+            second = client.get(
+                "/sessions", params={"user_id": "auditee", "cursor": first["next_cursor"]}, headers=admin
+            ).json()
+            export = client.get("/sessions/export", params={"user_id": "auditee"}, headers=admin)
+            unfiltered = client.delete("/sessions", headers=admin)
+            purge = client.delete("/sessions", params={"user_id": "auditee"}, headers=admin)
+            remaining = client.get("/sessions", params={"user_id": "auditee"}, headers=admin).json()
+
+    assert forbidden == [403, 403, 403]
+    assert [s["session_id"] for s in first["sessions"]] == ["admin-1"]
+    assert [s["session_id"] for s in second["sessions"]] == ["admin-3"]
+    assert second["next_cursor"] is None
+    lines = [orjson.loads(line) for line in export.content.splitlines()]
+    assert [line["session_id"] for line in lines] == ["admin-1", "admin-3"]
+    assert lines[0]["turns"][1] == {"role": "assistant", "text": "hi"}
+    assert unfiltered.status_code == 422
+    assert purge.json()["deleted"] == 2
+    assert remaining["sessions"] == []
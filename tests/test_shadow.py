@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+import orjson
+from unittest.mock import patch
+from app.agent import InsuranceAgent
+from app.metrics import metrics
+from app.models import MessageResponse
+from app.shadow import ShadowRunner, answer_diff, build_shadow_agent
+from config.settings import settings
+
+def executor(answer, seen=None):
+    def invoke(self, agent_input):
+        if seen is not None:
+            seen.append(agent_input)
+        return {"output": answer}
+    return type("Executor", (), {"invoke": invoke})()
+
+def test_shadow_agent_uses_overrides_and_own_sessions():
+    """Test that overrides apply to the shadow agent only"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        primary = InsuranceAgent()
+        shadow = build_shadow_agent({"agent_max_iterations": 2, "agent_tools": ["get_claims_process"]})
+    assert settings.agent_max_iterations == 6 and settings.agent_tools is None
+    assert shadow.agent_executor.max_iterations == 2
+    assert [tool.name for tool in shadow.tools] == ["get_claims_process"]
+    assert len(primary.tools) > 1
+    assert shadow.sessions is not primary.sessions
+    primary.sessions.close()
+    shadow.sessions.close()
+
+def test_shadow_tiers_use_overrides():
+    """Test that routed tier executors are built with the shadow's settings"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        shadow = build_shadow_agent({
+            "model_routing": True, "agent_max_iterations": 2, "agent_system_prompt": "Shadow prompt."
+        })
+    assert settings.agent_max_iterations == 6
+    executors = [shadow._executor_for(tier) for tier in shadow.router.tiers]
+    assert executors and all(executor.max_iterations == 2 for executor in executors)
+    assert "Shadow prompt." in str(executors[0].agent)
+    shadow.sessions.close()
+
+def test_mirrored_turns_are_recorded(tmp_path):
+    """Test the JSONL comparison of primary and shadow turns"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        primary = InsuranceAgent()
+        shadow = build_shadow_agent({})
+    primary.agent_executor = executor("Term life covers you for 20 years. Call 555-123-4567 to apply.")
+    seen = []
+    shadow.agent_executor = executor("Term life covers you for 30 years. Call 555-123-4567 to apply.", seen=seen)
+    path = tmp_path / "shadow.jsonl"
+    runner = ShadowRunner(shadow, str(path), max_concurrency=1)
+
+    first = primary.process_message("bob", "What is term life?")
+    assert runner.mirror("bob", "What is term life?", first, 0.5)
+    time.sleep(0.1)
+    second = primary.process_message("bob", "How long does it last?", first.session_id)
+    assert runner.mirror("bob", "How long does it last?", second, 0.25)
+    time.sleep(0.1)
+    runner.close()
+    primary.sessions.close()
+
+    entries = [orjson.loads(line) for line in path.read_bytes().splitlines()]
+    assert len(entries) == 2
+    entry = entries[1]
+    assert entry["primary"]["latency_ms"] == 250.0
+    assert entry["shadow"]["query_type"] == second.query_type
+    assert entry["history_complete"] and entry["error"] is None
+    assert 0.8 < entry["similarity"] < 1.0
+    assert entry["diff"] == [{"op": "replace", "primary": "20", "shadow": "30"}]
+    assert entry["session"] != first.session_id
+    # The shadow agent kept its own copy of the conversation
+    assert len(seen[1]["chat_history"]) == 2
+
+def test_concurrency_cap_skips_turns(tmp_path):
+    """Test that mirror never waits for a busy shadow agent"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        shadow = build_shadow_agent({})
+    release = threading.Event()
+    shadow.agent_executor = type("Executor", (), {
+        "invoke": lambda self, agent_input: release.wait(5) and {"output": "Slow answer."}
+    })()
+    runner = ShadowRunner(shadow, str(tmp_path / "shadow.jsonl"), max_concurrency=1)
+    primary = MessageResponse(response="Answer.", session_id="s1", query_type="general")
+    dropped = metrics.counter("shadow_dropped")
+
+    start = time.perf_counter()
+    assert runner.mirror("bob", "Hello", primary, 0.1)
+    assert not runner.mirror("bob", "Hello again", primary, 0.1)
+    assert time.perf_counter() - start < 0.05
+    assert metrics.counter("shadow_dropped") == dropped + 1
+    release.set()
+    time.sleep(0.1)
+    assert runner.mirror("bob", "Third", primary, 0.1)
+    time.sleep(0.1)
+    runner.close()
+
+    entries = [orjson.loads(line) for line in (tmp_path / "shadow.jsonl").read_bytes().splitlines()]
+    assert [entry["history_complete"] for entry in entries] == [True, False]
+    assert metrics.snapshot()["timings"]["shadow_chat_turn_seconds"]["count"] >= 2
+
+def test_answer_diff_is_scrubbed_and_bounded():
+    """Test that diffs never carry contact details and stay small"""
+    changes = answer_diff("Email help@acme.com today", "Email claims@acme.com today")
+    assert changes == [{"op": "replace", "primary": "<email>", "shadow": "<email>"}]
+    assert len(answer_diff(" ".join(f"a{n} x" for n in range(100)), " ".join(f"b{n} x" for n in range(100)))) == 20
@@ -0,0 +1,47 @@
+import pytest
+from langchain.schema import AgentAction
+from app.metrics import metrics
+from app.speculation import SpeculativeTool, ToolPrefetcher, current_prefetch
+from app.tools import TOOLS, PolicyTypeTool
+
+@pytest.fixture
+def prefetcher():
+    """Prefetcher over the registered tools"""
+    return ToolPrefetcher(TOOLS, {"policy_types": {"term_life": {}, "whole_life": {}}})
+
+def test_guess_input(prefetcher):
+    """Test that only unambiguous calls are predicted"""
+    assert prefetcher.guess_input("claims", "How do I file a claim?") == {}
+    assert prefetcher.guess_input("policy_type", "What is term life?") == {"policy_type": "term life"}
+    assert prefetcher.guess_input("policy_type", "Term vs whole life?") is None
+    assert prefetcher.start("cost", "How much is it?") is None
+
+def test_prefetch_served_on_matching_call(prefetcher):
+    """Test that a matching tool call is answered from the prefetch"""
+    prefetch = prefetcher.start("policy_type", "Tell me about whole life")
+    tool = SpeculativeTool.wrap(PolicyTypeTool())
+
+    token = current_prefetch.set(prefetch)
+    try:
+        result = tool.run({"policy_type": "Whole_Life"})
+    finally:
+        current_prefetch.reset(token)
+
+    assert prefetch.served
+    assert result == prefetch.result()
+
+def test_prefetch_outcomes(prefetcher):
+    """Test hit and miss accounting"""
+    hits = metrics.counter("speculative_hits")
+    misses = metrics.counter("speculative_misses")
+
+    injected = prefetcher.start("claims", "How do I submit a claim?")
+    injected.injected = True
+    assert injected.record_outcome([]) == "hit"
+
+    wrong_args = prefetcher.start("policy_type", "What is term life?")
+    action = AgentAction("get_policy_type_info", {"policy_type": "universal life"}, "")
+    assert wrong_args.record_outcome([(action, "...")]) == "miss"
+
+    assert metrics.counter("speculative_hits") == hits + 1
+    assert metrics.counter("speculative_misses") == misses + 1
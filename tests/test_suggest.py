@@ -0,0 +1,50 @@
+import json
+import os
+from unittest.mock import patch
+import pytest
+from fastapi.testclient import TestClient
+from app.suggest import SuggestionIndex
+
+@pytest.fixture(scope="module")
+def index():
+    """Suggestion index over the shipped knowledge base"""
+    with open("knowledge/insurance_data.json") as f:
+        return SuggestionIndex(json.load(f))
+
+def labels(results):
+    return [result["label"] for result in results]
+
+def test_prefix_matches(index):
+    """Test prefix matching from the start and from inner words"""
+    assert labels(index.suggest("term"))[0] == "Term life insurance"
+    assert "How long does a claim take to process?" in labels(index.suggest("claim"))
+    assert labels(index.suggest("waiver")) == ["Waiver of premium rider"]
+    assert index.suggest("") == []
+    assert index.suggest("xyzq") == []
+
+def test_single_typo(index):
+    """Test edit-distance-1 matching"""
+    assert labels(index.suggest("benefciary")) == ["Beneficiary"]
+    assert "Premium" in labels(index.suggest("premum"))
+    assert all(result["fuzzy"] for result in index.suggest("clam"))
+    assert index.suggest("ter")[0]["fuzzy"] is False
+
+def test_results_link_to_answers(index):
+    """Test that every suggestion links to a precomputed answer"""
+    for result in index.suggest("what", limit=20):
+        answer = index.answer(result["id"])
+        assert answer["answer"]
+        assert result["answer_url"].endswith(result["id"])
+
+def test_suggest_endpoints():
+    """Test /suggest and answer lookup"""
+    from app.main import app
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(app) as client:
+            response = client.get("/suggest", params={"q": "grace"})
+            suggestion = response.json()["suggestions"][0]
+            assert suggestion["label"] == "What is the grace period for late premiums?"
+
+            answer = client.get(suggestion["answer_url"])
+            assert "30-31 days" in answer.json()["answer"]
+            assert client.get("/suggest/answers/faq:missing").status_code == 404
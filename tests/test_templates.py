@@ -0,0 +1,117 @@
+import io
+import os
+import zipfile
+from unittest.mock import patch
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from app.templates import QuoteRenderer, load_templates
+
+TERM_RECORD = {
+    "template": "term_life",
+    "term_length": "20",
+    "death_benefit": 500000,
+    "premium": "32.5",
+    "issue_age": 35,
+    "health_class": "Preferred",
+    "threshold": 1000000
+}
+
+@pytest.fixture(scope="module")
+def templates():
+    """Compiled templates from the knowledge directory"""
+    return load_templates()
+
+def test_templates_are_typed(templates):
+    """Test placeholder parsing into typed fields"""
+    assert set(templates) == {"term_life", "whole_life", "universal_life"}
+    fields = templates["term_life"].fields
+    assert fields["term_length"].choices == ("10", "15", "20", "25", "30")
+    assert fields["death_benefit"].kind == "money"
+    assert fields["issue_age"].kind == "integer"
+    assert templates["universal_life"].fields["current_interest_rate"].kind == "percent"
+
+def test_render_markdown_and_html(templates):
+    """Test rendering in both formats"""
+    markdown = templates["term_life"].render_markdown(TERM_RECORD)
+    assert "**Death Benefit:** $500,000" in markdown
+    assert "$32.50/month" in markdown
+    assert "[" not in markdown
+
+    html = templates["term_life"].render_html(dict(TERM_RECORD, health_class="<b>Standard</b>"))
+    assert "<strong>Term Length:</strong> 20 years" in html
+    assert "&lt;b&gt;Standard&lt;/b&gt;" in html
+
+def test_invalid_records_do_not_stop_batch(templates):
+    """Test per-record errors"""
+    renderer = QuoteRenderer(templates)
+    bad_choice = renderer.render_line(orjson.dumps(dict(TERM_RECORD, term_length="12")), 1)
+    missing = renderer.render_line(orjson.dumps({"template": "whole_life"}), 2)
+    unknown = renderer.render_line(b'{"template": "pet"}', 3)
+    good = renderer.render_line(orjson.dumps(TERM_RECORD), 4)
+
+    assert "must be one of" in bad_choice["error"]
+    assert "Missing value" in missing["error"]
+    assert "Unknown template" in unknown["error"]
+    assert good["template"] == "term_life"
+    assert (renderer.rendered, renderer.failed) == (1, 3)
+
+def test_render_endpoint_streams():
+    """Test NDJSON and zip output from /quotes/render"""
+    from app.main import app
+    records = [dict(TERM_RECORD, id=f"quote-{i}") for i in range(50)]
+    payload = b"".join(orjson.dumps(record) + b"\n" for record in records) + b'{"template": "pet"}\n'
+
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(app) as client:
+            response = client.post("/quotes/render?format=html", content=payload)
+            lines = [orjson.loads(line) for line in response.content.splitlines()]
+            assert response.headers["content-type"] == "application/x-ndjson"
+            assert len(lines) == 51
+            assert lines[0]["id"] == "quote-0"
+            assert lines[0]["document"].startswith("<h2>")
+            assert "error" in lines[-1]
+
+            response = client.post("/quotes/render?output=zip", content=payload)
+            archive = zipfile.ZipFile(io.BytesIO(response.content))
+            names = archive.namelist()
+            assert "quote_49.md" in names
+            assert "errors.ndjson" in names
+            assert b"$500,000" in archive.read("quote_0.md")
+
+def test_zip_names_are_unique_and_errors_bounded(templates):
+    """Test repeated ids and a flood of failed records in zip output"""
+    import asyncio
+    from app import templates as templates_module
+    records = [dict(TERM_RECORD, id="dup") for _ in range(3)] + [{"template": "pet"}] * 5
+    payload = b"".join(orjson.dumps(record) + b"\n" for record in records)
+
+    async def render():
+        async def chunks():
+            yield payload
+        return b"".join([data async for data in QuoteRenderer(templates).zip(chunks())])
+
+    with patch.object(templates_module, "_MAX_ZIP_ERRORS", 2):
+        archive = zipfile.ZipFile(io.BytesIO(asyncio.run(render())))
+    assert sorted(archive.namelist()) == ["dup.md", "dup_2.md", "dup_3.md", "errors.ndjson"]
+    errors = [orjson.loads(line) for line in archive.read("errors.ndjson").splitlines()]
+    assert len(errors) == 3 and errors[-1] == {"omitted": 3}
+
+def test_oversized_record_is_reported_and_skipped(templates):
+    """Test that a line over the size limit fails on its own without being buffered"""
+    import asyncio
+    from app import templates as templates_module
+    good = orjson.dumps(dict(TERM_RECORD, id="before")) + b"\n"
+    huge = b'{"template": "term_life", "note": "' + b"x" * 5000
+
+    async def render():
+        async def chunks():
+            yield good + huge[:3000]
+            yield huge[3000:]
+            yield b'"}\n' + orjson.dumps(dict(TERM_RECORD, id="after")) + b"\n"
+        return b"".join([data async for data in QuoteRenderer(templates).ndjson(chunks())])
+
+    with patch.object(templates_module, "_MAX_LINE_BYTES", 1024):
+        lines = [orjson.loads(line) for line in asyncio.run(render()).splitlines()]
+    assert [line["id"] for line in lines] == ["before", 2, "after"]
+    assert lines[1]["error"] == "Record exceeds 1024 bytes"
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+from unittest.mock import patch
+from langchain.tools import BaseTool
+from app.agent import InsuranceAgent
+from app.knowledge import KnowledgeSnapshot, current_knowledge
+from app.metrics import metrics
+from app.resilience import Deadline, current_deadline
+from app.tool_runtime import ManagedTool, ToolPolicy, ToolRuntime
+
+class CountingTool(BaseTool):
+    name = "counting_tool"
+    description = "Echoes its input and counts calls"
+    calls: int = 0
+    delay: float = 0.0
+
+    def _run(self, text: str) -> str:
+        self.calls += 1
+        time.sleep(self.delay)
+        if text == "boom":
+            raise RuntimeError("broken")
+        knowledge = current_knowledge.get()
+        return f"{text} from {knowledge.name if knowledge else 'default'}"
+
+def test_results_are_memoized_per_knowledge_version():
+    """Test cache hits, TTL expiry and version invalidation"""
+    version = ["v1"]
+    runtime = ToolRuntime(ToolPolicy(cache_ttl=0.2), knowledge_version=lambda: version[0])
+    tool = ManagedTool.wrap(CountingTool(), runtime)
+
+    assert tool.run("hi") == "hi from default"
+    assert tool.run("hi") == "hi from default"
+    assert tool.run({"text": "hi"}) == "hi from default"
+    assert tool.tool.calls == 1
+    version[0] = "v2"
+    tool.run("hi")
+    assert tool.tool.calls == 2
+
+    with open("knowledge/insurance_data.json") as f:
+        token = current_knowledge.set(KnowledgeSnapshot.from_dict(json.load(f), "acme"))
+    try:
+        assert tool.run("hi") == "hi from acme"
+    finally:
+        current_knowledge.reset(token)
+    assert tool.tool.calls == 3
+
+    time.sleep(0.25)
+    tool.run("hi")
+    assert tool.tool.calls == 4
+    assert runtime.stats()["counting_tool"]["cache_hits"] >= 2
+
+def test_timeouts_and_concurrency_limits():
+    """Test that slow calls time out and hold their slot until they finish"""
+    runtime = ToolRuntime(ToolPolicy(timeout=0.05, max_concurrency=1))
+    tool = ManagedTool.wrap(CountingTool(delay=0.3), runtime)
+    timeouts = metrics.counter("tool_counting_tool_timeouts")
+    rejected = metrics.counter("tool_counting_tool_rejected")
+
+    assert "did not respond in time" in tool.run("slow")
+    # The abandoned call still occupies the only slot
+    assert "busy" in tool.run("next")
+    time.sleep(0.35)
+    runtime.policies["counting_tool"] = ToolPolicy(timeout=1.0, max_concurrency=1)
+    assert tool.run("later") == "later from default"
+
+    assert metrics.counter("tool_counting_tool_timeouts") == timeouts + 1
+    assert metrics.counter("tool_counting_tool_rejected") == rejected + 1
+
+def test_deadline_shortens_tool_timeout():
+    """Test that a tool call never outlives the turn deadline"""
+    runtime = ToolRuntime(ToolPolicy(timeout=5.0))
+    tool = ManagedTool.wrap(CountingTool(delay=0.3), runtime)
+    token = current_deadline.set(Deadline(0.05))
+    try:
+        # Well inside the tool's own 5s timeout, so only the deadline can cut it short
+        assert "did not respond in time" in tool.run("slow")
+    finally:
+        current_deadline.reset(token)
+
+def test_slot_wait_counts_against_the_timeout():
+    """Test that waiting for a slot and the call share one timeout"""
+    runtime = ToolRuntime(ToolPolicy(timeout=0.3, max_concurrency=1))
+    tool = ManagedTool.wrap(CountingTool(delay=0.2), runtime)
+    first = threading.Thread(target=tool.run, args=("first",))
+    first.start()
+    time.sleep(0.02)
+
+    # The slot frees after ~0.2s and the call needs 0.2s more: each fits in 0.3s, both do not
+    assert "did not respond in time" in tool.run("second")
+    first.join()
+
+def test_errors_are_counted_and_reported():
+    """Test that exceptions become error stats and a short message"""
+    runtime = ToolRuntime(ToolPolicy(cache_ttl=60))
+    tool = ManagedTool.wrap(CountingTool(), runtime)
+    errors = metrics.counter("tool_counting_tool_errors")
+    assert tool.run("boom") == "The counting_tool tool failed. Answer without it."
+    assert tool.run("boom") == "The counting_tool tool failed. Answer without it."
+    assert tool.tool.calls == 2
+    assert metrics.counter("tool_counting_tool_errors") == errors + 2
+    assert runtime.stats()["counting_tool"]["latency"]["count"] >= 2
+
+def test_agent_runs_tools_through_the_runtime():
+    """Test that the agent's tools are managed and configured from settings"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        agent = InsuranceAgent()
+    assert all(isinstance(tool, ManagedTool) for tool in agent.tools)
+    assert agent.tool_runtime.policy("get_policy_type_info").cache_ttl > 0
+    assert agent.tool_runtime.policy("check_eligibility").cache_ttl == 0
+
+    policy_tool = next(tool for tool in agent.tools if tool.name == "get_policy_type_info")
+    hits = metrics.counter("tool_get_policy_type_info_cache_hits")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(policy_tool.run("term life"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    policy_tool.run("term life")
+    assert all("Fixed term" in result for result in results)
+    assert metrics.counter("tool_get_policy_type_info_cache_hits") > hits
+    agent.sessions.close()
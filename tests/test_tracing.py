@@ -0,0 +1,179 @@
+import os
+from unittest.mock import patch
+import httpx
+import orjson
+from fastapi.testclient import TestClient
+from app.agent import InsuranceAgent
+from app.tools import PolicyTypeTool
+from app.tracing import (
+    FileSpanExporter, current_span, parse_traceparent, span, start_trace, tracing_callbacks
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+def read_spans(path):
+    return [orjson.loads(line) for line in path.read_bytes().splitlines()]
+
+def test_parse_traceparent():
+    """Test W3C traceparent parsing"""
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+    assert parse_traceparent("00-" + "0" * 32 + f"-{PARENT_ID}-01") is None
+    assert parse_traceparent("garbage") is None
+    assert parse_traceparent(None) is None
+
+def test_head_based_sampling(tmp_path):
+    """Test that the root decides for the whole trace"""
+    exporter = FileSpanExporter(str(tmp_path / "traces.jsonl"))
+    with start_trace("root", sample_rate=0.0, exporter=exporter) as root:
+        assert root is None
+        with span("child") as child:
+            assert child is None
+    with start_trace("root", f"00-{TRACE_ID}-{PARENT_ID}-00", sample_rate=1.0, exporter=exporter,
+                     trust_parent=True) as root:
+        assert root is None
+    # An untrusted caller cannot force sampling
+    with start_trace("root", f"00-{TRACE_ID}-{PARENT_ID}-01", sample_rate=0.0, exporter=exporter) as root:
+        assert root is None
+    assert not (tmp_path / "traces.jsonl").exists()
+
+    with start_trace("root", f"00-{TRACE_ID}-{PARENT_ID}-01", sample_rate=0.0, exporter=exporter,
+                     trust_parent=True) as root:
+        assert root.trace.trace_id == TRACE_ID
+    [exported] = read_spans(tmp_path / "traces.jsonl")
+    assert exported["parent_span_id"] == PARENT_ID
+
+def test_spans_form_a_tree(tmp_path):
+    """Test parent links, errors and export when the root ends"""
+    path = tmp_path / "traces.jsonl"
+    with start_trace("root", sample_rate=1.0, exporter=FileSpanExporter(str(path))) as root:
+        with span("stage", {"step": 1}):
+            try:
+                with span("failing"):
+                    raise ValueError("boom")
+            except ValueError:
+                pass
+        assert not path.exists()
+    assert current_span.get() is None
+
+    spans = {entry["name"]: entry for entry in read_spans(path)}
+    assert spans["root"]["parent_span_id"] is None
+    assert spans["stage"]["parent_span_id"] == spans["root"]["span_id"]
+    assert spans["failing"]["parent_span_id"] == spans["stage"]["span_id"]
+    assert spans["failing"]["status"] == "error"
+    assert spans["failing"]["attributes"]["error.message"] == "boom"
+    assert len({entry["trace_id"] for entry in spans.values()}) == 1
+
+def test_tool_runs_are_traced(tmp_path):
+    """Test tool spans from the LangChain callback handler"""
+    path = tmp_path / "traces.jsonl"
+    with start_trace("root", sample_rate=1.0, exporter=FileSpanExporter(str(path))):
+        PolicyTypeTool().run("term", callbacks=[tracing_callbacks])
+    tool = next(entry for entry in read_spans(path) if entry["name"] == "tool get_policy_type_info")
+    assert tool["attributes"]["tool.input"] == "term"
+
+def test_agent_turn_is_traced(tmp_path):
+    """Test stage, step and LLM spans for a full turn"""
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with patch("app.agent.settings.simulated_llm", True), patch("app.agent.settings.simulated_llm_latency", 0.01):
+            agent = InsuranceAgent()
+
+    path = tmp_path / "traces.jsonl"
+    with start_trace("turn", sample_rate=1.0, exporter=FileSpanExporter(str(path))):
+        agent.process_message("user-1", "What is term life insurance?")
+
+    spans = {entry["name"]: entry for entry in read_spans(path)}
+    for name in ("process_message", "session.load", "agent.invoke", "agent.step", "llm", "session.save"):
+        assert name in spans
+    assert spans["process_message"]["attributes"]["query.type"] == "policy_type"
+    assert spans["llm"]["parent_span_id"] == spans["agent.step"]["span_id"]
+    assert spans["llm"]["attributes"]["llm.total_tokens"] > 0
+
+def test_client_propagates_trace_context(tmp_path):
+    """Test traceparent injection by InsuranceAPIClient"""
+    from app.api_client import InsuranceAPIClient
+    client = InsuranceAPIClient()
+    request = httpx.Request("GET", "http://localhost:8000/health")
+    client._inject_trace_context(request)
+    assert "traceparent" not in request.headers
+
+    with start_trace("root", sample_rate=1.0, exporter=FileSpanExporter(str(tmp_path / "t.jsonl"))) as root:
+        client._inject_trace_context(request)
+    assert request.headers["traceparent"] == root.traceparent
+    client.close()
+
+def test_client_imports_without_settings_or_langchain():
+    """Test that app.api_client loads without an API key and without LangChain"""
+    import subprocess
+    import sys
+    script = (
+        "import sys; import app.api_client; "
+        "print(any(name.startswith(('langchain', 'config')) for name in sys.modules))"
+    )
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60, env=env)
+    assert result.stdout.strip() == "False", result.stderr
+
+def test_chat_endpoint_continues_incoming_trace(tmp_path):
+    """Test the /chat root span under an incoming traceparent"""
+    from app import main
+    path = tmp_path / "traces.jsonl"
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(main.app) as client:
+            main.insurance_agent.agent_executor = type("Executor", (), {
+                "invoke": lambda self, agent_input, **kwargs: {"output": "Term life covers a fixed period."}
+            })()
+            with patch("app.tracing.settings.tracing_enabled", True), \
+                    patch("app.tracing.settings.trace_sample_rate", 0.0), \
+                    patch("app.tracing._exporter", FileSpanExporter(str(path))):
+                untrusted = client.post(
+                    "/chat",
+                    json={"message": "What is term life?", "user_id": "bob"},
+                    headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+                )
+                assert untrusted.status_code == 200 and not path.exists()
+                with patch("app.auth.settings.admin_token", "secret"):
+                    admin = client.post(
+                        "/chat",
+                        json={"message": "What is term life?", "user_id": "bob"},
+                        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01", "X-Admin-Token": "secret"}
+                    )
+                assert admin.status_code == 200 and path.exists()
+                path.unlink()
+                with patch("app.tracing.settings.trace_trust_parent", True):
+                    response = client.post(
+                        "/chat",
+                        json={"message": "What is term life?", "user_id": "bob"},
+                        headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+                    )
+
+    assert response.status_code == 200
+    spans = {entry["name"]: entry for entry in read_spans(path)}
+    assert spans["POST /chat"]["trace_id"] == TRACE_ID
+    assert spans["POST /chat"]["parent_span_id"] == PARENT_ID
+    assert spans["POST /chat"]["attributes"]["http.status_code"] == 200
+    assert spans["process_message"]["parent_span_id"] == spans["POST /chat"]["span_id"]
+    assert spans["process_message"]["attributes"]["session.id"] == response.json()["session_id"]
+
+def test_chat_stream_endpoint_is_traced(tmp_path):
+    """Test that streamed turns get the same root span as /chat"""
+    from app import main
+    path = tmp_path / "traces.jsonl"
+    with patch.dict(os.environ, {'OPENAI_API_KEY': 'test_key'}):
+        with TestClient(main.app) as client:
+            main.insurance_agent.agent_executor = type("Executor", (), {
+                "invoke": lambda self, agent_input, **kwargs: {"output": "Term life covers a fixed period."}
+            })()
+            with patch("app.tracing.settings.tracing_enabled", True), \
+                    patch("app.tracing.settings.trace_sample_rate", 1.0), \
+                    patch("app.tracing._exporter", FileSpanExporter(str(path))):
+                with client.stream(
+                    "POST", "/chat/stream", json={"message": "What is term life?", "user_id": "bob"}
+                ) as response:
+                    events = [orjson.loads(line) for line in response.iter_lines() if line]
+
+    spans = {entry["name"]: entry for entry in read_spans(path)}
+    assert events[-1]["ok"]
+    assert spans["POST /chat/stream"]["attributes"]["http.status_code"] == 200
+    assert spans["process_message"]["parent_span_id"] == spans["POST /chat/stream"]["span_id"]